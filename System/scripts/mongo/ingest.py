@@ -0,0 +1,360 @@
+# ingest.py
+# Loads bots, tasks and patients into porter_db from JSON Lines or CSV, or
+# generates synthetic ones at load-test scale. Input is streamed and written
+# in unordered bulk batches of upserts keyed on bot_id / task_id / id, so
+# re-running an import (or a later ADT export) updates documents instead of
+# duplicating them. Throughput is reported in docs/s.
+#
+# Usage:
+#   python System/scripts/mongo/ingest.py samples                      # the demo bots, tasks and patients
+#   python System/scripts/mongo/ingest.py load patients adt.jsonl      # .jsonl/.ndjson, .csv, or - for stdin
+#   python System/scripts/mongo/ingest.py generate patients --count 100000
+#   python System/scripts/mongo/ingest.py generate tasks --days 90 --per-day 2000 [--output tasks.jsonl]
+#
+# Connects to --uri, else MONGODB_URI (.env), else mongodb://localhost:27017.
+
+import argparse
+import csv
+import datetime
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', '..', 'src'))
+
+from db_indexes import ensure_indexes
+
+# Field each collection's documents are upserted on
+KEY_FIELDS = {"bots": "bot_id", "tasks": "task_id", "patients": "id"}
+# CSV columns that aren't strings; "a.b" columns become nested fields
+INT_FIELDS = {"bot_id", "task_id", "battery", "age"}
+LIST_FIELDS = {"allergies", "medications"} # ";"-separated in CSV
+# Stored as dates so the dispatcher can compute waits and deadlines
+DATE_FIELDS = {"createdAt", "assignedAt", "completedAt", "deadline"}
+
+
+# --- Reading ---
+
+def read_documents(path: str, file_format: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Streams documents from a JSON Lines or CSV file ("-" = JSON Lines on stdin)."""
+    file_format = file_format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    stream: TextIO = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8") if path == "-" \
+        else open(path, newline="" if file_format == "csv" else None, encoding="utf-8")
+    with stream:
+        if file_format == "csv":
+            for row in csv.DictReader(stream):
+                yield csv_document(row)
+        else:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def csv_document(row: Dict[str, str]) -> Dict[str, Any]:
+    document: Dict[str, Any] = {}
+    for column, raw in row.items():
+        if column is None: # Extra cells without a header
+            continue
+        field = column.rsplit(".", 1)[-1]
+        if raw == "":
+            value: Any = None
+        elif field in INT_FIELDS:
+            value = int(raw)
+        elif field in LIST_FIELDS:
+            value = [item.strip() for item in raw.split(";") if item.strip()]
+        else:
+            value = raw
+        target = document
+        parts = column.split(".")
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    return document
+
+
+def prepare(document: Dict[str, Any]) -> Dict[str, Any]:
+    document.pop("_id", None)
+    for field in DATE_FIELDS & document.keys():
+        if isinstance(document[field], str):
+            try:
+                document[field] = datetime.datetime.fromisoformat(document[field].replace("Z", "+00:00"))
+            except ValueError:
+                pass # Left as text; the dispatcher ignores what it can't parse
+    return document
+
+
+# --- Writing ---
+
+class IngestReport:
+    def __init__(self, collection: str):
+        self.collection = collection
+        self.read = 0
+        self.skipped = 0    # No key field
+        self.upserted = 0   # New documents
+        self.modified = 0   # Existing documents that changed
+        self.unchanged = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+        self._last_progress = self.started
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.read / elapsed if elapsed > 0 else 0.0
+
+    def progress(self, every_seconds: float = 2.0):
+        now = time.perf_counter()
+        if now - self._last_progress >= every_seconds:
+            self._last_progress = now
+            print(f"  {self.collection}: {self.read:,} docs ({self.rate:,.0f} docs/s)")
+
+    def __str__(self) -> str:
+        return (f"{self.collection}: {self.read:,} docs in {time.perf_counter() - self.started:.1f} s "
+                f"({self.rate:,.0f} docs/s): {self.upserted:,} new, {self.modified:,} updated, "
+                f"{self.unchanged:,} unchanged, {self.skipped:,} skipped, {self.errors:,} errors")
+
+
+def ingest(db, collection: str, documents: Iterable[Dict[str, Any]], batch_size: int = 1000,
+           replace: bool = False) -> IngestReport:
+    """
+    Upserts `documents` into `collection` in unordered bulk batches. By
+    default fields are merged into an existing document ($set), so fields
+    the API has set since (assignedBot, status) survive a re-import; with
+    `replace` the stored document is replaced outright.
+    """
+    key = KEY_FIELDS[collection]
+    report = IngestReport(collection)
+    batch: List[Any] = []
+    for document in documents:
+        report.read += 1
+        document = prepare(document)
+        if document.get(key) is None:
+            report.skipped += 1
+            continue
+        selector = {key: document[key]}
+        batch.append(ReplaceOne(selector, document, upsert=True) if replace
+                     else UpdateOne(selector, {"$set": document}, upsert=True))
+        if len(batch) >= batch_size:
+            _write(db[collection], batch, report)
+            batch = []
+        report.progress()
+    if batch:
+        _write(db[collection], batch, report)
+    return report
+
+
+def _write(collection, batch: List[Any], report: IngestReport):
+    try:
+        result = collection.bulk_write(batch, ordered=False)
+        details = result.bulk_api_result
+    except BulkWriteError as e:
+        # Unordered: everything but the failed operations was still written
+        details = e.details
+        report.errors += len(details.get("writeErrors", []))
+        for error in details.get("writeErrors", [])[:3]:
+            print(f"  {report.collection}: {error.get('errmsg')}")
+    report.upserted += details.get("nUpserted", 0)
+    report.modified += details.get("nModified", 0)
+    report.unchanged += details.get("nMatched", 0) - details.get("nModified", 0)
+
+
+# --- Synthetic data ---
+
+FIRST_NAMES = ["Sarah", "Michael", "Emily", "Robert", "Aisha", "Wei", "Maria", "James", "Priya", "Daniel",
+               "Fatima", "Liam", "Sofia", "Noah", "Yuki", "Omar", "Grace", "Mateo", "Hannah", "Arjun"]
+LAST_NAMES = ["Johnson", "Chen", "Davis", "Wilson", "Khan", "Garcia", "Smith", "Nguyen", "Patel", "Brown",
+              "Okafor", "Martin", "Rossi", "Kim", "Lopez", "Ali", "Murphy", "Silva", "Cohen", "Singh"]
+CONDITIONS = ["Hypertension", "Pneumonia", "Post-operative monitoring", "Chest Pain - Rule out MI", "Sepsis",
+              "COPD exacerbation", "Hip fracture", "Diabetic ketoacidosis", "Stroke observation", "Cellulitis"]
+MEDICATIONS = ["Lisinopril 10mg", "Metformin 500mg", "Aspirin 81mg", "Azithromycin 250mg", "Heparin 5000u",
+               "Morphine 5mg PRN", "Docusate 100mg", "Insulin glargine 20u", "Ceftriaxone 1g"]
+ALLERGIES = ["Penicillin", "Shellfish", "Latex", "Codeine", "Sulfa drugs", "Iodine"]
+DOCTORS = ["Dr. Smith", "Dr. Williams", "Dr. Brown", "Dr. Patel", "Dr. Okafor", "Dr. Lee"]
+TASK_TYPES = {"delivery": ["Medical supplies", "Medication", "Lab samples", "Linen"],
+              "comfort": ["Water and snacks", "Blankets", "Reading material"],
+              "scribing": [None]}
+
+
+def synthetic_rooms(count: int) -> List[str]:
+    """Room numbers like the seed data's ("301"): floor, then room on the floor."""
+    per_floor = 40
+    return [f"{floor}{room:02d}" for floor, room in
+            itertools.islice(((f, r) for f in range(1, 100) for r in range(1, per_floor + 1)), count)]
+
+
+def generate_bots(count: int, rng: random.Random, rooms: List[str]) -> Iterator[Dict[str, Any]]:
+    for bot_id in range(1, count + 1):
+        charging = rng.random() < 0.15
+        yield {
+            "bot_id": bot_id,
+            "name": f"Porter-{bot_id:02d}",
+            "status": "charging" if charging else rng.choice(["active", "idle"]),
+            "location": "Charging Station A" if charging else f"Room {rng.choice(rooms)}",
+            "battery": rng.randint(15, 60) if charging else rng.randint(40, 100),
+            "task": None,
+            "priority": None,
+        }
+
+
+def generate_patients(count: int, rng: random.Random, rooms: List[str]) -> Iterator[Dict[str, Any]]:
+    today = datetime.date.today()
+    for number in range(1, count + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        bed = rng.choice("AB")
+        status = rng.choices(["stable", "improving", "critical"], weights=(6, 3, 1))[0]
+        admitted = today - datetime.timedelta(days=rng.randint(0, 30))
+        yield {
+            "id": f"P-{admitted.year}-{number:06d}",
+            "name": f"{first} {last}",
+            "age": rng.randint(18, 95),
+            "gender": rng.choice(["Female", "Male"]),
+            "room": f"{rng.choice(rooms)}{bed}",
+            "bed": bed,
+            "admissionDate": admitted.isoformat(),
+            "status": status,
+            "condition": rng.choice(CONDITIONS),
+            "doctor": rng.choice(DOCTORS),
+            "allergies": rng.sample(ALLERGIES, rng.randint(0, 2)) or ["None known"],
+            "vitals": {
+                "bloodPressure": f"{rng.randint(100, 170)}/{rng.randint(60, 100)}",
+                "heartRate": f"{rng.randint(55, 120)} bpm",
+                "temperature": f"{rng.uniform(97.0, 102.5):.1f}°F",
+                "oxygenSat": f"{rng.randint(88, 100)}%",
+                "lastUpdated": f"{today.isoformat()} {rng.randint(0, 23):02d}:{rng.choice(['00', '15', '30', '45'])}",
+            },
+            "medications": rng.sample(MEDICATIONS, rng.randint(1, 3)),
+            "phone": f"(555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+            "emergencyContact": f"{rng.choice(FIRST_NAMES)} {last} - (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+            "insurance": rng.choice(["Blue Cross Blue Shield", "Medicare", "Medicare + Supplement", "Aetna", "Cigna"]),
+            "notes": "",
+            "riskLevel": {"critical": "high", "stable": "low"}.get(status, "medium"),
+        }
+
+
+def generate_tasks(days: int, per_day: int, rng: random.Random, rooms: List[str], bots: int,
+                   start_id: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    `days` of task history up to now, oldest first. Everything older than
+    an hour is completed; the last hour is a mix of open, assigned and
+    in-progress work for the dispatcher to pick up.
+    """
+    now = datetime.datetime.utcnow().replace(microsecond=0)
+    start = now - datetime.timedelta(days=days)
+    total = days * per_day
+    for index in range(total):
+        created = start + datetime.timedelta(seconds=(index + rng.random()) * days * 86400 / total)
+        task_type = rng.choices(list(TASK_TYPES), weights=(6, 3, 1))[0]
+        age_minutes = (now - created).total_seconds() / 60
+        if age_minutes > 60:
+            status = "completed"
+        else:
+            status = rng.choice(["pending", "queued", "assigned", "in-progress"])
+        bot = f"Porter-{rng.randint(1, bots):02d}" if status not in ("pending", "queued") else None
+        document = {
+            "task_id": start_id + index,
+            "type": task_type,
+            "priority": rng.choices(["high", "normal", "low"], weights=(2, 6, 2))[0],
+            "room": rng.choice(rooms),
+            "status": status,
+            "assignedBot": bot,
+            "createdAt": created.isoformat(),
+        }
+        detail = rng.choice(TASK_TYPES[task_type])
+        if task_type == "delivery":
+            document["item"] = detail
+        elif task_type == "comfort":
+            document["request"] = detail
+        else:
+            document["nurse"] = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if bot is not None:
+            document["assignedAt"] = (created + datetime.timedelta(seconds=rng.randint(5, 300))).isoformat()
+        if status == "completed":
+            document["completedAt"] = (created + datetime.timedelta(minutes=rng.randint(3, 45))).isoformat()
+        yield document
+
+
+def write_jsonl(path: str, documents: Iterable[Dict[str, Any]]) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for document in documents:
+            f.write(json.dumps(document, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def connect(uri: Optional[str], database: str):
+    load_dotenv()
+    uri = uri or os.environ.get("MONGODB_URI") or "mongodb://localhost:27017"
+    client = MongoClient(uri)
+    client.admin.command("ping")
+    return client, client[database]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load bots, tasks and patients into MongoDB.")
+    parser.add_argument("--uri", help="MongoDB URI (default: MONGODB_URI, then mongodb://localhost:27017)")
+    parser.add_argument("--db", default="porter_db")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--replace", action="store_true", help="Replace stored documents instead of merging fields")
+    parser.add_argument("--reset", action="store_true", help="Delete the collection's documents first")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("samples", help="Load the demo documents in samples/")
+
+    load = commands.add_parser("load", help="Load a JSON Lines or CSV file")
+    load.add_argument("collection", choices=sorted(KEY_FIELDS))
+    load.add_argument("path", help="File to read, or - for JSON Lines on stdin")
+    load.add_argument("--format", choices=["jsonl", "csv"], help="Default: from the file extension")
+
+    generate = commands.add_parser("generate", help="Generate synthetic documents")
+    generate.add_argument("collection", choices=sorted(KEY_FIELDS))
+    generate.add_argument("--count", type=int, default=1000, help="Bots or patients to generate")
+    generate.add_argument("--days", type=int, default=30, help="Days of task history")
+    generate.add_argument("--per-day", type=int, default=500, help="Tasks per day")
+    generate.add_argument("--bots", type=int, default=20, help="Bots tasks are assigned to")
+    generate.add_argument("--rooms", type=int, default=200)
+    generate.add_argument("--seed", type=int, default=None)
+    generate.add_argument("--output", help="Write JSON Lines here instead of to the database")
+    args = parser.parse_args()
+
+    if args.command == "samples":
+        jobs = [(name, read_documents(os.path.join(SCRIPT_DIR, "samples", f"{name}.jsonl")))
+                for name in ("bots", "tasks", "patients")]
+    elif args.command == "load":
+        jobs = [(args.collection, read_documents(args.path, args.format))]
+    else:
+        rng = random.Random(args.seed)
+        rooms = synthetic_rooms(args.rooms)
+        if args.collection == "bots":
+            documents = generate_bots(args.count, rng, rooms)
+        elif args.collection == "patients":
+            documents = generate_patients(args.count, rng, rooms)
+        else:
+            documents = generate_tasks(args.days, args.per_day, rng, rooms, args.bots)
+        if args.output:
+            began = time.perf_counter()
+            count = write_jsonl(args.output, documents)
+            elapsed = time.perf_counter() - began
+            print(f"Wrote {count:,} {args.collection} to {args.output} ({count / elapsed:,.0f} docs/s)")
+            sys.exit(0)
+        jobs = [(args.collection, documents)]
+
+    client, db = connect(args.uri, args.db)
+    # Upserts look documents up by their key: make sure that's an index lookup
+    for name, error in ensure_indexes(db)["failed"].items():
+        print(f"Could not create index {name}: {error}")
+    for collection, documents in jobs:
+        if args.reset:
+            print(f"Deleted {db[collection].delete_many({}).deleted_count:,} {collection}")
+        print(ingest(db, collection, documents, batch_size=args.batch_size, replace=args.replace))
+    client.close()
@@ -0,0 +1,42 @@
+#!/bin/sh
+# Starts a single-node MongoDB replica set for local development and testing.
+# Change streams (the database half of /api/events) only work on a replica
+# set; Atlas clusters already are one. Change stream pre-images, which let
+# the relay key deletes, need MongoDB 6.0 or later (this script runs 7).
+#
+# Usage: System/scripts/mongo/start_replica_set.sh [port]
+# Uses Docker when available, otherwise a local mongod + mongosh.
+set -e
+
+PORT="${1:-27017}"
+DATA_DIR="${PORTER_MONGO_DATA:-$HOME/.porter-mongo}"
+INIT="try { rs.status() } catch (e) { rs.initiate({_id: 'rs0', members: [{_id: 0, host: 'localhost:27017'}]}) }"
+# Pre-images let the change relay key deletes of documents it hasn't seen
+PRE_IMAGES="while (!db.hello().isWritablePrimary) { sleep(500) }
+const porter = db.getSiblingDB('${MONGODB_DB:-porter_db}');
+const options = {changeStreamPreAndPostImages: {enabled: true}};
+for (const name of ['bots', 'tasks', 'patients']) {
+    if (porter.getCollectionNames().includes(name)) porter.runCommand({collMod: name, ...options});
+    else porter.createCollection(name, options);
+}"
+
+if command -v docker >/dev/null 2>&1; then
+    docker start porter-mongo >/dev/null 2>&1 || \
+        docker run -d --name porter-mongo -p "$PORT:27017" mongo:7 --replSet rs0 --bind_ip_all >/dev/null
+    until docker exec porter-mongo mongosh --quiet --eval "db.adminCommand('ping')" >/dev/null 2>&1; do
+        sleep 1
+    done
+    docker exec porter-mongo mongosh --quiet --eval "$INIT" >/dev/null
+    docker exec porter-mongo mongosh --quiet --eval "$PRE_IMAGES" >/dev/null
+else
+    mkdir -p "$DATA_DIR"
+    mongod --replSet rs0 --port "$PORT" --dbpath "$DATA_DIR" --bind_ip localhost \
+        --fork --logpath "$DATA_DIR/mongod.log" >/dev/null
+    mongosh --port "$PORT" --quiet --eval "$(echo "$INIT" | sed "s/27017/$PORT/")" >/dev/null
+    mongosh --port "$PORT" --quiet --eval "$PRE_IMAGES" >/dev/null || \
+        echo "Pre-images not enabled (needs MongoDB 6.0+); deletes will reach the dashboard as resets."
+fi
+
+# directConnection: the member advertises localhost:27017 from inside Docker
+echo "Replica set rs0 is up. Put this in your .env:"
+echo "MONGODB_URI=mongodb://localhost:$PORT/?replicaSet=rs0&directConnection=true"
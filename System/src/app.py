@@ -1,11 +1,14 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from pymongo import MongoClient
+from flask.helpers import get_debug_flag
+from pymongo.errors import ConnectionFailure
 from dotenv import load_dotenv
 import os
 import sys
 import json
 import ssl
+import threading
+import time
 
 # Load environment variables from .env file
 load_dotenv()
@@ -14,139 +17,505 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 BOT_SRC_PATH = os.path.join(BASE_DIR, 'bot', 'src')
 sys.path.insert(0, BOT_SRC_PATH)
 
+# graph.json the bot navigates on; a binary snapshot is kept next to it
+GRAPH_PATH = os.getenv("PORTER_GRAPH_PATH", os.path.join(BASE_DIR, 'bot', 'data', 'graph.json'))
+START_ROOM = os.getenv("PORTER_START_ROOM", "service room")
+# Bot behind the single-bot endpoints (/api/command, /api/bot_status)
+DEFAULT_BOT_ID = os.getenv("PORTER_DEFAULT_BOT", "Porter-01")
+# Task dispatching: "greedy" or "hungarian", and seconds between ticks (0 = only on request)
+DISPATCH_STRATEGY = os.getenv("PORTER_DISPATCH_STRATEGY", "greedy")
+DISPATCH_INTERVAL = float(os.getenv("PORTER_DISPATCH_INTERVAL", "5"))
+# Seconds a page of /api/bots, /api/tasks or /api/patients is served from memory (0 = off)
+READ_CACHE_TTL = float(os.getenv("PORTER_READ_CACHE_TTL", "2"))
+# Log database commands slower than this with their explain() plan (0 = off)
+SLOW_QUERY_MS = float(os.getenv("PORTER_SLOW_QUERY_MS", "0"))
+# Create the collections' indexes at start-up
+ENSURE_INDEXES = os.getenv("PORTER_ENSURE_INDEXES", "1") == "1"
+# Seconds between keep-alive comments on idle /api/events streams
+EVENTS_HEARTBEAT = float(os.getenv("PORTER_EVENTS_HEARTBEAT", "15"))
+# Comma-separated WAV recordings of the wake word; enables continuous listening
+WAKE_WORD_TEMPLATES = os.getenv("PORTER_WAKE_WORD_TEMPLATES", "")
+# Run the index build, wake-word listener, task dispatcher and change relay in this process
+BACKGROUND_SERVICES = os.getenv("PORTER_BACKGROUND_SERVICES", "1") == "1"
+# `python app.py` restarts the server when the code changes
+USE_RELOADER = os.getenv("PORTER_USE_RELOADER", "1") == "1"
+
 app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend access (important for React)
+CORS(app, expose_headers=["X-Next-Cursor", "ETag"])  # Enable CORS for frontend access (important for React)
 
 # --- MongoDB Atlas Connection ---
-MONGODB_URI = os.getenv("MONGODB_URI")
-if not MONGODB_URI:
-    # Use a more descriptive error message and exit if critical env var is missing
-    print("Error: MONGODB_URI environment variable not set. Please add it to your .env file.")
-    sys.exit(1) # Exit the application if essential configuration is missing
+from database import Database, DatabaseConfig
+from query_profiler import SlowQueryProfiler
+from db_indexes import ensure_indexes
 
-try:
-    client = MongoClient(MONGODB_URI)
-    
-    db = client["porter_db"]  # Replace with your actual database name
-    # Optional: Test connection to MongoDB
-    client.admin.command('ping')
+if not os.getenv("MONGODB_URI"):
+    print("Warning: MONGODB_URI environment variable not set; using a local MongoDB. Add it to your .env file.")
+
+# Listeners can only be registered when the client is created
+query_profiler = SlowQueryProfiler(threshold_ms=SLOW_QUERY_MS) if SLOW_QUERY_MS > 0 else None
+
+# One pooled client for the process; it connects on first use, so the API
+# comes up while the database is unreachable and database requests fail
+# until it's back
+database = Database(DatabaseConfig.from_env(), event_listeners=[query_profiler] if query_profiler is not None else [])
+db = database.db
+
+if query_profiler is not None:
+    query_profiler.attach(database.client)
+    print(f"Logging queries slower than {SLOW_QUERY_MS:g} ms with their plans.")
+
+index_report = None
+
+def _ensure_indexes():
+    global index_report
+    if not database.ping():
+        print("MongoDB is not reachable yet; indexes will be created once it is.")
+        while not database.ping(): # Each ping waits up to the server selection timeout
+            time.sleep(5)
     print("MongoDB connected successfully!")
+    report = ensure_indexes(db)
+    for name, error in report["failed"].items():
+        print(f"Could not create index {name}: {error}")
+    if report["created"] or report["rebuilt"]:
+        print(f"Indexes created: {', '.join(report['created'] + report['rebuilt'])}")
+    index_report = report
+
+from log_capture import capture_logs
+from read_api import Page, ReadCache, fetch_page, make_etag, parse_query
+from event_bus import EventBus
+from change_stream_relay import ChangeStreamRelay
+
+read_cache = ReadCache(ttl_seconds=READ_CACHE_TTL)
+
+# --- Live updates ---
+# Database changes (from change streams) and bot state go out on /api/events
+event_bus = EventBus()
+change_relay = ChangeStreamRelay(db, event_bus, on_change=read_cache.invalidate)
+
+# --- Fleet Initialization ---
+fleet = None
+porter_bot = None
+try:
+    from graph_loader import load_graph
+    from fleet import Fleet
+
+    graph = load_graph(GRAPH_PATH) # Memory-maps the snapshot when graph.json is unchanged
+    start_node = graph.find_node(START_ROOM) or graph.node_list[0]
+    # One graph, route table, model backend and speech client for every bot
+    fleet = Fleet(graph)
+    try:
+        fleet.add_bots_from_documents(db.bots.find({}, {'_id': 0, 'name': 1, 'location': 1}), start_node)
+    except Exception as e:
+        print(f"Error loading bots from MongoDB: {e}")
+    if DEFAULT_BOT_ID not in fleet:
+        fleet.add_bot(DEFAULT_BOT_ID, start_node)
+    porter_bot = fleet.get(DEFAULT_BOT_ID)
+    fleet.add_state_listener(
+        lambda bot, event, data: event_bus.publish("bot_state", {"bot": bot.id, "event": event, **data}))
+    print(f"Fleet of {len(fleet)} bots initialized ({len(graph.nodes)} nodes loaded from {GRAPH_PATH}).")
 except Exception as e:
-    print(f"Error connecting to MongoDB: {e}")
-    sys.exit(1) # Exit if cannot connect to DB
+    print(f"Error initializing Porter bot: {e}")
+
+# --- Task Dispatching ---
+dispatch_service = None
+if fleet is not None:
+    try:
+        from dispatcher import Dispatcher
+        from dispatch_service import DispatchService
+
+        dispatcher = Dispatcher(fleet.graph, fleet.navigator, strategy=DISPATCH_STRATEGY)
+        dispatch_service = DispatchService(db, fleet, dispatcher, interval_seconds=DISPATCH_INTERVAL)
+    except Exception as e:
+        print(f"Error initializing task dispatcher: {e}")
 
 # --- API Endpoints ---
 
+def read_collection(collection: str):
+    """
+    A page of `collection` as a JSON array, with filters, projection and
+    cursor pagination from the query string (see read_api.parse_query). The
+    cursor for the next page is in the X-Next-Cursor header. Pages are
+    cached briefly and carry an ETag, so an unchanged page is a 304.
+    """
+    try:
+        query = parse_query(collection, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    key = tuple(sorted(request.args.items(multi=True)))
+    page = read_cache.get(collection, key)
+    if page is None:
+        try:
+            documents, next_cursor = fetch_page(db, collection, query)
+        except ConnectionFailure as e:
+            # Database unreachable or every pooled connection busy for waitQueueTimeoutMS
+            print(f"MongoDB unavailable while fetching {collection}: {e}")
+            return jsonify({"error": "Database unavailable, try again shortly"}), 503
+        except Exception as e:
+            print(f"Error fetching {collection} from MongoDB: {e}")
+            return jsonify({"error": f"Failed to fetch {collection[:-1]} data"}), 500
+        body = app.json.dumps(documents).encode()
+        page = Page(body, make_etag(body), next_cursor)
+        read_cache.put(collection, key, page)
+
+    response = Response(page.body, mimetype="application/json")
+    response.set_etag(page.etag)
+    response.headers["Cache-Control"] = "no-cache" # Revalidate every time; the ETag makes that cheap
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return response.make_conditional(request)
+
 @app.route("/api/bots", methods=["GET"])
 def get_bots():
-    """Fetches bot data from MongoDB."""
-    # Ensure MongoDB operations handle potential errors gracefully
-    try:
-        bots = list(db.bots.find({}, {'_id': 0}))  # Exclude internal _id field
-        return jsonify(bots)
-    except Exception as e:
-        print(f"Error fetching bots from MongoDB: {e}")
-        return jsonify({"error": "Failed to fetch bot data"}), 500
+    """Fetches bot data from MongoDB (?status=&room=&priority=&fields=&limit=&cursor=)."""
+    return read_collection("bots")
 
 @app.route("/api/tasks", methods=["GET"])
 def get_tasks():
-    """Fetches task data from MongoDB."""
+    """Fetches task data from MongoDB (?status=&room=&priority=&fields=&limit=&cursor=)."""
+    return read_collection("tasks")
+
+def _event_json(data) -> str:
+    # Values the JSON provider doesn't know (e.g. nested ObjectIds) go out as strings
+    def default(value):
+        try:
+            return app.json.default(value)
+        except TypeError:
+            return str(value)
+    return json.dumps(data, default=default, separators=(",", ":"))
+
+@app.route("/api/events", methods=["GET"])
+def stream_events():
+    """
+    Server-Sent Events: deltas to bots, tasks and patients (from MongoDB
+    change streams) and bot_state events (location, shutdown) as they
+    happen. ?topics=tasks,bot_state picks topics; a reconnecting
+    EventSource resumes from its Last-Event-ID. A "resync" event means
+    updates were missed and the lists should be fetched again.
+    """
+    topics = {topic for topic in request.args.get('topics', '').split(',') if topic} or None
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
     try:
-        tasks = list(db.tasks.find({}, {'_id': 0}))
-        return jsonify(tasks)
-    except Exception as e:
-        print(f"Error fetching tasks from MongoDB: {e}")
-        return jsonify({"error": "Failed to fetch task data"}), 500
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Invalid Last-Event-ID"}), 400
+    subscription = event_bus.subscribe(topics, last_event_id)
 
-@app.route('/api/bot_status', methods=['GET'])
-def get_bot_status():
-    """Returns the current status of the bot (location, shutdown state)."""
-    if porter_bot is None:
-        return jsonify({"error": "Bot not initialized"}), 500
-    
+    def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                event = subscription.get(timeout=EVENTS_HEARTBEAT)
+                if event is None:
+                    yield ": keep-alive\n\n" # Also how a closed connection is noticed
+                    continue
+                yield f"id: {event.id}\nevent: {event.topic}\ndata: {_event_json(event.data)}\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/api/events/stats", methods=["GET"])
+def get_event_stats():
+    return jsonify({"bus": event_bus.summary(), "change_streams": change_relay.summary()})
+
+@app.route("/api/db/stats", methods=["GET"])
+def get_db_stats():
+    """
+    Connection pool metrics, the start-up index report (null until it
+    finishes) and, with PORTER_SLOW_QUERY_MS set, the recent slow queries
+    and their plans.
+    """
+    return jsonify({
+        "connection": database.summary(),
+        "indexes": index_report,
+        "slow_queries": query_profiler.summary() if query_profiler is not None else None,
+    })
+
+@app.route("/api/read_cache/stats", methods=["GET"])
+def get_read_cache_stats():
+    return jsonify(read_cache.summary())
+
+def bot_status(bot):
+    """Current status of a bot (location, shutdown state)."""
     # You might want to expand this to include more details from the bot object
     # For now, we fetch location directly from the bot instance
+    return {
+        "id": bot.id,
+        "location": bot.current_node.name if bot.current_node else "Unknown",
+        "is_listening_enabled": bot.voice_recorder.speech_enabled, # Reflects if STT is enabled (backend)
+        "is_wake_word_listening": bot is porter_bot and wake_listener is not None and wake_listener.running,
+        "is_shutdown": bot.gcp._do_shutdown, # Reflects if bot is logically shutting down
+        "pending_commands": fleet.pending(bot.id)
+    }
+
+@app.route('/api/dispatcher/stats', methods=['GET'])
+def get_dispatcher_stats():
+    """Assignments made, tick latency per strategy and how long tasks waited for a bot."""
+    if dispatch_service is None:
+        return jsonify({"error": "Dispatcher not initialized"}), 500
+    return jsonify(dispatch_service.summary())
+
+@app.route('/api/dispatcher/tick', methods=['POST'])
+def run_dispatcher_tick():
+    """Assigns open tasks right away instead of waiting for the next tick."""
+    if dispatch_service is None:
+        return jsonify({"error": "Dispatcher not initialized"}), 500
+    assignments = dispatch_service.tick()
+    if assignments:
+        read_cache.invalidate("tasks", "bots")
+    return jsonify([
+        {"task_id": a.task_id, "bot": a.bot_id, "room": a.room.name, "distance": a.distance}
+        for a in assignments
+    ])
+
+@app.route('/api/tasks/<int:task_id>/complete', methods=['POST'])
+def complete_task(task_id):
+    if dispatch_service is None:
+        return jsonify({"error": "Dispatcher not initialized"}), 500
+    if not dispatch_service.complete_task(task_id):
+        return jsonify({"error": f"Unknown task {task_id}"}), 404
+    read_cache.invalidate("tasks", "bots")
+    return jsonify({"status": "success"})
+
+@app.route('/api/bots/<bot_id>/deliveries', methods=['POST'])
+def plan_bot_deliveries(bot_id):
+    """Sends one bot through several open tasks ({"task_ids": [...]}) in a single planned trip."""
+    if dispatch_service is None:
+        return jsonify({"error": "Dispatcher not initialized"}), 500
+    if bot_id not in fleet:
+        return jsonify({"error": f"Unknown bot '{bot_id}'"}), 404
+    data = request.get_json(silent=True) or {}
+    task_ids = data.get('task_ids')
+    if not isinstance(task_ids, list) or not task_ids:
+        return jsonify({"error": "No task_ids provided"}), 400
+
+    plan, rejected = dispatch_service.plan_deliveries(bot_id, task_ids)
+    read_cache.invalidate("tasks", "bots")
+    if plan is None:
+        return jsonify({"error": "None of the tasks could be claimed", "rejected": rejected}), 409
     return jsonify({
-        "id": porter_bot.id,
-        "location": porter_bot.current_node.name if porter_bot.current_node else "Unknown",
-        "is_listening_enabled": porter_bot.voice_recorder.speech_enabled, # Reflects if STT is enabled (backend)
-        "is_shutdown": porter_bot.gcp._do_shutdown # Reflects if bot is logically shutting down
+        "order": [{"task_id": stop.task_id, "room": stop.room.name} for stop in plan.stops],
+        "distance": plan.distance,
+        "late_stops": plan.late_stops,
+        "method": plan.method,
+        "rejected": rejected,
     })
 
+@app.route('/api/map/edges', methods=['POST'])
+def update_map_edge():
+    """
+    Blocks, reopens or reweights a corridor at runtime, e.g.
+    {"from": "hall 3", "to": "room 301", "blocked": true} or {..., "distance": 40}.
+    Bots on the way reroute from where they are; only the cached routes that
+    used (or would now use) the corridor are dropped.
+    """
+    if fleet is None:
+        return jsonify({"error": "Bot not initialized"}), 500
+    data = request.get_json(silent=True) or {}
+    node_a = fleet.graph.find_node(str(data.get('from') or ''))
+    node_b = fleet.graph.find_node(str(data.get('to') or ''))
+    if node_a is None or node_b is None:
+        return jsonify({"error": "Unknown room in 'from' or 'to'"}), 404
+    try:
+        if 'distance' in data:
+            fleet.graph.set_edge_weight(node_a.id, node_b.id, float(data['distance']))
+        if data.get('blocked') is True:
+            fleet.graph.block_edge(node_a.id, node_b.id)
+        elif data.get('blocked') is False:
+            fleet.graph.unblock_edge(node_a.id, node_b.id)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    route_table = fleet.navigator.route_table
+    invalidated = 0
+    if route_table is not None:
+        before = route_table.invalidated
+        route_table.sync()
+        invalidated = route_table.invalidated - before
+    return jsonify({
+        "from": node_a.name,
+        "to": node_b.name,
+        "distance": fleet.graph.edge_distance(node_a.id, node_b.id),
+        "blocked": fleet.graph.is_blocked(node_a.id, node_b.id),
+        "routes_invalidated": invalidated,
+    })
+
+@app.route('/api/map/edges/blocked', methods=['GET'])
+def get_blocked_edges():
+    if fleet is None:
+        return jsonify({"error": "Bot not initialized"}), 500
+    nodes = fleet.graph.nodes
+    return jsonify([{"from": nodes[a].name, "to": nodes[b].name} for a, b in sorted(fleet.graph.blocked)])
+
+@app.route('/api/bot_status', methods=['GET'])
+def get_bot_status():
+    """Returns the current status of the default bot."""
+    if porter_bot is None:
+        return jsonify({"error": "Bot not initialized"}), 500
+    return jsonify(bot_status(porter_bot))
+
+@app.route('/api/bots/<bot_id>/status', methods=['GET'])
+def get_fleet_bot_status(bot_id):
+    bot = fleet.get(bot_id) if fleet is not None else None
+    if bot is None:
+        return jsonify({"error": f"Unknown bot '{bot_id}'"}), 404
+    return jsonify(bot_status(bot))
+
+@app.route('/api/parser_stats', methods=['GET'])
+def get_parser_stats():
+    """Hit rate and latency of the local parser vs. the Gemini fallback."""
+    if porter_bot is None:
+        return jsonify({"error": "Bot not initialized"}), 500
+    return jsonify(porter_bot.gcp.parse_stats.summary())
+
+@app.route('/api/parser_cache/invalidate', methods=['POST'])
+def invalidate_parser_cache():
+    """Drops cached Gemini parses, e.g. after editing graph.json or the phrase mappings."""
+    if porter_bot is None:
+        return jsonify({"error": "Bot not initialized"}), 500
+    porter_bot.gcp.parse_cache.invalidate()
+    return jsonify({"status": "success"})
+
+def execute_command(bot, command, destination):
+    """Runs a parsed command on the bot. Returns (status, response_message)."""
+    status = "success"
+    response_message = ""
+    try:
+        if command == 'move':
+            # move_to_room itself prints the path, execution, etc.
+            result = bot.move_to_room(destination)
+            if result == "already_there":
+                response_message = f"Porter is already in {destination}."
+            else:
+                response_message = f"Successfully arrived at {bot.current_node.name}."
+        elif command == 'shutdown':
+            bot.shutdown()
+            response_message = "Porter is shutting down. Goodbye!"
+            status = "shutdown_initiated"
+        else:
+            status = "unknown_command"
+            response_message = "Sorry, I didn't understand that command. Please try again."
+    except ValueError as e:
+        status = "error"
+        response_message = f"Navigation Error: {e}"
+        print(response_message)
+    except RuntimeError as e:
+        status = "error"
+        response_message = f"Bot Execution Error: {e}"
+        print(response_message)
+    except Exception as e:
+        status = "error"
+        response_message = f"An unexpected error occurred: {e}"
+        print(response_message)
+    return status, response_message
+
+def run_voice_command(bot, command_text):
+    """Parses and executes a command heard by the wake-word listener."""
+    print(f"Voice command: {command_text}")
+    command, params = bot.gcp.parse_command_with_gemini(command_text)
+    status, response_message = execute_command(bot, command, params[0] if params else None)
+    print(response_message)
+    return status, response_message
+
+# --- Wake-word listening (optional) ---
+wake_listener = None
+if porter_bot is not None and WAKE_WORD_TEMPLATES:
+    try:
+        from wake_word import TemplateKeywordSpotter, WakeWordListener
+
+        spotter = TemplateKeywordSpotter.from_wavs(path.strip() for path in WAKE_WORD_TEMPLATES.split(','))
+        # Heard commands join the same per-bot queue as API commands
+        wake_listener = WakeWordListener(
+            porter_bot.voice_recorder, spotter,
+            lambda text: fleet.submit(porter_bot.id, run_voice_command, porter_bot, text))
+    except Exception as e:
+        print(f"Error setting up wake-word listening: {e}")
+
 @app.route('/api/command', methods=['POST'])
 def handle_command():
     if porter_bot is None:
         return jsonify({"error": "Bot not initialized"}), 500
+    return run_command(porter_bot)
 
+@app.route('/api/bots/<bot_id>/command', methods=['POST'])
+def handle_fleet_command(bot_id):
+    bot = fleet.get(bot_id) if fleet is not None else None
+    if bot is None:
+        return jsonify({"error": f"Unknown bot '{bot_id}'"}), 404
+    return run_command(bot)
+
+def run_command(bot):
+    """Parses the request's commandText and queues it on the bot's worker."""
     data = request.get_json()
     command_text = data.get('commandText', '').strip()
     if not command_text:
         return jsonify({"status": "error", "message": "No command text provided."}), 400
 
-    # Prepare a buffer to capture all prints
-    buf = io.StringIO()
-    with contextlib.redirect_stdout(buf):
+    # Collects only this request's prints, even with other commands in flight
+    with capture_logs() as logs:
         # Echo the terminal-style prompt
-        print(f"Porter is currently in: {porter_bot.current_node.name}")
+        print(f"Porter is currently in: {bot.current_node.name}")
         print("Hi I'm Porter! How can I help you?")
         print('You can ask me to "move to [destination]" or "shutdown"')
         print(f"What is your input: {command_text}")
 
-        # Parse & execute
-        command, params = porter_bot.gcp.parse_command_with_gemini(command_text)
+        # Parsing runs concurrently on the server's request threads (threaded=True);
+        # execution is queued per bot
+        command, params = bot.gcp.parse_command_with_gemini(command_text)
         destination = params[0] if params else None
         # show Gemini’s parse
         print(f"Gemini parsed: command={command!r}, destination={destination!r}, confidence=<n/a>")
 
-        status = "success"
-        response_message = ""
-        try:
-            if command == 'move':
-                # move_to_room itself prints the path, execution, etc.
-                result = porter_bot.move_to_room(destination)
-                if result == "already_there":
-                    response_message = f"Porter is already in {destination}."
-                else:
-                    response_message = f"Successfully arrived at {porter_bot.current_node.name}."
-            elif command == 'shutdown':
-                porter_bot.shutdown()
-                response_message = "Porter is shutting down. Goodbye!"
-                status = "shutdown_initiated"
-            else:
-                status = "unknown_command"
-                response_message = "Sorry, I didn't understand that command. Please try again."
-        except ValueError as e:
-            status = "error"
-            response_message = f"Navigation Error: {e}"
-            print(response_message)
-        except RuntimeError as e:
-            status = "error"
-            response_message = f"Bot Execution Error: {e}"
-            print(response_message)
-        except Exception as e:
-            status = "error"
-            response_message = f"An unexpected error occurred: {e}"
-            print(response_message)
+        status, response_message = fleet.submit(bot.id, execute_command, bot, command, destination).result()
 
         # Final status line
         print(response_message)
 
-    # Grab the full log
-    log = buf.getvalue().splitlines()
-
     return jsonify({
         "status": status,
         "message": response_message,
-        "bot_current_location": porter_bot.current_node.name,
-        "bot_is_shutdown": porter_bot.gcp._do_shutdown,
-        "log": log
+        "bot_current_location": bot.current_node.name,
+        "bot_is_shutdown": bot.gcp._do_shutdown,
+        "log": logs.lines()
     })
 
 @app.route("/api/patients", methods=["GET"])
 def get_patients():
-    patients = list(db.patients.find({}, {'_id': 0}))
-    return jsonify(patients)
+    """Patients; ?fields=name,room,status skips vitals, medications and notes. priority filters on riskLevel."""
+    return read_collection("patients")
+
+def is_reloader_parent() -> bool:
+    """True in the reloader's watcher process, which never serves requests."""
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        return False # The serving process the reloader started
+    if __name__ == "__main__":
+        return USE_RELOADER
+    # `flask run` reloads in debug mode
+    return os.environ.get("FLASK_RUN_FROM_CLI") == "true" and get_debug_flag()
+
+def start_background_services():
+    """
+    Starts the index build, wake-word listener, task dispatcher and change
+    relay in the serving process: under a WSGI server, `flask run` or
+    `python app.py`, but never in the reloader's watcher, so the microphone
+    is opened once.
+    """
+    if not BACKGROUND_SERVICES or is_reloader_parent():
+        return
+    if ENSURE_INDEXES:
+        # In the background: start-up doesn't wait on a slow or unreachable database
+        threading.Thread(target=_ensure_indexes, name="ensure-indexes", daemon=True).start()
+    if wake_listener is not None and porter_bot.voice_recorder.speech_enabled:
+        wake_listener.start()
+        print("Listening for the wake word...")
+    if dispatch_service is not None and DISPATCH_INTERVAL > 0:
+        dispatch_service.start()
+    change_relay.start()
+
+start_background_services()
 
 if __name__ == "__main__":
     print("Starting Flask API server on http://127.0.0.1:3000")
-    app.run(host="0.0.0.0", debug=True, port=3000)
+    app.run(host="0.0.0.0", debug=True, port=3000, threaded=True, use_reloader=USE_RELOADER)
@@ -0,0 +1,164 @@
+# change_stream_relay.py
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from event_bus import EventBus
+
+# Field the dashboard identifies documents by, per watched collection
+KEY_FIELDS = {"bots": "name", "tasks": "task_id", "patients": "id"}
+
+# Server error codes meaning change streams can't work here at all
+_NOT_A_REPLICA_SET = {40573, 40324} # Standalone mongod; $changeStream not supported
+_UNKNOWN_FIELD = 40415 # e.g. fullDocumentBeforeChange before MongoDB 6.0
+
+
+class ChangeStreamRelay:
+    """
+    Turns MongoDB change stream events on the bots, tasks and patients
+    collections into deltas on the event bus:
+
+        {"op": "insert",  "key": ..., "document": {...}}
+        {"op": "update",  "key": ..., "changes": {"status": "assigned", ...}, "removed": [...]}
+        {"op": "replace", "key": ..., "document": {...}}
+        {"op": "delete",  "key": ...}
+        {"op": "reset",   "key": None}    (collection dropped: reload it)
+
+    published under the collection's name, where `key` is the document's
+    KEY_FIELDS value. Updates carry only the changed fields. The stream is
+    read without full-document lookups; the keys of updated and deleted
+    documents come from an _id -> key map filled as documents are seen (an
+    update to a document the map doesn't know fetches its key once). A
+    delete carries its key in the pre-image where the collection has
+    changeStreamPreAndPostImages enabled (MongoDB 6.0+; the replica set
+    script turns it on); a delete the relay can't key is published as a
+    reset. Older servers are watched without pre-images.
+
+    Change streams need a replica set (see System/scripts/mongo/
+    start_replica_set.sh). On a standalone server the relay logs it once and
+    stops, and /api/events carries in-process bot events only. After a
+    dropped connection it resumes from the last event it saw.
+    """
+
+    def __init__(self, db, bus: EventBus, key_fields: Optional[Dict[str, str]] = None,
+                 on_change: Optional[Callable[[str], None]] = None, retry_seconds: float = 5.0):
+        self.db = db
+        self.bus = bus
+        self.key_fields = dict(key_fields) if key_fields is not None else dict(KEY_FIELDS)
+        # Called with the collection name on every change, e.g. to drop cached pages
+        self.on_change = on_change
+        self.retry_seconds = retry_seconds
+        self.relayed = 0
+        self.available: Optional[bool] = None # None until the first stream is opened
+        self._keys: Dict[str, Dict[Any, Any]] = {}
+        self._resume_token = None
+        self._pre_images = True # Cleared if the server doesn't know fullDocumentBeforeChange
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="change-stream-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._watch()
+            except OperationFailure as e:
+                if e.code in _NOT_A_REPLICA_SET:
+                    self.available = False
+                    print(f"Change streams unavailable ({e}); /api/events will only carry bot state. "
+                          "Run MongoDB as a replica set for database updates.")
+                    return
+                if e.code == _UNKNOWN_FIELD and self._pre_images:
+                    self._pre_images = False
+                    print("Change stream pre-images need MongoDB 6.0+; deletes of documents the relay "
+                          "hasn't seen will be sent as resets.")
+                    continue
+                print(f"Change stream error: {e}")
+                self._resume_token = None # The token itself may be the problem; start over
+            except PyMongoError as e:
+                print(f"Change stream interrupted: {e}")
+            self._stop.wait(self.retry_seconds)
+
+    def _watch(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": list(self.key_fields)}}}]
+        with self.db.watch(pipeline, resume_after=self._resume_token, max_await_time_ms=1000,
+                           full_document_before_change="whenAvailable" if self._pre_images else None) as stream:
+            self.available = True
+            if self._resume_token is None:
+                # Fresh stream: events before it are lost, so forget the key map and have clients reload
+                self._keys.clear()
+                self.bus.resync()
+            while not self._stop.is_set() and stream.alive:
+                change = stream.try_next()
+                if change is None:
+                    continue
+                self._resume_token = stream.resume_token
+                if change["operationType"] == "invalidate":
+                    self._resume_token = None # Collection or database dropped; this stream is over
+                    return
+                self._relay(change)
+
+    def _relay(self, change: Dict[str, Any]):
+        collection = change.get("ns", {}).get("coll")
+        delta = self.delta(collection, change)
+        if delta is None:
+            return
+        self.relayed += 1
+        if self.on_change is not None:
+            self.on_change(collection)
+        self.bus.publish(collection, delta)
+
+    def delta(self, collection: str, change: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The bus payload for one change event, or None for events the dashboard doesn't need."""
+        if collection not in self.key_fields:
+            return None
+        keys = self._keys.setdefault(collection, {})
+        field = self.key_fields[collection]
+        operation = change["operationType"]
+        document_id = change.get("documentKey", {}).get("_id")
+
+        if operation in ("insert", "replace"):
+            document = {k: v for k, v in change["fullDocument"].items() if k != "_id"}
+            keys[document_id] = document.get(field)
+            return {"op": operation, "key": keys[document_id], "document": document}
+        if operation == "update":
+            description = change.get("updateDescription", {})
+            changes = description.get("updatedFields", {})
+            key, new_key = self._key(collection, document_id), changes.get(field)
+            if new_key is not None:
+                keys[document_id] = new_key
+            return {"op": "update", "key": key, "changes": changes, "removed": description.get("removedFields", [])}
+        if operation == "delete":
+            key = keys.pop(document_id, None)
+            if key is None:
+                key = (change.get("fullDocumentBeforeChange") or {}).get(field)
+            if key is None:
+                return {"op": "reset", "key": None} # Deleted before we learned its key
+            return {"op": "delete", "key": key}
+        if operation in ("drop", "rename", "dropDatabase"):
+            keys.clear()
+            return {"op": "reset", "key": None}
+        return None
+
+    def _key(self, collection: str, document_id: Any) -> Any:
+        keys = self._keys[collection]
+        if document_id not in keys:
+            # Not seen on this stream yet: look it up once
+            document = self.db[collection].find_one({"_id": document_id}, {self.key_fields[collection]: 1})
+            keys[document_id] = document.get(self.key_fields[collection]) if document else None
+        return keys[document_id]
+
+    def summary(self) -> Dict[str, Any]:
+        return {"available": self.available, "relayed": self.relayed}
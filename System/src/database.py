@@ -0,0 +1,251 @@
+# database.py
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
+
+from latency_stats import LatencyStats
+
+DEFAULT_URI = "mongodb://localhost:27017"
+
+
+class DatabaseConfig(NamedTuple):
+    uri: str = DEFAULT_URI
+    name: str = "porter_db"
+    max_pool_size: int = 50               # Connections per server; requests wait when all are checked out
+    min_pool_size: int = 0
+    max_idle_time_ms: int = 300000        # Close connections idle this long
+    wait_queue_timeout_ms: int = 2000     # Max wait for a free connection before failing the request
+    connect_timeout_ms: int = 5000
+    server_selection_timeout_ms: int = 5000 # How long an operation waits for a reachable server
+    socket_timeout_ms: int = 0            # 0 = none; commands can take as long as they take
+    read_preference: str = "primary"      # Or primaryPreferred / secondaryPreferred for dashboards
+    retry_reads: bool = True
+    retry_writes: bool = True
+    app_name: str = "porter-api"          # Shows up in server logs and currentOp
+
+    @classmethod
+    def from_env(cls) -> "DatabaseConfig":
+        """MONGODB_URI, MONGODB_DB and PORTER_MONGO_* settings; anything unset keeps its default."""
+        defaults = cls()
+        def env(name: str, default: Any) -> Any:
+            value = os.getenv(name)
+            if value is None or value == "":
+                return default
+            if isinstance(default, bool):
+                return value.lower() in ("1", "true", "yes")
+            return type(default)(value)
+        return cls(
+            uri=env("MONGODB_URI", defaults.uri),
+            name=env("MONGODB_DB", defaults.name),
+            max_pool_size=env("PORTER_MONGO_MAX_POOL_SIZE", defaults.max_pool_size),
+            min_pool_size=env("PORTER_MONGO_MIN_POOL_SIZE", defaults.min_pool_size),
+            max_idle_time_ms=env("PORTER_MONGO_MAX_IDLE_MS", defaults.max_idle_time_ms),
+            wait_queue_timeout_ms=env("PORTER_MONGO_WAIT_QUEUE_TIMEOUT_MS", defaults.wait_queue_timeout_ms),
+            connect_timeout_ms=env("PORTER_MONGO_CONNECT_TIMEOUT_MS", defaults.connect_timeout_ms),
+            server_selection_timeout_ms=env("PORTER_MONGO_SERVER_SELECTION_TIMEOUT_MS",
+                                            defaults.server_selection_timeout_ms),
+            socket_timeout_ms=env("PORTER_MONGO_SOCKET_TIMEOUT_MS", defaults.socket_timeout_ms),
+            read_preference=env("PORTER_MONGO_READ_PREFERENCE", defaults.read_preference),
+            retry_reads=env("PORTER_MONGO_RETRY_READS", defaults.retry_reads),
+            retry_writes=env("PORTER_MONGO_RETRY_WRITES", defaults.retry_writes),
+            app_name=env("PORTER_MONGO_APP_NAME", defaults.app_name),
+        )
+
+    def client_options(self) -> Dict[str, Any]:
+        """Keyword arguments for MongoClient / AsyncMongoClient."""
+        return {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "maxIdleTimeMS": self.max_idle_time_ms,
+            "waitQueueTimeoutMS": self.wait_queue_timeout_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "socketTimeoutMS": self.socket_timeout_ms or None,
+            "readPreference": self.read_preference,
+            "retryReads": self.retry_reads,
+            "retryWrites": self.retry_writes,
+            "appname": self.app_name,
+        }
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool counters from the driver's pool events: how long
+    requests waited to check out a connection (p50/p95), how many
+    connections are open and checked out, and checkouts that failed (a
+    "timeout" means the pool was exhausted for waitQueueTimeoutMS).
+    """
+
+    def __init__(self):
+        self.wait_stats = LatencyStats()
+        self.checkouts = 0
+        self.checked_out = 0
+        self.open = 0
+        self.created = 0
+        self.cleared = 0
+        self.failed: Dict[str, int] = {}
+        self._started = threading.local() # Fallback for drivers without event durations
+        self._lock = threading.Lock()
+
+    def connection_check_out_started(self, event):
+        self._started.at = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        self._record_wait(event)
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+
+    def connection_check_out_failed(self, event):
+        self._record_wait(event)
+        with self._lock:
+            self.failed[str(event.reason)] = self.failed.get(str(event.reason), 0) + 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.created += 1
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open = max(0, self.open - 1)
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.cleared += 1
+
+    # Not needed for the counters
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def _record_wait(self, event):
+        duration = getattr(event, "duration", None) # Seconds, on recent drivers
+        if duration is None:
+            started = getattr(self._started, "at", None)
+            duration = time.perf_counter() - started if started is not None else 0.0
+        self.wait_stats.record("checkout_wait", duration)
+
+    def summary(self) -> Dict[str, Any]:
+        wait = self.wait_stats.summary()["paths"].get("checkout_wait", {})
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "open": self.open,
+                "created": self.created,
+                "cleared": self.cleared,
+                "checkout_failures": dict(self.failed),
+                "wait_ms": {key: wait[key] for key in ("avg_ms", "p50_ms", "p95_ms") if key in wait},
+            }
+
+
+class Database:
+    """
+    The API's shared MongoDB access: one pooled client per process, created
+    on first use and configured from DatabaseConfig. Nothing touches the
+    network at start-up, so the server comes up even while the database is
+    slow or down; requests made meanwhile fail after
+    server_selection_timeout_ms and succeed once it's back.
+
+    Use `database.db` (or `database["tasks"]`, `database.tasks`) for the
+    porter_db handle. Async code can use `async_db()`, which gives each event
+    loop its own async client sharing the same settings.
+    """
+
+    def __init__(self, config: Optional[DatabaseConfig] = None,
+                 event_listeners: Sequence[Any] = ()):
+        self.config = config if config is not None else DatabaseConfig.from_env()
+        self.pool_metrics = PoolMetrics()
+        self.event_listeners: List[Any] = [self.pool_metrics, *event_listeners]
+        self._client: Optional[MongoClient] = None
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> MongoClient:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    # connect=False: the pool's first connection is opened by the first operation
+                    self._client = MongoClient(self.config.uri, connect=False, event_listeners=self.event_listeners,
+                                               **self.config.client_options())
+        return self._client
+
+    @property
+    def db(self):
+        return self.client[self.config.name]
+
+    def __getitem__(self, collection: str):
+        return self.db[collection]
+
+    def __getattr__(self, name: str):
+        # Everything else (collections, watch, command) goes to the database handle
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.db, name)
+
+    def ping(self) -> bool:
+        try:
+            self.client.admin.command("ping")
+            return True
+        except PyMongoError:
+            return False
+
+    def async_db(self):
+        """
+        porter_db on an async client for the running event loop: PyMongo's
+        AsyncMongoClient, or Motor on drivers that predate it. Async clients
+        are bound to the loop they were created on, hence one per loop.
+
+        Meant for a long-lived loop (an ASGI server, a worker). Flask runs
+        each async view in a fresh loop, so a view would get a new client
+        and pool per request; views keep using the shared sync client, e.g.
+        through asyncio.to_thread.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            try:
+                from pymongo import AsyncMongoClient
+            except ImportError:
+                from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+            client = AsyncMongoClient(self.config.uri, event_listeners=self.event_listeners,
+                                      **self.config.client_options())
+            self._async_clients[loop] = client
+        return client[self.config.name]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "connected": self._client is not None and self.pool_metrics.checkouts > 0,
+            "database": self.config.name,
+            "max_pool_size": self.config.max_pool_size,
+            "wait_queue_timeout_ms": self.config.wait_queue_timeout_ms,
+            "read_preference": self.config.read_preference,
+            "pool": self.pool_metrics.summary(),
+        }
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
@@ -0,0 +1,101 @@
+# db_indexes.py
+
+from typing import Any, Dict, List, NamedTuple
+
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+
+# Prefix of every index this module owns; others (e.g. made by hand in Atlas) are left alone
+INDEX_PREFIX = "porter_"
+
+# IndexOptionsConflict / IndexKeySpecsConflict: the keys are already indexed under another name
+_CONFLICT_CODES = {85, 86}
+
+
+class IndexSpec(NamedTuple):
+    name: str
+    keys: List[Any]
+    unique: bool = False
+
+
+# What each query needs, in equality-sort-range order. The list endpoints
+# (read_api) filter on one field and page on _id; the dispatcher looks for
+# unassigned open tasks in task_id order and claims tasks by task_id; the
+# ingest script upserts on bot_id, task_id and id.
+INDEXES: Dict[str, List[IndexSpec]] = {
+    "bots": [
+        IndexSpec("porter_bots_name", [("name", ASCENDING)], unique=True),
+        IndexSpec("porter_bots_bot_id", [("bot_id", ASCENDING)]), # Not unique: bots added by the API have none
+        IndexSpec("porter_bots_status", [("status", ASCENDING), ("_id", ASCENDING)]),
+        IndexSpec("porter_bots_location", [("location", ASCENDING), ("_id", ASCENDING)]),
+        IndexSpec("porter_bots_priority", [("priority", ASCENDING), ("_id", ASCENDING)]),
+    ],
+    "tasks": [
+        IndexSpec("porter_tasks_task_id", [("task_id", ASCENDING)], unique=True),
+        IndexSpec("porter_tasks_open", [("assignedBot", ASCENDING), ("status", ASCENDING), ("task_id", ASCENDING)]),
+        IndexSpec("porter_tasks_status", [("status", ASCENDING), ("_id", ASCENDING)]),
+        IndexSpec("porter_tasks_room", [("room", ASCENDING), ("_id", ASCENDING)]),
+        IndexSpec("porter_tasks_priority", [("priority", ASCENDING), ("_id", ASCENDING)]),
+    ],
+    "patients": [
+        IndexSpec("porter_patients_id", [("id", ASCENDING)], unique=True),
+        IndexSpec("porter_patients_status", [("status", ASCENDING), ("_id", ASCENDING)]),
+        IndexSpec("porter_patients_room", [("room", ASCENDING), ("_id", ASCENDING)]),
+        IndexSpec("porter_patients_risk", [("riskLevel", ASCENDING), ("_id", ASCENDING)]),
+    ],
+}
+
+
+def ensure_indexes(db, indexes: Dict[str, List[IndexSpec]] = INDEXES, drop_unknown: bool = False) -> Dict[str, Any]:
+    """
+    Creates the declared indexes; safe to run at every start-up, since
+    existing identical indexes are left as they are. An index of ours whose
+    definition changed is dropped and rebuilt. With `drop_unknown`, indexes
+    with our prefix that are no longer declared are dropped too.
+
+    A failure (e.g. duplicate task_ids blocking a unique index) is reported and
+    the remaining indexes are still created; the app works without them,
+    just slower.
+
+    Returns {"created": [...], "rebuilt": [...], "dropped": [...], "failed": {name: error}}.
+    """
+    report: Dict[str, Any] = {"created": [], "rebuilt": [], "dropped": [], "failed": {}}
+    for collection_name, specs in indexes.items():
+        collection = db[collection_name]
+        try:
+            existing = {index["name"]: index for index in collection.list_indexes()}
+        except PyMongoError as e:
+            for spec in specs:
+                report["failed"][spec.name] = str(e)
+            continue
+
+        for spec in specs:
+            current = existing.get(spec.name)
+            if current is not None and _matches(current, spec):
+                continue
+            try:
+                if current is not None:
+                    collection.drop_index(spec.name)
+                collection.create_index(spec.keys, name=spec.name, unique=spec.unique)
+                report["rebuilt" if current is not None else "created"].append(spec.name)
+            except OperationFailure as e:
+                # Conflict: the same keys exist under another name; theirs is kept
+                report["failed"][spec.name] = \
+                    f"conflicts with an existing index: {e}" if e.code in _CONFLICT_CODES else str(e)
+            except PyMongoError as e:
+                report["failed"][spec.name] = str(e)
+
+        if drop_unknown:
+            declared = {spec.name for spec in specs}
+            for name in existing:
+                if name.startswith(INDEX_PREFIX) and name not in declared:
+                    try:
+                        collection.drop_index(name)
+                        report["dropped"].append(name)
+                    except PyMongoError as e:
+                        report["failed"][name] = str(e)
+    return report
+
+
+def _matches(index: Dict[str, Any], spec: IndexSpec) -> bool:
+    return list(index["key"].items()) == [tuple(key) for key in spec.keys] and bool(index.get("unique")) == spec.unique
@@ -0,0 +1,258 @@
+# dispatch_service.py
+
+import datetime
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from graph import Node
+from dispatcher import Assignment, BotCandidate, Dispatcher, TaskRequest
+from route_planner import RoutePlan, Stop
+from latency_stats import LatencyStats
+from fleet import Fleet
+
+OPEN_TASK_STATUSES = ["pending", "queued"]
+
+
+class DispatchService:
+    """
+    Connects the Dispatcher to MongoDB and the fleet.
+
+    Every tick it reads unassigned pending/queued tasks and the idle bots
+    (not charging, no task, nothing queued), assigns them and sends each
+    chosen bot to its task's room through the bot's command queue. A task is
+    claimed with a conditional update, so two API processes never hand the
+    same task out twice. If a trip fails, its unfinished tasks are handed
+    back (open again, no bot) and the bot is free for the next tick.
+    """
+
+    def __init__(self, db, fleet: Fleet, dispatcher: Dispatcher, interval_seconds: float = 5.0):
+        self.db = db
+        self.fleet = fleet
+        self.dispatcher = dispatcher
+        self.interval_seconds = interval_seconds
+        # Seconds from a task's createdAt to its assignment
+        self.wait_stats = LatencyStats()
+        self.assigned = 0
+        self._busy: Set[str] = set() # Bots sent out by this process, until their task is completed
+        self._unroutable: Set[Any] = set()
+        self._lock = threading.RLock() # Re-entered by a trip that failed before its done-callback was added
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="task-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Error dispatching tasks: {e}")
+
+    def tick(self) -> List[Assignment]:
+        """Assigns what can be assigned now and dispatches the bots."""
+        with self._lock:
+            tasks, documents = self._open_tasks()
+            bots = self._idle_bots()
+            if not tasks or not bots:
+                return []
+
+            dispatched = []
+            now = datetime.datetime.utcnow()
+            for assignment in self.dispatcher.assign(tasks, bots):
+                # Only claim tasks nobody else has claimed since we read them
+                claimed = self.db.tasks.update_one(
+                    {"task_id": assignment.task_id, "assignedBot": None, "status": {"$in": OPEN_TASK_STATUSES}},
+                    {"$set": {"status": "assigned", "assignedBot": assignment.bot_id, "assignedAt": now}},
+                )
+                if claimed.modified_count == 0:
+                    continue
+                self.db.bots.update_one(
+                    {"name": assignment.bot_id},
+                    {"$set": {"status": "active", "task": f"Task {assignment.task_id} in {assignment.room.name}"}},
+                )
+                self._busy.add(assignment.bot_id)
+                created_at = documents[assignment.task_id].get("createdAt")
+                if isinstance(created_at, datetime.datetime):
+                    self.wait_stats.record("task_wait", (now - created_at.replace(tzinfo=None)).total_seconds())
+                bot = self.fleet.get(assignment.bot_id)
+                trip = self.fleet.submit(assignment.bot_id, self._travel, bot, assignment)
+                trip.add_done_callback(self._on_trip_done(
+                    assignment.bot_id, {assignment.task_id: documents[assignment.task_id]["status"]}))
+                dispatched.append(assignment)
+            self.assigned += len(dispatched)
+            return dispatched
+
+    def complete_task(self, task_id: Any) -> bool:
+        """Marks a task done and frees its bot for the next tick."""
+        task = self.db.tasks.find_one_and_update(
+            {"task_id": task_id}, {"$set": {"status": "completed"}}, projection={"_id": 0, "assignedBot": 1})
+        if task is None:
+            return False
+        bot_id = task.get("assignedBot")
+        if bot_id:
+            self.db.bots.update_one({"name": bot_id}, {"$set": {"task": None}})
+            with self._lock:
+                self._busy.discard(bot_id)
+        return True
+
+    def plan_deliveries(self, bot_id: str, task_ids: List[Any]) -> Tuple[Optional[RoutePlan], List[Any]]:
+        """
+        Claims the given open tasks for one bot and sends it through all of
+        them in a single planned trip. Each task's optional `deadline`
+        (a date, or an ISO string) is passed to the route planner.
+
+        Returns the plan (None if nothing could be claimed) and the ids of
+        tasks that were not claimed: already taken, unknown, or off the map.
+        """
+        bot = self.fleet.get(bot_id)
+        if bot is None:
+            raise KeyError(bot_id)
+
+        now = datetime.datetime.utcnow()
+        stops: List[Stop] = []
+        rejected = []
+        with self._lock:
+            documents = {
+                document["task_id"]: document
+                for document in self.db.tasks.find(
+                    {"task_id": {"$in": list(task_ids)}, "status": {"$in": OPEN_TASK_STATUSES}, "assignedBot": None},
+                    {"_id": 0, "task_id": 1, "room": 1, "priority": 1, "deadline": 1, "status": 1},
+                )
+            }
+            for task_id in task_ids:
+                document = documents.get(task_id)
+                room = self._resolve_room(document.get("room")) if document else None
+                if room is None:
+                    rejected.append(task_id)
+                    continue
+                claimed = self.db.tasks.update_one(
+                    {"task_id": task_id, "assignedBot": None, "status": {"$in": OPEN_TASK_STATUSES}},
+                    {"$set": {"status": "assigned", "assignedBot": bot_id, "assignedAt": now}},
+                )
+                if claimed.modified_count == 0:
+                    rejected.append(task_id)
+                    continue
+                stops.append(Stop(room, document.get("priority") or "normal",
+                                  _seconds_until(document.get("deadline"), now), task_id))
+            if not stops:
+                return None, rejected
+
+            plan = bot.route_planner.plan(bot.current_node, stops)
+            for stop in plan.skipped:
+                # Unreachable from where the bot is: hand the task back
+                self.db.tasks.update_one(
+                    {"task_id": stop.task_id, "assignedBot": bot_id},
+                    {"$set": {"status": documents[stop.task_id]["status"], "assignedBot": None}},
+                )
+            rejected += [stop.task_id for stop in plan.skipped]
+            if not plan.stops:
+                return None, rejected
+
+            self._busy.add(bot_id)
+            self.assigned += len(plan.stops)
+            self.db.bots.update_one(
+                {"name": bot_id},
+                {"$set": {"status": "active", "task": f"{len(plan.stops)} deliveries, next in {plan.stops[0].room.name}"}},
+            )
+        trip = self.fleet.submit(bot_id, bot.move_to_rooms, plan.stops, self._arrived)
+        trip.add_done_callback(self._on_trip_done(
+            bot_id, {stop.task_id: documents[stop.task_id]["status"] for stop in plan.stops}))
+        return plan, rejected
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "assigned": self.assigned,
+            "strategy": self.dispatcher.strategy,
+            "ticks": self.dispatcher.stats.summary(),
+            "task_wait": self.wait_stats.summary(),
+            "route_planning": self.fleet.route_planner.stats.summary(),
+            "unroutable_tasks": sorted(self._unroutable, key=str),
+        }
+
+    def _travel(self, bot, assignment: Assignment):
+        bot.move_to_room(assignment.room.name)
+        self.db.tasks.update_one({"task_id": assignment.task_id}, {"$set": {"status": "in-progress"}})
+
+    def _arrived(self, stop: Stop):
+        self.db.tasks.update_one({"task_id": stop.task_id}, {"$set": {"status": "in-progress"}})
+
+    def _on_trip_done(self, bot_id: str, statuses: Dict[Any, str]) -> Callable[[Future], None]:
+        """Done-callback for a trip: on failure its tasks go back to `statuses` with no bot."""
+        def done(trip: Future):
+            error = trip.exception() if not trip.cancelled() else "cancelled"
+            if error is None:
+                return
+            print(f"Bot {bot_id} failed its trip: {error}")
+            for task_id, status in statuses.items():
+                self.db.tasks.update_one(
+                    {"task_id": task_id, "assignedBot": bot_id, "status": {"$in": ["assigned", "in-progress"]}},
+                    {"$set": {"status": status, "assignedBot": None}},
+                )
+            self.db.bots.update_one({"name": bot_id}, {"$set": {"task": None}})
+            with self._lock:
+                self._busy.discard(bot_id)
+        return done
+
+    def _open_tasks(self):
+        tasks: List[TaskRequest] = []
+        documents: Dict[Any, Dict[str, Any]] = {}
+        cursor = self.db.tasks.find(
+            {"status": {"$in": OPEN_TASK_STATUSES}, "assignedBot": None},
+            {"_id": 0, "task_id": 1, "room": 1, "priority": 1, "createdAt": 1, "status": 1},
+        ).sort("task_id", 1)
+        for document in cursor:
+            room = self._resolve_room(document.get("room"))
+            if room is None:
+                if document.get("task_id") not in self._unroutable:
+                    print(f"Task {document.get('task_id')}: room '{document.get('room')}' is not on the map.")
+                    self._unroutable.add(document.get("task_id"))
+                continue
+            tasks.append(TaskRequest(document["task_id"], room, document.get("priority") or "normal"))
+            documents[document["task_id"]] = document
+        return tasks, documents
+
+    def _idle_bots(self) -> List[BotCandidate]:
+        documents = {
+            document.get("name"): document
+            for document in self.db.bots.find({}, {"_id": 0, "name": 1, "status": 1, "battery": 1, "task": 1})
+        }
+        candidates = []
+        for bot in self.fleet.bots:
+            document = documents.get(bot.id, {})
+            if bot.id in self._busy or self.fleet.pending(bot.id) or document.get("task") \
+                    or document.get("status") == "charging" or bot.gcp._do_shutdown:
+                continue
+            candidates.append(BotCandidate(bot.id, bot.current_node, float(document.get("battery", 100))))
+        return candidates
+
+    def _resolve_room(self, room: Any) -> Optional[Node]:
+        if room is None:
+            return None
+        room = str(room)
+        # Tasks often store just the number ("301")
+        return self.fleet.graph.find_node(room) or self.fleet.graph.find_node(f"room {room}")
+
+
+def _seconds_until(deadline: Any, now: datetime.datetime) -> Optional[float]:
+    """Seconds from `now` (naive UTC) to a task's deadline, or None if it has none."""
+    if isinstance(deadline, str):
+        try:
+            deadline = datetime.datetime.fromisoformat(deadline)
+        except ValueError:
+            return None
+    if not isinstance(deadline, datetime.datetime):
+        return None
+    if deadline.tzinfo is not None:
+        deadline = deadline.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return (deadline - now).total_seconds()
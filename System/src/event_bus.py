@@ -0,0 +1,110 @@
+# event_bus.py
+
+import queue
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, NamedTuple, Optional, Set
+
+RESYNC = "resync" # Topic telling a subscriber it missed events and should reload the lists
+
+
+class Event(NamedTuple):
+    id: int
+    topic: str
+    data: Dict[str, Any]
+
+
+class Subscription:
+    """One listener's queue of events; `topics` None means everything."""
+
+    def __init__(self, topics: Optional[Set[str]], queue_size: int):
+        self.topics = topics
+        self._queue: "queue.Queue[Event]" = queue.Queue(maxsize=queue_size)
+
+    def wants(self, topic: str) -> bool:
+        return topic == RESYNC or self.topics is None or topic in self.topics
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """The next event, or None if nothing arrived within `timeout` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for live updates (bot state, database
+    changes) to /api/events clients.
+
+    Each subscriber has a bounded queue, so a stalled client can never hold
+    up publishers or grow memory without limit: when its queue is full, its
+    backlog is replaced by a single resync event. The last `history` events
+    are kept so a reconnecting client (SSE Last-Event-ID) gets what it missed,
+    or a resync if that has already been dropped.
+    """
+
+    def __init__(self, history: int = 1024, queue_size: int = 256):
+        self.queue_size = queue_size
+        self.published = 0
+        self.dropped = 0 # Subscribers sent a resync because they fell behind
+        self._history: Deque[Event] = deque(maxlen=history)
+        self._subscribers: List[Subscription] = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def publish(self, topic: str, data: Dict[str, Any]) -> Event:
+        with self._lock:
+            event = Event(self._next_id, topic, data)
+            self._next_id += 1
+            self.published += 1
+            self._history.append(event)
+            for subscription in self._subscribers:
+                if subscription.wants(topic):
+                    self._deliver(subscription, event)
+            return event
+
+    def resync(self) -> Event:
+        """Tells every subscriber to reload, e.g. after a change stream had to restart from scratch."""
+        return self.publish(RESYNC, {})
+
+    def subscribe(self, topics: Optional[Iterable[str]] = None, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        A new subscription. With `last_event_id`, the events published since
+        then are queued first (or a resync, if they are no longer all kept,
+        or if the id is one this bus never issued: the API restarted).
+        """
+        subscription = Subscription(set(topics) if topics is not None else None, self.queue_size)
+        with self._lock:
+            if last_event_id is not None and last_event_id >= self._next_id:
+                self._deliver(subscription, Event(self._next_id - 1, RESYNC, {}))
+            elif last_event_id is not None and last_event_id < self._next_id - 1:
+                oldest = self._history[0].id if self._history else self._next_id
+                if last_event_id < oldest - 1:
+                    self._deliver(subscription, Event(self._next_id - 1, RESYNC, {}))
+                else:
+                    for event in self._history:
+                        if event.id > last_event_id and subscription.wants(event.topic):
+                            self._deliver(subscription, event)
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def _deliver(self, subscription: Subscription, event: Event):
+        try:
+            subscription._queue.put_nowait(event)
+        except queue.Full:
+            # Too far behind for deltas to be useful: drop the backlog, ask for a reload
+            self.dropped += 1
+            with subscription._queue.mutex:
+                subscription._queue.queue.clear()
+            subscription._queue.put_nowait(Event(event.id, RESYNC, {}))
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"subscribers": len(self._subscribers), "published": self.published, "dropped": self.dropped,
+                    "last_event_id": self._next_id - 1}
@@ -0,0 +1,138 @@
+# fleet.py
+
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from graph import Graph, Node
+from navigator import Navigator
+from route_planner import RoutePlanner
+from reservations import CooperativePlanner
+from gcp import GCP
+from command_prompt import DESTINATION_MAPPINGS
+from llm_backend import LLMBackend, MicroBatcher, create_backend
+from parse_cache import ParseCache
+from speech_recognizer import SimpleVoiceRecorder
+from command_worker import CommandWorker
+from bot import Bot
+
+
+class Fleet:
+    """
+    Every bot driven by this API process.
+
+    The expensive pieces are created once and shared: the graph (read-only
+    apart from corridor closures), one Navigator and its route table, the
+    multi-stop route planner, the path reservation table (with
+    PORTER_PATH_RESERVATIONS=1), the LLM backend (plus micro-batcher and parse
+    cache) and the speech client. Each bot keeps its own location, command
+    parser state and CommandWorker, so bots run their commands in parallel
+    while each bot still runs its own commands in order.
+    """
+
+    def __init__(self, graph: Graph, backend: Optional[LLMBackend] = None,
+                 voice_recorder: Optional[SimpleVoiceRecorder] = None, navigator: Optional[Navigator] = None):
+        self.graph = graph
+        self.navigator = navigator if navigator is not None else Navigator(use_route_table=True)
+        self.navigator.precompute(graph)
+        # Map distance units per second, to check multi-stop trips against task deadlines
+        speed = float(os.getenv('PORTER_BOT_SPEED', '1.0'))
+        self.route_planner = RoutePlanner(graph, self.navigator, speed=speed)
+        # Bots book the corridors they'll use so paths don't cross head-on
+        self.traffic = CooperativePlanner(
+            graph, speed=speed, step_seconds=float(os.getenv('PORTER_RESERVATION_STEP_SECONDS', '1.0'))) \
+            if os.getenv('PORTER_PATH_RESERVATIONS', '0') == '1' else None
+
+        self.backend = backend if backend is not None else create_backend(
+            os.getenv('PORTER_LLM_BACKEND', 'gemini'), graph, DESTINATION_MAPPINGS)
+        batch_window_ms = float(os.getenv('PORTER_LLM_BATCH_WINDOW_MS', '0'))
+        self.batcher = MicroBatcher(self.backend, window_ms=batch_window_ms) \
+            if batch_window_ms > 0 and self.backend.supports_batching else None
+        self.parse_cache = ParseCache.from_env()
+        self.voice_recorder = voice_recorder if voice_recorder is not None else SimpleVoiceRecorder()
+
+        self._bots: Dict[str, Bot] = {}
+        self._workers: Dict[str, CommandWorker] = {}
+        self._state_listeners: List[Callable[[Bot, str, Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+        print(f"Fleet initialized with the {self.backend.name} backend.")
+
+    def add_bot(self, bot_id: str, start_node: Node) -> Bot:
+        """Creates a bot at `start_node` with its own command queue."""
+        with self._lock:
+            if bot_id in self._bots:
+                raise ValueError(f"Bot '{bot_id}' already exists.")
+            gcp = GCP(start_node, self.graph, backend=self.backend, parse_cache=self.parse_cache, batcher=self.batcher)
+            bot = Bot(bot_id, self.graph, start_node, navigator=self.navigator, gcp=gcp,
+                      voice_recorder=self.voice_recorder)
+            bot.route_planner = self.route_planner
+            bot.traffic = self.traffic
+            bot.state_listeners.extend(self._state_listeners)
+            if self.traffic is not None:
+                self.traffic.reservations.park(bot_id, start_node.id, self.traffic.now())
+            self._bots[bot_id] = bot
+            self._workers[bot_id] = CommandWorker(bot_id)
+            return bot
+
+    def add_bots_from_documents(self, documents: Iterable[Dict[str, Any]], default_node: Node) -> List[Bot]:
+        """
+        Adds a bot for every `bots` collection document ({"name": "Porter-01",
+        "location": ...}). Locations that aren't on the map start at `default_node`.
+        """
+        added = []
+        for document in documents:
+            name = document.get('name')
+            if not name or name in self._bots:
+                continue
+            location = document.get('location')
+            start_node = (self.graph.find_node(location) if location else None) or default_node
+            added.append(self.add_bot(name, start_node))
+        return added
+
+    def add_state_listener(self, listener: Callable[[Bot, str, Dict[str, Any]], None]):
+        """Calls `listener(bot, event, data)` on every bot's state changes, including bots added later."""
+        with self._lock:
+            self._state_listeners.append(listener)
+            for bot in self._bots.values():
+                bot.state_listeners.append(listener)
+
+    def remove_bot(self, bot_id: str):
+        with self._lock:
+            self._bots.pop(bot_id, None)
+            worker = self._workers.pop(bot_id, None)
+        if worker is not None:
+            worker.stop()
+        if self.traffic is not None:
+            self.traffic.reservations.release(bot_id)
+
+    def get(self, bot_id: str) -> Optional[Bot]:
+        return self._bots.get(bot_id)
+
+    def submit(self, bot_id: str, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queues `fn(*args)` on the bot's worker, behind its earlier commands."""
+        worker = self._workers.get(bot_id)
+        if worker is None:
+            raise KeyError(bot_id)
+        return worker.submit(fn, *args)
+
+    def pending(self, bot_id: str) -> int:
+        worker = self._workers.get(bot_id)
+        return worker.pending if worker is not None else 0
+
+    @property
+    def bots(self) -> List[Bot]:
+        return list(self._bots.values())
+
+    def __len__(self) -> int:
+        return len(self._bots)
+
+    def __contains__(self, bot_id: str) -> bool:
+        return bot_id in self._bots
+
+    def stop(self):
+        """Stops every bot's worker after its queued commands."""
+        with self._lock:
+            workers = list(self._workers.values())
+        for worker in workers:
+            worker.stop()
@@ -0,0 +1,161 @@
+# query_profiler.py
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+# Commands worth explaining; everything else (getMore, hello, ...) is ignored
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+# Session and routing fields the driver adds, which explain doesn't accept
+_DRIVER_FIELDS = {"lsid", "$clusterTime", "$db", "txnNumber", "$readPreference", "autocommit", "startTransaction"}
+# Fields of a command that hold its filter, for the query shape
+_FILTER_FIELDS = ("filter", "query", "q")
+
+
+class SlowQueryProfiler(monitoring.CommandListener):
+    """
+    Logs database commands slower than `threshold_ms` together with their
+    explain() plan, flagging collection scans, so a missing index shows up
+    in the log before the ward's data grows into it.
+
+    Register it when the client is created (MongoClient(..., event_listeners=
+    [profiler])) and call `attach(client)`. Timing happens on the calling
+    thread; explains run on a background thread, at most once per query
+    shape (collection + filter fields) every `explain_interval` seconds, so
+    a slow hot query doesn't turn into an explain storm.
+    """
+
+    def __init__(self, threshold_ms: float = 100.0, explain_interval: float = 60.0, history: int = 100):
+        self.threshold_ms = threshold_ms
+        self.explain_interval = explain_interval
+        self.slow = 0
+        self.collection_scans = 0
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._started: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+        self._explained: Dict[Tuple[str, str, Tuple[str, ...]], float] = {}
+        self._queue: "queue.Queue[Tuple[Dict[str, Any], str, Dict[str, Any]]]" = queue.Queue(maxsize=100)
+        self._client = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, client):
+        """The client explains are sent through; starts the explain thread."""
+        self._client = client
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+            self._thread.start()
+
+    # --- monitoring.CommandListener ---
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name not in EXPLAINABLE or _is_change_stream(event.command):
+            return
+        with self._lock:
+            self._started[event.request_id] = (event.database_name, event.command)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finished(event.request_id, event.command_name, event.duration_micros)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finished(event.request_id, event.command_name, event.duration_micros)
+
+    def _finished(self, request_id: int, command_name: str, duration_micros: int):
+        with self._lock:
+            started = self._started.pop(request_id, None)
+        if started is None or duration_micros / 1000 < self.threshold_ms:
+            return
+        database, command = started
+        collection = str(command.get(command_name))
+        shape = (database, collection, _filter_fields(command))
+        entry = {
+            "command": command_name,
+            "collection": collection,
+            "filter_fields": list(shape[2]),
+            "duration_ms": round(duration_micros / 1000, 1),
+            "at": time.time(),
+            "plan": None,
+        }
+        with self._lock:
+            self.slow += 1
+            self._recent.append(entry)
+            now = time.monotonic()
+            if now - self._explained.get(shape, -self.explain_interval) < self.explain_interval:
+                print(f"Slow query: {command_name} {collection} {list(shape[2])} took {entry['duration_ms']} ms")
+                return
+            self._explained[shape] = now
+        try:
+            self._queue.put_nowait((entry, database, command))
+        except queue.Full:
+            print(f"Slow query: {command_name} {collection} {list(shape[2])} took {entry['duration_ms']} ms")
+
+    # --- explain thread ---
+
+    def _run(self):
+        while True:
+            entry, database, command = self._queue.get()
+            try:
+                explained = self._client[database].command(
+                    {"explain": {k: v for k, v in command.items() if k not in _DRIVER_FIELDS},
+                     "verbosity": "executionStats"})
+                entry["plan"] = summarize_plan(explained)
+            except PyMongoError as e:
+                entry["plan"] = {"error": str(e)}
+            plan = entry["plan"]
+            if "COLLSCAN" in plan.get("stages", []):
+                with self._lock:
+                    self.collection_scans += 1
+            print(f"Slow query: {entry['command']} {entry['collection']} {entry['filter_fields']} "
+                  f"took {entry['duration_ms']} ms; plan: {plan}")
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"threshold_ms": self.threshold_ms, "slow": self.slow, "collection_scans": self.collection_scans,
+                    "recent": list(self._recent)}
+
+
+def summarize_plan(explained: Dict[str, Any]) -> Dict[str, Any]:
+    """Winning plan stages (outermost first), index names and the examined/returned counts."""
+    planner = explained.get("queryPlanner")
+    if planner is None and explained.get("stages"): # aggregate: the $cursor stage holds the query plan
+        planner = explained["stages"][0].get("$cursor", {}).get("queryPlanner", {})
+    stages: List[str] = []
+    indexes: List[str] = []
+    stage = (planner or {}).get("winningPlan", {})
+    stage = stage.get("queryPlan", stage) # Slot-based engine nests the plan one level down
+    while stage:
+        stages.append(stage.get("stage", "?"))
+        if "indexName" in stage:
+            indexes.append(stage["indexName"])
+        children = stage.get("inputStages") or []
+        stage = stage.get("inputStage") or (children[0] if children else None)
+    stats = explained.get("executionStats", {})
+    return {
+        "stages": stages,
+        "indexes": indexes,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+    }
+
+
+def _filter_fields(command: Dict[str, Any]) -> Tuple[str, ...]:
+    for field in _FILTER_FIELDS:
+        if isinstance(command.get(field), dict):
+            return tuple(sorted(command[field]))
+    for field in ("updates", "deletes"): # Write commands: the first statement's filter
+        statements = command.get(field)
+        if statements and isinstance(statements[0].get("q"), dict):
+            return tuple(sorted(statements[0]["q"]))
+    if command.get("pipeline") and "$match" in command["pipeline"][0]:
+        return tuple(sorted(command["pipeline"][0]["$match"]))
+    return ()
+
+
+def _is_change_stream(command: Dict[str, Any]) -> bool:
+    pipeline = command.get("pipeline") or []
+    return bool(pipeline) and "$changeStream" in pipeline[0]
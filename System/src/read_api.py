@@ -0,0 +1,152 @@
+# read_api.py
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Mapping, NamedTuple, Optional, Tuple
+
+from bson import ObjectId
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Query parameter -> document field, per collection
+FILTER_FIELDS: Dict[str, Dict[str, str]] = {
+    "bots": {"status": "status", "room": "location", "priority": "priority"},
+    "tasks": {"status": "status", "room": "room", "priority": "priority"},
+    "patients": {"status": "status", "room": "room", "priority": "riskLevel"},
+}
+
+_FIELD_NAME = re.compile(r"^[A-Za-z0-9_]+(?:\.[A-Za-z0-9_]+)*$")
+
+
+class ReadQuery(NamedTuple):
+    filter: Dict[str, Any]
+    projection: Optional[Dict[str, int]] # None = whole documents
+    limit: int
+    cursor: Optional[ObjectId]           # Resume after this _id
+
+
+class Page(NamedTuple):
+    body: bytes                          # Serialized JSON array
+    etag: str
+    next_cursor: Optional[str]           # None on the last page
+
+
+def parse_query(collection: str, args: Mapping[str, str]) -> ReadQuery:
+    """
+    Reads the list endpoints' query parameters:
+
+        ?status=pending,queued&room=301&priority=high   filters (comma = any of)
+        ?fields=name,status                             projection
+        ?limit=50&cursor=<X-Next-Cursor of the previous page>
+
+    Raises ValueError for a bad limit, cursor or field name.
+    """
+    query: Dict[str, Any] = {}
+    for param, field in FILTER_FIELDS[collection].items():
+        value = args.get(param)
+        if value:
+            values = [v.strip() for v in value.split(',') if v.strip()]
+            query[field] = values[0] if len(values) == 1 else {"$in": values}
+
+    projection = None
+    if args.get('fields'):
+        fields = [f.strip() for f in args['fields'].split(',') if f.strip()]
+        for field in fields:
+            if not _FIELD_NAME.match(field) or field == '_id':
+                raise ValueError(f"Invalid field '{field}'")
+        projection = {field: 1 for field in fields}
+
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    cursor = None
+    if args.get('cursor'):
+        if not ObjectId.is_valid(args['cursor']):
+            raise ValueError("Invalid cursor")
+        cursor = ObjectId(args['cursor'])
+    return ReadQuery(query, projection, limit, cursor)
+
+
+def fetch_page(db, collection: str, query: ReadQuery) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of documents in _id order (without _id), and the cursor for the
+    next page. Paging on _id keeps every page an index range scan, however
+    deep the client has scrolled.
+    """
+    mongo_filter = dict(query.filter)
+    if query.cursor is not None:
+        mongo_filter['_id'] = {"$gt": query.cursor}
+    # _id is always returned: it is the cursor
+    documents = list(db[collection].find(mongo_filter, query.projection).sort('_id', 1).limit(query.limit + 1))
+    next_cursor = str(documents[query.limit - 1]['_id']) if len(documents) > query.limit else None
+    documents = documents[:query.limit]
+    for document in documents:
+        del document['_id']
+    return documents, next_cursor
+
+
+def make_etag(body: bytes) -> str:
+    return hashlib.sha1(body).hexdigest()[:20]
+
+
+class ReadCache:
+    """
+    Short-TTL cache of serialized list pages, keyed by collection and query
+    string. Dashboards poll the same few URLs; within the TTL they are
+    answered without touching MongoDB or re-serializing, and the ETag lets
+    clients skip the body entirely (304). Writes made through the API drop
+    the collection's pages right away; writes from elsewhere show up once
+    the TTL runs out.
+    """
+
+    def __init__(self, ttl_seconds: float = 2.0, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Page]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, collection: str, key: Hashable) -> Optional[Page]:
+        with self._lock:
+            entry = self._entries.get((collection, key))
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl_seconds:
+                self._entries.move_to_end((collection, key))
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[(collection, key)]
+            self.misses += 1
+            return None
+
+    def put(self, collection: str, key: Hashable, page: Page):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[(collection, key)] = (time.monotonic(), page)
+            self._entries.move_to_end((collection, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *collections: str):
+        """Drops the cached pages of `collections` (all of them when none are given)."""
+        with self._lock:
+            if not collections:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] in collections]:
+                del self._entries[key]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,60 @@
+# bench_command_throughput.py
+# Offline throughput of command parsing with the local stub backend standing in
+# for Gemini, with and without micro-batching of concurrent requests.
+#
+# Usage: python bot/benchmarks/bench_command_throughput.py [--clients N] [--requests N]
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from graph_loader import load_graph
+from command_prompt import DESTINATION_MAPPINGS
+from llm_backend import LocalStubBackend, MicroBatcher
+from gcp import GCP
+
+GRAPH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'graph.json')
+
+
+def run(label: str, gcp: GCP, clients: int, requests: int):
+    # Unique inputs so neither the local parser nor the parse cache can answer
+    inputs = [f"take the blankets to room 550 when free, ticket {chr(97 + i % 26)}{i}" for i in range(requests)]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(gcp.parse_command_with_gemini, inputs))
+    elapsed = time.perf_counter() - start
+
+    llm = gcp.parse_stats.summary()["paths"]["llm"]
+    model_calls = gcp.backend.calls # type: ignore[union-attr]
+    print(f"{label:<22}{requests / elapsed:>10.1f}{llm['p50_ms']:>10.1f}{llm['p95_ms']:>10.1f}{model_calls:>13}"
+          f"{sum(1 for command, _ in results if command == 'move'):>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark offline command-parsing throughput.")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent tablets submitting commands")
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Simulated model round trip")
+    parser.add_argument("--per-item-ms", type=float, default=5.0, help="Simulated extra cost per batched request")
+    parser.add_argument("--max-concurrent", type=int, default=4, help="Simulated API concurrency quota (0 = none)")
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    graph = load_graph(GRAPH_PATH, write_snapshot=False)
+    print(f"{args.clients} clients, {args.requests} requests, {args.latency_ms:.0f} ms model latency, "
+          f"{args.max_concurrent or 'unlimited'} concurrent model calls")
+    print(f"{'mode':<22}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'model calls':>13}{'moves':>8}")
+    for window_ms in (0, args.window_ms):
+        with contextlib.redirect_stdout(io.StringIO()):
+            gcp = GCP(graph.node_list[0], graph, backend=LocalStubBackend(
+                graph, DESTINATION_MAPPINGS, latency_ms=args.latency_ms, per_item_ms=args.per_item_ms,
+                max_concurrent=args.max_concurrent))
+        if window_ms:
+            gcp.batcher = MicroBatcher(gcp.backend, window_ms=window_ms, max_batch=args.clients)
+        run("unbatched" if not window_ms else f"batched ({window_ms:g} ms)", gcp, args.clients, args.requests)
@@ -0,0 +1,83 @@
+# bench_dispatch.py
+# One dispatch tick on a synthetic ward: per-pair shortest-path searches
+# (what assigning by calling find_shortest_path would cost) versus the
+# Dispatcher's multi-source greedy and Hungarian batch strategies.
+#
+# Usage: python bot/benchmarks/bench_dispatch.py [--grid N] [--bots N] [--tasks N]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from navigator import Navigator
+from dispatcher import PRIORITY_ORDER, PRIORITY_WEIGHT, Assignment, BotCandidate, Dispatcher, TaskRequest
+from synthetic_maps import grid_map
+
+
+def path_length(graph, path) -> float:
+    return sum(dict(graph.iter_edges(a.id))[b.id] for a, b in zip(path, path[1:]))
+
+
+def per_pair(graph, dispatcher: Dispatcher, tasks, bots):
+    """Greedy by priority, pricing every free bot with its own search."""
+    navigator = Navigator()
+    free = [bot for bot in bots if bot.battery >= dispatcher.min_battery]
+    assignments = []
+    for task in sorted(tasks, key=lambda task: PRIORITY_ORDER[task.priority]):
+        best = None
+        for bot in free:
+            path = navigator.find_shortest_path(graph, bot.node, task.room)
+            if path is None:
+                continue
+            distance = path_length(graph, path)
+            cost = distance + dispatcher.penalty(bot)
+            if best is None or cost < best[0]:
+                best = (cost, distance, bot)
+        if best is None:
+            continue
+        cost, distance, bot = best
+        free.remove(bot)
+        assignments.append(Assignment(task.task_id, bot.bot_id, task.room, distance, cost))
+        if not free:
+            break
+    return assignments
+
+
+def report(label: str, seconds: float, assignments, tasks):
+    priority = {task.task_id: task.priority for task in tasks}
+    total = sum(a.distance for a in assignments)
+    weighted = sum(PRIORITY_WEIGHT[priority[a.task_id]] * a.cost for a in assignments)
+    high = [a.distance for a in assignments if priority[a.task_id] == "high"]
+    print(f"{label:<22}{seconds * 1000:>10.1f}{len(assignments):>10}{total:>12.0f}{weighted:>12.0f}"
+          f"{sum(high) / max(1, len(high)):>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark task dispatching strategies.")
+    parser.add_argument("--grid", type=int, default=40)
+    parser.add_argument("--bots", type=int, default=30)
+    parser.add_argument("--tasks", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    graph = grid_map(args.grid, args.grid, jitter=1.0, seed=args.seed)
+    nodes = list(graph.nodes.values())
+    bots = [BotCandidate(f"Porter-{i + 1:02d}", rng.choice(nodes), rng.uniform(15, 100)) for i in range(args.bots)]
+    tasks = [TaskRequest(i + 1, rng.choice(nodes), rng.choice(["high", "normal", "normal", "low"]))
+             for i in range(args.tasks)]
+    print(f"{len(nodes)}-node ward, {args.bots} bots, {args.tasks} open tasks")
+    print(f"{'strategy':<22}{'ms/tick':>10}{'assigned':>10}{'distance':>12}{'weighted':>12}{'high dist':>12}")
+
+    dispatcher = Dispatcher(graph)
+    start = time.perf_counter()
+    baseline = per_pair(graph, dispatcher, tasks, bots)
+    report("per-pair searches", time.perf_counter() - start, baseline, tasks)
+    for strategy in ("greedy", "hungarian"):
+        start = time.perf_counter()
+        assignments = dispatcher.assign(tasks, bots, strategy=strategy)
+        report(f"{strategy} (dispatcher)", time.perf_counter() - start, assignments, tasks)
@@ -0,0 +1,82 @@
+# bench_fleet.py
+# Start-up time and memory of N bots sharing one fleet (graph, route table,
+# model backend, speech client) versus N independently built Bot objects, and
+# command throughput when every bot works through its own queue.
+#
+# Usage: python bot/benchmarks/bench_fleet.py [--bots N] [--grid N]
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+from concurrent.futures import wait
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'src'))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'System', 'src'))
+os.environ.setdefault('PORTER_LLM_BACKEND', 'stub')
+
+from bot import Bot
+from fleet import Fleet
+from synthetic_maps import grid_map
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fleet start-up and command throughput.")
+    parser.add_argument("--bots", type=int, default=50)
+    parser.add_argument("--grid", type=int, default=20, help="Ward is a grid x grid map")
+    parser.add_argument("--commands", type=int, default=4, help="Moves per bot in the throughput run")
+    parser.add_argument("--independent", type=int, default=5, help="Independent bots to build for comparison")
+    args = parser.parse_args()
+
+    graph = grid_map(args.grid, args.grid)
+    nodes = graph.node_list if hasattr(graph, 'node_list') else list(graph.nodes.values())
+    print(f"{args.grid * args.grid}-node ward")
+
+    def build_independent():
+        # Each bot's own Navigator builds its route table before its first move
+        bots = [Bot(f"Porter-{i + 1:02d}", graph, nodes[i % len(nodes)]) for i in range(args.independent)]
+        for bot in bots:
+            bot.navigator.precompute(graph)
+        return bots
+
+    def add_bots():
+        for i in range(args.bots):
+            fleet.add_bot(f"Porter-{i + 1:02d}", nodes[i % len(nodes)])
+
+    _, solo_seconds, solo_peak = measure(build_independent)
+    fleet, shared_seconds, shared_peak = measure(lambda: Fleet(graph))
+    _, fleet_seconds, fleet_peak = measure(add_bots)
+    print(f"{'':<26}{'ms':>10}{'KiB':>10}")
+    print(f"{'independent, per bot':<26}{solo_seconds / args.independent * 1000:>10.1f}{solo_peak / args.independent / 1024:>10.0f}")
+    print(f"{'fleet, shared (once)':<26}{shared_seconds * 1000:>10.1f}{shared_peak / 1024:>10.0f}")
+    print(f"{'fleet, per bot':<26}{fleet_seconds / args.bots * 1000:>10.1f}{fleet_peak / args.bots / 1024:>10.0f}")
+
+    # Every bot visits a few rooms across the ward, all bots at once
+    start = time.perf_counter()
+    futures = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, bot in enumerate(fleet.bots):
+            for k in range(args.commands):
+                destination = nodes[(i * 7 + k * 13 + len(nodes) // 2) % len(nodes)]
+                futures.append(fleet.submit(bot.id, bot.move_to_room, destination.name))
+        wait(futures)
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for future in futures if future.exception() is not None)
+    print(f"\n{len(futures)} moves across {len(fleet)} bots in {elapsed * 1000:.0f} ms "
+          f"({len(futures) / elapsed:.0f} moves/s, {failed} failed)")
+    fleet.stop()
@@ -0,0 +1,37 @@
+# bench_prompt.py
+# Per-command prompt construction cost against map size: rebuilding the whole
+# prompt each time (the old behaviour) vs. the precompiled CommandPrompt.
+#
+# Usage: python bot/benchmarks/bench_prompt.py [--iterations N]
+
+import argparse
+import time
+
+from synthetic_maps import grid_map
+from command_prompt import CommandPrompt, DESTINATION_MAPPINGS
+
+
+def time_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / iterations
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark prompt construction against graph size.")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8}{'rebuild us':>14}{'precompiled us':>16}{'request chars':>15}{'full chars':>12}")
+    for side in (3, 10, 32, 100):
+        graph = grid_map(side, side)
+        prompt = CommandPrompt(graph, DESTINATION_MAPPINGS)
+        prompt.static_prefix # Warm up
+
+        rebuild = time_per_call(
+            lambda: CommandPrompt(graph, DESTINATION_MAPPINGS).render("room 0", "bring me some water"), args.iterations)
+        precompiled = time_per_call(
+            lambda: prompt.request_part("room 0", "bring me some water") if prompt.static_prefix else None, args.iterations)
+        print(f"{len(graph.nodes):>8}{rebuild:>14.1f}{precompiled:>16.1f}"
+              f"{len(prompt.request_part('room 0', 'bring me some water')):>15}{len(prompt.render('room 0', 'bring me some water')):>12}")
@@ -0,0 +1,112 @@
+# bench_replanning.py
+# Corridors closing while bots are under way.
+#   1. One bot crossing the ward while corridors ahead of it close: a fresh
+#      A* from its current node after every closure versus repairing the
+#      route with D* Lite.
+#   2. The shared route table after a closure: dropping only the affected
+#      shortest-path trees versus rebuilding every tree.
+#
+# Usage: python bot/benchmarks/bench_replanning.py [--grid N] [--closures N]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from navigator import Navigator
+from replanner import DStarLite
+from route_table import RouteTable
+from synthetic_maps import grid_map
+
+
+def travel(graph, closures: int, rng: random.Random):
+    """Walks corner to corner, closing an edge a few hops ahead every few steps."""
+    nodes = graph.nodes
+    start, goal = nodes[0], nodes[len(nodes) - 1]
+    navigator = Navigator(mode="astar")
+    replanner = DStarLite(graph, start, goal)
+    full = {"expanded": 0, "seconds": 0.0}
+    incremental = {"expanded": 0, "seconds": 0.0}
+    path = replanner.path()
+    closed = []
+    position = 0
+    while closures and path and len(path) - position > 6:
+        position += 3
+        current = path[position]
+        ahead = path[position + rng.randint(1, 4)]
+        previous = path[path.index(ahead) - 1]
+        graph.block_edge(previous.id, ahead.id)
+        closed.append((previous.id, ahead.id))
+        closures -= 1
+
+        began = time.perf_counter()
+        fresh = navigator.find_shortest_path(graph, current, goal)
+        full["seconds"] += time.perf_counter() - began
+        full["expanded"] += navigator.last_expanded
+
+        began = time.perf_counter()
+        replanner.move_to(current)
+        replanner.update()
+        repaired = replanner.path()
+        incremental["seconds"] += time.perf_counter() - began
+        incremental["expanded"] += replanner.last_expanded
+
+        if fresh is None or repaired is None:
+            break
+        path, position = repaired, 0
+    for edge in closed:
+        graph.unblock_edge(*edge)
+    return len(closed), full, incremental
+
+
+def route_table_closures(graph, closures: int, lookups: int, rng: random.Random):
+    """Closes random corridors one at a time and serves random lookups after each."""
+    table = RouteTable(graph, precompute_limit=len(graph.nodes)) # Every node is a room here
+    nodes = list(graph.nodes.values())
+    edges = [(a, b) for a in graph.nodes for b, _ in graph.iter_edges(a) if a < b]
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(lookups)]
+
+    began = time.perf_counter()
+    for edge in rng.sample(edges, closures):
+        graph.block_edge(*edge)
+        for a, b in pairs:
+            table.get_distance(a, b)
+        graph.unblock_edge(*edge)
+        for a, b in pairs:
+            table.get_distance(a, b)
+    selective = time.perf_counter() - began
+    invalidated = table.invalidated
+
+    began = time.perf_counter()
+    table.rebuild()
+    full = (time.perf_counter() - began) * closures * 2 # One rebuild per change
+    return invalidated, len(nodes) * closures * 2, selective, full
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark incremental replanning around closed corridors.")
+    parser.add_argument("--grid", type=int, default=60, help="Ward for the travelling bot is grid x grid")
+    parser.add_argument("--table-grid", type=int, default=30, help="Ward for the route table test")
+    parser.add_argument("--closures", type=int, default=10)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    graph = grid_map(args.grid, args.grid, jitter=1.0, seed=args.seed)
+    count, full, incremental = travel(graph, args.closures, rng)
+    print(f"{args.grid * args.grid}-node ward, {count} closures ahead of a travelling bot")
+    print(f"{'replanning':<22}{'expanded':>12}{'ms':>10}")
+    print(f"{'A* from scratch':<22}{full['expanded']:>12}{full['seconds'] * 1000:>10.1f}")
+    print(f"{'D* Lite repair':<22}{incremental['expanded']:>12}{incremental['seconds'] * 1000:>10.1f}")
+
+    graph = grid_map(args.table_grid, args.table_grid, jitter=1.0, seed=args.seed)
+    invalidated, total, selective, rebuild = route_table_closures(graph, args.closures, args.lookups, rng)
+    print(f"\n{len(graph.nodes)}-node route table, {args.closures} closures and reopenings, "
+          f"{args.lookups} lookups after each")
+    print(f"trees dropped: {invalidated} of {total} ({invalidated / total * 100:.1f}%)")
+    print(f"selective invalidation + lookups: {selective * 1000:.0f} ms, "
+          f"full rebuild per change: {rebuild * 1000:.0f} ms")
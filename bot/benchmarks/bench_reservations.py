@@ -0,0 +1,72 @@
+# bench_reservations.py
+# Shift change on a narrow ward: bots on the west side swap with bots on the
+# east side. Independent shortest paths (each bot planned as if alone) versus
+# prioritized cooperative A* over a shared reservation table: conflicts left
+# in the plans, makespan, total wait and planning time.
+#
+# Usage: python bot/benchmarks/bench_reservations.py [--width N] [--height N]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from reservations import CooperativePlanner, find_conflicts, schedule_metrics
+from synthetic_maps import grid_map
+
+
+def shift_change(graph, width: int, height: int, bots: int, rng: random.Random):
+    """Half the bots start on the west edge and head east, the other half the reverse."""
+    west = [graph.nodes[row * width] for row in range(height)]
+    east = [graph.nodes[row * width + width - 1] for row in range(height)]
+    west_starts, east_starts = rng.sample(west, len(west)), rng.sample(east, len(east))
+    west_goals, east_goals = rng.sample(west, len(west)), rng.sample(east, len(east))
+    trips = []
+    for i in range(bots):
+        if i % 2 == 0:
+            trips.append((f"Porter-{i + 1:02d}", west_starts.pop(), east_goals.pop()))
+        else:
+            trips.append((f"Porter-{i + 1:02d}", east_starts.pop(), west_goals.pop()))
+    return trips
+
+
+def report(label: str, schedules, planner: CooperativePlanner, seconds: float):
+    planned = [schedule for schedule in schedules.values() if schedule is not None]
+    conflicts = find_conflicts(planned, planner.edge_steps)
+    metrics = schedule_metrics(schedules, planner.step_seconds)
+    print(f"{len(schedules):>5}  {label:<14}{len(conflicts):>10}{metrics['failed']:>8}{metrics['makespan_s']:>12.0f}"
+          f"{metrics['total_wait_s']:>12.0f}{seconds * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cooperative path reservation at shift change.")
+    parser.add_argument("--width", type=int, default=30)
+    parser.add_argument("--height", type=int, default=8, help="Rows of the ward; fewer rows = fewer parallel corridors")
+    parser.add_argument("--bots", type=int, nargs="+", default=[2, 4, 8, 12, 16])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    graph = grid_map(args.width, args.height, jitter=1.0, seed=args.seed)
+    print(f"{args.width}x{args.height} ward, 1 m/s bots, 1 s steps")
+    print(f"{'bots':>5}  {'planner':<14}{'conflicts':>10}{'failed':>8}{'makespan s':>12}{'wait s':>12}{'ms':>10}")
+    for bot_count in args.bots:
+        if bot_count > 2 * args.height:
+            continue
+        trips = shift_change(graph, args.width, args.height, bot_count, random.Random(args.seed))
+
+        # Each bot planned against an empty table: plain shortest paths
+        planner = CooperativePlanner(graph)
+        start = time.perf_counter()
+        independent = {}
+        for bot_id, origin, goal in trips:
+            independent[bot_id] = planner.plan(bot_id, origin, goal, start_time=0)
+            planner.reservations.release(bot_id)
+        report("independent", independent, planner, time.perf_counter() - start)
+
+        planner = CooperativePlanner(graph)
+        start = time.perf_counter()
+        cooperative = planner.plan_all(trips, start_time=0)
+        report("cooperative", cooperative, planner, time.perf_counter() - start)
@@ -0,0 +1,75 @@
+# bench_route_planner.py
+# Travel distance for a bot with several deliveries: one trip per delivery in
+# the order they arrived (what repeated move_to_room calls do) versus one
+# planned multi-stop trip, exact (Held-Karp) and heuristic (nearest
+# neighbour + 2-opt), plus how late priority deliveries end up.
+#
+# Usage: python bot/benchmarks/bench_route_planner.py [--grid N] [--trials N]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from navigator import Navigator
+from route_planner import RoutePlanner, Stop
+from synthetic_maps import grid_map
+
+
+def run(planner: RoutePlanner, nodes, stop_count: int, trials: int, deadlines: bool, rng: random.Random):
+    totals = {"one by one": [0.0, 0.0, 0.0], "heuristic": [0.0, 0.0, 0.0]}
+    if stop_count <= planner.exact_limit:
+        totals["exact"] = [0.0, 0.0, 0.0]
+    for _ in range(trials):
+        start = rng.choice(nodes)
+        stops = []
+        for _ in range(stop_count):
+            priority = rng.choice(["high", "normal", "normal", "low"])
+            # Deadlines between a short hop and crossing the ward a few times
+            deadline = rng.uniform(30, 60 * stop_count) if deadlines and priority != "low" else None
+            stops.append(Stop(rng.choice(nodes), priority, deadline))
+
+        began = time.perf_counter()
+        plan = planner.evaluate(start, stops)
+        row = totals["one by one"]
+        row[0] += plan.distance
+        row[1] += plan.lateness
+        row[2] += time.perf_counter() - began
+        for method in [m for m in ("exact", "heuristic") if m in totals]:
+            began = time.perf_counter()
+            plan = planner.plan(start, stops, method=method)
+            row = totals[method]
+            row[0] += plan.distance
+            row[1] += plan.lateness
+            row[2] += time.perf_counter() - began
+
+    baseline = totals["one by one"][0]
+    for label, (distance, lateness, seconds) in totals.items():
+        print(f"{stop_count:>6}  {label:<12}{distance / trials:>12.0f}{(1 - distance / baseline) * 100:>9.1f}%"
+              f"{lateness / trials:>12.0f}{seconds / trials * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark multi-stop route planning against one trip per delivery.")
+    parser.add_argument("--grid", type=int, default=30)
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--stops", type=int, nargs="+", default=[3, 5, 8, 10, 20, 40])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    graph = grid_map(args.grid, args.grid, jitter=1.0, seed=args.seed)
+    nodes = list(graph.nodes.values())
+    navigator = Navigator(use_route_table=True)
+    navigator.precompute(graph)
+    # Speed 5 units/s: one grid spacing per second
+    planner = RoutePlanner(graph, navigator, speed=5.0)
+
+    for deadlines in (False, True):
+        rng = random.Random(args.seed)
+        print(f"\n{len(nodes)}-node ward, {'with' if deadlines else 'no'} deadlines, mean over {args.trials} trips")
+        print(f"{'stops':>6}  {'order':<12}{'distance':>12}{'saved':>10}{'late (s)':>12}{'ms':>10}")
+        for stop_count in args.stops:
+            run(planner, nodes, stop_count, args.trials, deadlines, rng)
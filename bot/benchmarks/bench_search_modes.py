@@ -0,0 +1,57 @@
+# bench_search_modes.py
+# Compares Dijkstra, A* and bidirectional Dijkstra on synthetic maps.
+#
+# Usage: python bot/benchmarks/bench_search_modes.py [--queries N] [--seed S]
+
+import argparse
+import random
+import time
+
+from synthetic_maps import corridor_map, grid_map
+from navigator import Navigator, SEARCH_MODES
+
+
+def run(name: str, graph, queries: int, seed: int):
+    rng = random.Random(seed)
+    nodes = list(graph.nodes.values())
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+    navigator = Navigator()
+
+    baseline_lengths = []
+    print(f"\n{name}: {len(nodes)} nodes, {queries} queries")
+    print(f"{'mode':<15}{'avg expanded':>15}{'avg ms':>10}")
+    for mode in SEARCH_MODES:
+        expanded = 0
+        lengths = []
+        start = time.perf_counter()
+        for source, target in pairs:
+            path = navigator.find_shortest_path(graph, source, target, mode=mode)
+            expanded += navigator.last_expanded
+            lengths.append(path_length(graph, path))
+        elapsed = time.perf_counter() - start
+
+        if not baseline_lengths:
+            baseline_lengths = lengths
+        elif any(abs(a - b) > 1e-9 for a, b in zip(lengths, baseline_lengths)):
+            print(f"  warning: {mode} returned a longer path than dijkstra")
+        print(f"{mode:<15}{expanded / queries:>15.1f}{elapsed * 1000 / queries:>10.3f}")
+
+
+def path_length(graph, path) -> float:
+    if not path:
+        return float('inf')
+    total = 0.0
+    for a, b in zip(path, path[1:]):
+        total += min(distance for neighbor_id, distance in graph.iter_edges(a.id) if neighbor_id == b.id)
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare Navigator search modes on synthetic maps.")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    run("grid 50x50", grid_map(50, 50, jitter=1.0, seed=args.seed), args.queries, args.seed)
+    run("grid 150x150", grid_map(150, 150, jitter=1.0, seed=args.seed), args.queries // 4 or 1, args.seed)
+    run("corridors 4 floors x 200 stops", corridor_map(4, 200), args.queries, args.seed)
@@ -0,0 +1,74 @@
+# bench_simulator.py
+# Fleet throughput on synthetic wards from 50 to 50k nodes with 1 to 200
+# bots, run through the discrete-event simulator. Tasks arrive as a Poisson
+# stream sized to the fleet and a share of them are free-text requests the
+# bot has to parse. The model backend and speech recognizer are local stubs,
+# so the suite runs offline.
+#
+# Usage: python bot/benchmarks/bench_simulator.py [--hours H] [--max-nodes N]
+#        [--max-wall-seconds S]   (exit 1 if any case takes longer; for CI)
+
+import argparse
+import contextlib
+import io
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from dispatcher import Dispatcher
+from fleet_simulator import FleetSimulator, build_bots, poisson_tasks
+from navigator import Navigator
+from synthetic_maps import grid_map
+
+# (nodes, bots)
+CASES = [(50, 1), (500, 5), (2500, 20), (10000, 50), (50000, 200)]
+
+
+def run_case(nodes: int, bots: int, hours: float, tasks_per_bot_hour: float, command_fraction: float, seed: int):
+    side = math.isqrt(nodes)
+    graph = grid_map(side, math.ceil(nodes / side), jitter=1.0, seed=seed)
+    # Precomputed trees only pay off on small wards; big ones use A*
+    navigator = Navigator(use_route_table=len(graph.nodes) <= 2000, mode="astar")
+    with contextlib.redirect_stdout(io.StringIO()): # Bots and parsers narrate everything
+        fleet = build_bots(graph, bots, navigator, seed=seed)
+        tasks = poisson_tasks(graph, bots * tasks_per_bot_hour, hours * 3600, seed=seed,
+                              command_fraction=command_fraction)
+        # Big fleets dispatch in rounds, as the API's dispatch service does
+        simulator = FleetSimulator(graph, fleet, Dispatcher(graph, navigator), speed=1.0, service_seconds=30,
+                                   dispatch_interval=0 if bots <= 20 else 10)
+        report = simulator.run(tasks)
+    return len(graph.nodes), report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fleet throughput with the discrete-event simulator.")
+    parser.add_argument("--hours", type=float, default=1.0, help="Simulated hours of task arrivals per case")
+    parser.add_argument("--tasks-per-bot-hour", type=float, default=4.0)
+    parser.add_argument("--command-fraction", type=float, default=0.2, help="Share of tasks that arrive as free text")
+    parser.add_argument("--max-nodes", type=int, default=50000, help="Skip cases with bigger wards")
+    parser.add_argument("--max-wall-seconds", type=float, default=None,
+                        help="Fail if any case takes longer than this to simulate")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.hours:g} h of arrivals, {args.tasks_per_bot_hour:g} tasks/bot/h, "
+          f"{args.command_fraction:.0%} free text, 1 m/s bots, 30 s service")
+    print(f"{'nodes':>7}{'bots':>6}{'tasks':>7}{'done':>7}{'wrong':>7}{'tasks/h':>9}{'p50 s':>8}{'p95 s':>8}"
+          f"{'wait p95':>10}{'util':>7}{'events':>9}{'wall s':>8}")
+    too_slow = []
+    for nodes, bots in CASES:
+        if nodes > args.max_nodes:
+            continue
+        node_count, report = run_case(nodes, bots, args.hours, args.tasks_per_bot_hour, args.command_fraction,
+                                      args.seed)
+        print(f"{node_count:>7}{report.bots:>6}{report.tasks:>7}{report.completed:>7}{report.misrouted:>7}"
+              f"{report.tasks_per_hour:>9.1f}{report.latency_p50_s:>8.0f}{report.latency_p95_s:>8.0f}{report.wait_p95_s:>10.0f}"
+              f"{report.utilization:>7.0%}{report.events:>9}{report.wall_seconds:>8.2f}")
+        if args.max_wall_seconds is not None and report.wall_seconds > args.max_wall_seconds:
+            too_slow.append((node_count, bots, report.wall_seconds))
+
+    for node_count, bots, seconds in too_slow:
+        print(f"REGRESSION: {node_count} nodes / {bots} bots took {seconds:.2f} s (limit {args.max_wall_seconds:g} s)")
+    sys.exit(1 if too_slow else 0)
@@ -0,0 +1,90 @@
+# bench_speech_latency.py
+# Time from end of speech to a transcribed command, recording-then-transcribing
+# versus streaming recognition, measured on WAV fixtures with the local fake
+# recognizer. Times are audio time plus the given recognizer round trips.
+#
+# Usage: python bot/benchmarks/bench_speech_latency.py [--wav command.wav --speech-end SECONDS]
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import wave
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from streaming_recognizer import FakeStreamingRecognizer, wav_chunks
+from speech_recognizer import SimpleVoiceRecorder
+from synthetic_audio import command_wav
+
+TRANSCRIPT = "take me to room 310"
+
+
+def measure(path: str, speech_end: float, recognize_ms: float, final_ms: float):
+    fake = FakeStreamingRecognizer(TRANSCRIPT)
+    recorder = SimpleVoiceRecorder(streaming=True, recognizer=fake)
+    seconds_per_chunk = recorder.chunk / recorder.rate
+    partials = []
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        recording = recorder._record_until_silence(wav_chunks(path, recorder.chunk))
+        text = recorder.transcribe_stream(wav_chunks(path, recorder.chunk), on_partial=partials.append)
+
+    recorded_chunks = len(recording) // (recorder.chunk * recorder.sample_width)
+    batch_ms = (recorded_chunks * seconds_per_chunk - speech_end) * 1000 + recognize_ms
+    streaming_ms = (fake.chunks_consumed * seconds_per_chunk - speech_end) * 1000 + final_ms
+    print(f"{'record then transcribe':<24}{batch_ms:>12.0f}")
+    print(f"{'streaming':<24}{streaming_ms:>12.0f}   ({len(partials)} partials, heard '{text}')")
+    handoff(list(wav_chunks(path, recorder.chunk)), recorder)
+
+
+def handoff(chunks, recorder: SimpleVoiceRecorder, repeat: int = 20):
+    """Cost of getting a recorded utterance into the request: temp WAV file vs ring buffer."""
+    def via_temp_file():
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
+            name = temp_file.name
+            with wave.open(name, 'wb') as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(recorder.sample_width)
+                wf.setframerate(recorder.rate)
+                wf.writeframes(b''.join(chunks))
+        with open(name, 'rb') as f:
+            content = f.read()
+        os.unlink(name)
+        return content
+
+    def via_ring_buffer():
+        ring = recorder._recording
+        ring.clear()
+        for chunk in chunks:
+            ring.write(chunk)
+        return bytes(ring.views()[0])
+
+    for label, fn in (("temp WAV file", via_temp_file), ("in-memory ring buffer", via_ring_buffer)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        print(f"hand-off via {label:<22}{(time.perf_counter() - start) / repeat * 1000:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark end-of-speech to command latency.")
+    parser.add_argument("--wav", help="16 kHz 16-bit mono fixture (default: a synthetic command)")
+    parser.add_argument("--speech-end", type=float, help="When speech ends in --wav, in seconds")
+    parser.add_argument("--recognize-ms", type=float, default=500.0, help="Round trip of a one-shot recognize call")
+    parser.add_argument("--final-ms", type=float, default=100.0, help="Delay of the streaming final result")
+    args = parser.parse_args()
+
+    print(f"{'mode':<24}{'latency ms':>12}")
+    if args.wav:
+        if args.speech_end is None:
+            parser.error("--speech-end is required with --wav")
+        measure(args.wav, args.speech_end, args.recognize_ms, args.final_ms)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "command.wav")
+            speech_end = command_wav(path)
+            measure(path, speech_end, args.recognize_ms, args.final_ms)
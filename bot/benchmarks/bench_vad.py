@@ -0,0 +1,90 @@
+# bench_vad.py
+# End-of-recording decisions and CPU cost per chunk of the NumPy voice-activity
+# detector versus the old fixed max-amplitude threshold, on synthetic fixtures.
+#
+# Usage: python bot/benchmarks/bench_vad.py
+
+import contextlib
+import io
+import os
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from speech_recognizer import SimpleVoiceRecorder
+from vad import VoiceActivityDetector
+from synthetic_audio import command_samples
+
+CHUNK = 1024
+RATE = 16000
+MAX_CHUNKS = int(RATE / CHUNK * 5) + int(1.5 * RATE / CHUNK)
+
+SCENARIOS = {
+    "quiet room": {},
+    "late start (2 s)": {"lead_silence": 2.0},
+    "starts mid-speech": {"lead_silence": 0.0},
+    "noisy corridor": {"noise_level": 700.0},
+    "soft speaker": {"speech_level": 700.0, "noise_level": 60.0},
+}
+
+
+def legacy_stop(chunks) -> int:
+    """The previous loop: stop after 1.5 s of chunks whose peak is under 500."""
+    max_silence_chunks = int(1.5 * RATE / CHUNK)
+    silence_count = 0
+    for i, data in enumerate(chunks[:MAX_CHUNKS]):
+        audio_data = wave.struct.unpack(f"{CHUNK}h", data)
+        if max(abs(sample) for sample in audio_data) < 500:
+            silence_count += 1
+            if silence_count > max_silence_chunks:
+                return i + 1
+        else:
+            silence_count = 0
+    return min(len(chunks), MAX_CHUNKS)
+
+
+def describe(stop_chunk: int, speech_end: float) -> str:
+    stop = stop_chunk * CHUNK / RATE
+    if stop < speech_end:
+        return f"cut off {speech_end - stop:.1f} s early"
+    return f"+{(stop - speech_end) * 1000:.0f} ms"
+
+
+def cost_per_chunk(fn, chunks, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for chunk in chunks:
+            fn(chunk)
+        best = min(best, time.perf_counter() - start)
+    return best / len(chunks) * 1e6
+
+
+if __name__ == "__main__":
+    with contextlib.redirect_stdout(io.StringIO()):
+        recorder = SimpleVoiceRecorder(streaming=False)
+
+    print(f"{'scenario':<20}{'fixed threshold':>24}{'VAD':>24}")
+    for name, options in SCENARIOS.items():
+        samples, speech_end = command_samples(trail_silence=3.0, **options)
+        data = samples.tobytes()
+        chunks = [data[i:i + 2 * CHUNK] for i in range(0, len(data) - 2 * CHUNK + 1, 2 * CHUNK)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            recording = recorder._record_until_silence(chunks[:MAX_CHUNKS])
+        vad_stop = len(recording) // (2 * CHUNK)
+        print(f"{name:<20}{describe(legacy_stop(chunks), speech_end):>24}{describe(vad_stop, speech_end):>24}")
+
+    samples, _ = command_samples()
+    data = samples.tobytes()
+    chunks = [data[i:i + 2 * CHUNK] for i in range(0, len(data) - 2 * CHUNK + 1, 2 * CHUNK)]
+    legacy_us = cost_per_chunk(lambda chunk: max(abs(s) for s in wave.struct.unpack(f"{CHUNK}h", chunk)), chunks)
+    vad = VoiceActivityDetector(RATE)
+    vad_us = cost_per_chunk(vad.process, chunks)
+    start = time.perf_counter()
+    segments = VoiceActivityDetector(RATE).segments(data, CHUNK)
+    offline_us = (time.perf_counter() - start) / len(chunks) * 1e6
+    print(f"\nCPU per {CHUNK}-sample chunk: fixed threshold {legacy_us:.1f} us, VAD {vad_us:.1f} us, "
+          f"VAD on a prerecorded buffer {offline_us:.1f} us")
+    print(f"Segments found: {[(round(a, 2), round(b, 2)) for a, b in segments]}")
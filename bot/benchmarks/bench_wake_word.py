@@ -0,0 +1,85 @@
+# bench_wake_word.py
+# Continuous listening on a synthetic ward recording: wake words found, false
+# wakes on other speech, and how much audio reaches speech-to-text compared
+# with streaming everything the microphone hears.
+#
+# Usage: python bot/benchmarks/bench_wake_word.py [--minutes N]
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+from speech_recognizer import SimpleVoiceRecorder
+from streaming_recognizer import FakeStreamingRecognizer
+from wake_word import TemplateKeywordSpotter, WakeWordListener
+from synthetic_audio import RATE, command_samples, noise_samples, word_samples
+
+# "Porter" as two syllables, the way a few different speakers might say it
+PORTER = [(230, 0.2), (160, 0.25)]
+PORTER_VARIANTS = [[(225, 0.25), (165, 0.3)], [(235, 0.17), (155, 0.22)], PORTER]
+CHATTER = [[(180, 0.2), (250, 0.3)], [(140, 0.4)], [(300, 0.15), (200, 0.15), (150, 0.2)],
+           [(230, 0.2), (230, 0.25)], [(160, 0.2), (230, 0.25)]]
+
+
+def ward_recording(minutes: float, seed: int = 0):
+    """Background noise with chatter every few seconds and a wake-word command every ~15 s."""
+    rng = random.Random(seed)
+    samples = array('h')
+    commands = 0
+    while len(samples) < minutes * 60 * RATE:
+        samples += noise_samples(rng.uniform(1.0, 3.0), seed=rng.randrange(1 << 30))
+        if rng.random() < 0.25:
+            samples += word_samples(rng.choice(PORTER_VARIANTS), speech_level=rng.uniform(3000, 7000),
+                                    seed=rng.randrange(1 << 30))
+            samples += noise_samples(0.1, seed=rng.randrange(1 << 30))
+            command, _ = command_samples(lead_silence=0.0, trail_silence=0.0, seed=rng.randrange(1 << 30))
+            samples += command
+            commands += 1
+        else:
+            for _ in range(rng.randint(1, 3)):
+                samples += word_samples(rng.choice(CHATTER), speech_level=rng.uniform(3000, 7000),
+                                        seed=rng.randrange(1 << 30))
+                samples += noise_samples(rng.uniform(0.05, 0.3), seed=rng.randrange(1 << 30))
+    return samples, commands
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the wake-word listener.")
+    parser.add_argument("--minutes", type=float, default=2.0)
+    args = parser.parse_args()
+
+    templates = [TemplateKeywordSpotter.template_from_samples(np.frombuffer(word_samples(PORTER, seed=s).tobytes(), '<i2'))
+                 for s in (1, 2)]
+    spotter = TemplateKeywordSpotter(templates)
+    with contextlib.redirect_stdout(io.StringIO()):
+        recorder = SimpleVoiceRecorder(recognizer=FakeStreamingRecognizer("porter take me to room 310"))
+    heard = []
+    listener = WakeWordListener(recorder, spotter, heard.append)
+
+    samples, expected = ward_recording(args.minutes)
+    data = samples.tobytes()
+    size = recorder.chunk * recorder.sample_width
+    chunks = [data[i:i + size] for i in range(0, len(data) - size + 1, size)]
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        listener.run(chunks)
+    elapsed = time.perf_counter() - start
+
+    total_seconds = len(data) / size * recorder.chunk / RATE
+    shipped_seconds = listener.shipped_bytes / recorder.sample_width / RATE
+    print(f"{total_seconds:.0f} s of audio, {expected} spoken commands")
+    print(f"wakes: {listener.wakes}, commands delivered: {listener.commands}")
+    print(f"speech-to-text: {listener.wakes} streams, {shipped_seconds:.1f} s of audio "
+          f"({shipped_seconds / total_seconds:.0%} of always-on streaming)")
+    print(f"first command heard as: '{heard[0] if heard else ''}'")
+    print(f"CPU: {elapsed / len(chunks) * 1e6:.0f} us per {recorder.chunk}-sample chunk "
+          f"({elapsed / total_seconds:.1%} of real time)")
@@ -0,0 +1,63 @@
+# synthetic_maps.py
+# Generators for synthetic ward maps used by the benchmark scripts.
+
+import os
+import random
+import sys
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from graph import Graph
+
+
+def grid_map(width: int, height: int, spacing: float = 5.0, jitter: float = 0.0, seed: Optional[int] = None) -> Graph:
+    """
+    A width x height grid of rooms, like an open-plan floor. Each connection
+    is at least as long as the straight line between its rooms, so the A*
+    heuristic stays admissible.
+    """
+    rng = random.Random(seed)
+    graph = Graph()
+    for row in range(height):
+        for col in range(width):
+            node_id = row * width + col
+            graph.add_node(node_id, f"room {node_id}", col * spacing, row * spacing)
+
+    for row in range(height):
+        for col in range(width):
+            node_id = row * width + col
+            if col + 1 < width:
+                graph.add_connection(node_id, node_id + 1, spacing + rng.uniform(0, jitter))
+            if row + 1 < height:
+                graph.add_connection(node_id, node_id + width, spacing + rng.uniform(0, jitter))
+    return graph
+
+
+def corridor_map(floors: int, corridor_length: int, rooms_per_stop: int = 2, spacing: float = 5.0) -> Graph:
+    """
+    Long hospital corridors, one per floor, with patient rooms branching off
+    each corridor stop and an elevator linking the floors at one end.
+    """
+    graph = Graph()
+    next_id = 0
+    corridor_ids = []
+    for floor in range(floors):
+        floor_ids = []
+        for stop in range(corridor_length):
+            graph.add_node(next_id, f"floor {floor} hall {stop}", stop * spacing, floor * spacing * 4)
+            floor_ids.append(next_id)
+            if stop:
+                graph.add_connection(next_id - 1 - rooms_per_stop, next_id, spacing)
+            corridor_id = next_id
+            next_id += 1
+            for room in range(rooms_per_stop):
+                side = 1 if room % 2 == 0 else -1
+                graph.add_node(next_id, f"room {floor}{stop:03d}{room}", stop * spacing, floor * spacing * 4 + side * spacing)
+                graph.add_connection(corridor_id, next_id, spacing)
+                next_id += 1
+        corridor_ids.append(floor_ids)
+
+    for floor in range(1, floors):
+        graph.add_connection(corridor_ids[floor - 1][0], corridor_ids[floor][0], spacing * 4)
+    return graph
@@ -0,0 +1,68 @@
+# audio_buffer.py
+
+from typing import List, Optional
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size ring of raw audio bytes, allocated once.
+
+    Writes copy each chunk into the ring (overwriting the oldest audio when
+    full); reads hand out memoryviews into it, one segment or two if the
+    requested span wraps around. After `clear()` the next `capacity` bytes
+    are stored contiguously, so a whole utterance is a single view.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._end = 0   # Next write position
+        self._size = 0  # Valid bytes, at most capacity
+
+    @classmethod
+    def for_duration(cls, seconds: float, rate: int, sample_width: int = 2) -> "AudioRingBuffer":
+        return cls(int(seconds * rate) * sample_width)
+
+    def clear(self):
+        self._end = 0
+        self._size = 0
+
+    def write(self, data: bytes):
+        data = memoryview(data).cast('B')
+        if len(data) >= self.capacity:
+            # Only the newest `capacity` bytes survive
+            self._view[:] = data[len(data) - self.capacity:]
+            self._end = 0
+            self._size = self.capacity
+            return
+
+        first = min(len(data), self.capacity - self._end)
+        self._view[self._end:self._end + first] = data[:first]
+        rest = len(data) - first
+        if rest:
+            self._view[:rest] = data[first:]
+        self._end = (self._end + len(data)) % self.capacity
+        self._size = min(self.capacity, self._size + len(data))
+
+    def views(self, nbytes: Optional[int] = None) -> List[memoryview]:
+        """The newest `nbytes` (default: everything), oldest first, without copying."""
+        nbytes = self._size if nbytes is None else min(nbytes, self._size)
+        if not nbytes:
+            return []
+        start = self._end - nbytes
+        if start >= 0:
+            return [self._view[start:self._end]]
+        return [self._view[start + self.capacity:], self._view[:self._end]]
+
+    def getvalue(self, nbytes: Optional[int] = None) -> bytes:
+        """The newest `nbytes` as one bytes object (a single copy)."""
+        segments = self.views(nbytes)
+        if len(segments) == 1:
+            return segments[0].tobytes()
+        return b''.join(segments)
+
+    def __len__(self) -> int:
+        return self._size
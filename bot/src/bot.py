@@ -1,27 +1,44 @@
 # bot/src/bot.py
 
-from typing import Callable, List, Any
+from typing import Callable, Dict, List, Any, Optional, Union
 import json
+import time
 from navigator import Navigator
+from route_planner import RoutePlan, RoutePlanner, Stop
+from reservations import CooperativePlanner, Schedule
+from replanner import DStarLite
 from graph import Graph, Node
 from gcp import GCP
 from speech_recognizer import SimpleVoiceRecorder
 
 class Bot:
-    def __init__(self, id: str, graph: Graph, starting_node: Node) -> None:
+    def __init__(self, id: str, graph: Graph, starting_node: Node, navigator: Optional[Navigator] = None,
+                 gcp: Optional[GCP] = None, voice_recorder: Optional[SimpleVoiceRecorder] = None) -> None:
+        """
+        navigator, gcp and voice_recorder can be passed in to share them
+        between bots (see the fleet manager); otherwise the bot creates its own.
+        A passed-in gcp must already be set up.
+        """
         # Set given params
         self.id = id
         self.graph = graph
         self.current_node = starting_node
 
         # Set navigator
-        self.navigator = Navigator()
+        self.navigator = navigator if navigator is not None else Navigator(use_route_table=True)
         self.path_to_destination: List[Node] = [] # Stores the planned path
+        self.route_planner: Optional[RoutePlanner] = None # Created on the first multi-stop trip
+        self.traffic: Optional[CooperativePlanner] = None # Shared path reservations, when the fleet enables them
+        self.seconds_per_step = 0.0 # Simulated travel time per connection; 0 moves instantly
+        # Called as listener(bot, event, data) on "location" (each node reached) and "shutdown"
+        self.state_listeners: List[Callable[["Bot", str, Dict[str, Any]], None]] = []
        
-        self.gcp = GCP(self.current_node, self.graph)
-        self.gcp._setup_gemini() # Setup Gemini AI
+        if gcp is None:
+            gcp = GCP(self.current_node, self.graph)
+            gcp._setup_gemini() # Setup Gemini AI
+        self.gcp = gcp
 
-        self.voice_recorder = SimpleVoiceRecorder() 
+        self.voice_recorder = voice_recorder if voice_recorder is not None else SimpleVoiceRecorder()
         
         self.command_map: dict[str, Callable[..., Any]] = { # type: ignore
             "move to": self.move_to_room,
@@ -31,6 +48,14 @@ class Bot:
     def shutdown(self):
         print("Bot shutting down signal received.")
         self.gcp._do_shutdown = True # Signal the bot to logically shut down
+        self._notify("shutdown")
+
+    def _notify(self, event: str, **data: Any):
+        for listener in list(self.state_listeners):
+            try:
+                listener(self, event, data)
+            except Exception as e:
+                print(f"Error in bot state listener: {e}") # A broken listener must not stop the bot
 
     # The `start` method with the input loop is removed, as control comes from the API.
     # The `_get_user_input_from_source` method is also removed, as input is received via API.
@@ -38,8 +63,10 @@ class Bot:
     def move_to_room(self, room_name: str):
         """
         Navigates the bot to the specified room using Dijkstra's algorithm.
+        Slightly-off room names ("room310", "lounge") are resolved locally
+        through the graph's name index.
         """
-        destination_node = self.graph.get_node_by_name(room_name)
+        destination_node = self.graph.find_node(room_name) if room_name else None
 
         if not destination_node:
             print(f"Room '{room_name}' not found. Please check the room name.")
@@ -51,7 +78,9 @@ class Bot:
             return "already_there" # Indicate to API that bot is already there
 
         print(f"Calculating path from {self.current_node.name} to {destination_node.name}...")
-        path = self.navigator.find_shortest_path(self.graph, self.current_node, destination_node)
+        schedule = self._plan_trip(destination_node)
+        path = schedule.path if schedule is not None else \
+            self.navigator.find_shortest_path(self.graph, self.current_node, destination_node)
 
         if path:
             self.path_to_destination = path
@@ -59,30 +88,174 @@ class Bot:
             for i, node in enumerate(path):
                 print(f"{i+1}. {node.name}")
 
-            self._execute_path()
+            if schedule is not None:
+                self._execute_schedule(schedule)
+            else:
+                self._execute_path()
             self.current_node = destination_node # Update current location after path execution
+            self.gcp.current_node = destination_node # Keep the prompt's "current location" in sync
             print(f"Successfully arrived at {self.current_node.name}.")
             return "success"
         else:
             print(f"Could not find a path from {self.current_node.name} to {destination_node.name}.")
             raise RuntimeError(f"Could not find path to {destination_node.name}.") # Raise error for API
 
+    def move_to_rooms(self, stops: List[Union[str, Stop]],
+                      on_arrival: Optional[Callable[[Stop], None]] = None) -> RoutePlan:
+        """
+        Visits several rooms in one trip, in the order the route planner finds
+        shortest (respecting any stop deadlines) rather than the order given.
+        Stops can be room names or `Stop`s carrying a priority, deadline and
+        task id; `on_arrival` is called as each one is reached.
+        """
+        resolved: List[Stop] = []
+        for stop in stops:
+            if isinstance(stop, Stop):
+                resolved.append(stop)
+                continue
+            room = self.graph.find_node(stop) if stop else None
+            if not room:
+                print(f"Room '{stop}' not found. Please check the room name.")
+                raise ValueError(f"Room '{stop}' not found.")
+            resolved.append(Stop(room))
+
+        if self.route_planner is None:
+            self.route_planner = RoutePlanner(self.graph, self.navigator)
+        plan = self.route_planner.plan(self.current_node, resolved)
+        for stop in plan.skipped:
+            print(f"Could not find a path from {self.current_node.name} to {stop.room.name}; skipping it.")
+        print(f"Visiting {len(plan.stops)} rooms ({plan.distance:.1f} total): "
+              + ", ".join(stop.room.name for stop in plan.stops))
+
+        for stop, leg in zip(plan.stops, plan.legs):
+            schedule = self._plan_trip(stop.room)
+            if schedule is not None:
+                self.path_to_destination = schedule.path
+                self._execute_schedule(schedule)
+            else:
+                self.path_to_destination = leg
+                self._execute_path()
+            self.current_node = stop.room
+            self.gcp.current_node = stop.room
+            print(f"Arrived at {stop.room.name}.")
+            if on_arrival is not None:
+                on_arrival(stop)
+        return plan
+
+    def _plan_trip(self, destination_node: Node) -> Optional[Schedule]:
+        """
+        Books a trip from the current node that stays clear of the corridors
+        other bots have reserved. None without shared reservations, or when
+        no conflict-free trip exists right now.
+        """
+        if self.traffic is None:
+            return None
+        schedule = self.traffic.plan(self.id, self.current_node, destination_node)
+        if schedule is None:
+            print("No conflict-free path right now; taking the shortest path.")
+        return schedule
+
+    def _execute_schedule(self, schedule: Schedule):
+        """
+        Follows a booked schedule on the wall clock, so the bot is wherever
+        the reservation table says it is: it holds its node through planned
+        waits and spends each connection's booked steps crossing it.
+
+        If a corridor is blocked or reweighted on the way, the rest of the
+        trip is planned and booked again from the bot's current node, falling
+        back to `_execute_path` when no conflict-free trip is left.
+        """
+        traffic: CooperativePlanner = self.traffic # type: ignore # Only called with reservations on
+        if schedule.wait_steps > 0:
+            print(f"Giving way to other bots: {schedule.wait_steps * traffic.step_seconds:.0f} s of waiting planned.")
+
+        print("\nExecuting schedule...")
+        goal = schedule.waypoints[-1][1]
+        waypoints = schedule.waypoints
+        edge_version = self.graph.edge_version
+        i = 1
+        while i < len(waypoints):
+            depart, prev_node = waypoints[i-1]
+            arrive, next_node = waypoints[i]
+            traffic.wait_until(depart)
+            if self.graph.edge_version != edge_version:
+                edge_version = self.graph.edge_version
+                print(f"Corridor change ahead, replanning from {prev_node.name}.")
+                schedule = traffic.plan(self.id, prev_node, goal)
+                if schedule is None:
+                    self.path_to_destination = self.navigator.find_shortest_path(self.graph, prev_node, goal) or []
+                    if not self.path_to_destination:
+                        self.gcp.current_node = prev_node
+                        raise RuntimeError(f"The way to {goal.name} is blocked; stopped at {prev_node.name}.")
+                    self._execute_path()
+                    return
+                self.path_to_destination = schedule.path
+                waypoints = schedule.waypoints
+                i = 1
+                continue
+            if next_node == prev_node:
+                if i == 1 or waypoints[i-2][1] != prev_node:
+                    print(f"Waiting at {prev_node.name} for other bots...")
+            else:
+                # Here you would add logic for actual movement
+                print(f"Moving from {prev_node.name} to {next_node.name}...")
+            traffic.wait_until(arrive)
+            if next_node != prev_node:
+                self.current_node = next_node
+                self._notify("location", location=next_node.name, destination=goal.name)
+            i += 1
+        print("Path execution complete.")
+        self.path_to_destination = [] # Clear the path after execution
+
     def _execute_path(self):
         """
         Simulates moving along the planned path.
         In a real application, this would involve more complex actions (e.g., controlling motors).
+
+        If a corridor is blocked or reweighted on the way, the rest of the
+        path is repaired from the bot's current node with D* Lite (later
+        changes on the same trip only re-expand what they affect). Raises
+        RuntimeError if the destination gets cut off.
         """
         if not self.path_to_destination:
             print("No path planned to execute.")
             return
 
         print("\nExecuting path...")
+        path = self.path_to_destination
+        edge_version = self.graph.edge_version
+        replanner: Optional[DStarLite] = None
         # Start from the second node in the path, as the first is the current_node
-        for i in range(1, len(self.path_to_destination)):
-            prev_node = self.path_to_destination[i-1]
-            next_node = self.path_to_destination[i]
+        i = 1
+        while i < len(path):
+            prev_node = path[i-1]
+            if self.graph.edge_version != edge_version:
+                edge_version = self.graph.edge_version
+                if replanner is None:
+                    replanner = DStarLite(self.graph, prev_node, path[-1])
+                else:
+                    replanner.move_to(prev_node)
+                    replanner.update()
+                rest = replanner.path()
+                if self.traffic is not None:
+                    self.traffic.reservations.release(self.id) # The booked schedule no longer applies
+                if rest is None:
+                    self.current_node = prev_node
+                    self.gcp.current_node = prev_node
+                    self.path_to_destination = []
+                    raise RuntimeError(f"The way to {path[-1].name} is blocked; stopped at {prev_node.name}.")
+                if rest != path[i-1:]:
+                    print(f"Corridor change ahead, rerouting from {prev_node.name}.")
+                    path = path[:i-1] + rest
+                    self.path_to_destination = path
+            next_node = path[i]
             # Here you would add logic for actual movement
             print(f"Moving from {prev_node.name} to {next_node.name}...")
+            if self.seconds_per_step:
+                time.sleep(self.seconds_per_step)
+            self.current_node = next_node
+            self._notify("location", location=next_node.name, destination=path[-1].name)
+            i += 1
         print("Path execution complete.")
         self.path_to_destination = [] # Clear the path after execution
 
@@ -0,0 +1,122 @@
+# command_prompt.py
+
+import hashlib
+import json
+from typing import Dict, List, Optional, Tuple
+from graph import Graph
+
+# This mapping helps Gemini (and the local parser) understand common language requests
+DESTINATION_MAPPINGS = {
+    "water": "room 100",
+    "drinks": "room 100",
+    "blankets": "room 100",
+    "restroom": "room 200",
+    "washroom": "room 200",
+    "food": "room 310",
+    "snacks": "room 310",
+    "kitchen": "room 310",
+    "lounge area": "room 310"
+}
+
+STATIC_TEMPLATE = """
+You are a navigation assistant for a bot named Porter. Parse the user's input and return a JSON response.
+
+Current Context:
+- Porter is operating within a hospital unit/ward.
+- Available destinations on this unit: {destinations}
+- Important common phrases and their implied destinations:
+  {implied_destinations}
+- Available commands: "move", "shutdown"
+
+Each request gives Porter's current location and the user's input.
+Parse the input and return ONLY a JSON object with this exact structure:
+{{
+    "command": "move" or "shutdown" or "unknown",
+    "destination": "destination_name" or null,
+    "confidence": 0.0 to 1.0
+}}
+
+Rules:
+1. If the user wants to go somewhere, use the "move" command and specify the destination from the available list. Use the implied destinations for common phrases.
+2. If the user wants to stop, quit, or shutdown, use the "shutdown" command.
+3. If the destination is unclear, not on the available list, or if the request is not a move/shutdown command, set command to "unknown" and destination to null.
+4. Your response must be ONLY the JSON object, with no other text or formatting.
+
+Examples:
+- "Take me to Room 305" -> {{"command": "move", "destination": "room 310", "confidence": 0.9}}
+- "I need to go to the washroom" -> {{"command": "move", "destination": "room 200", "confidence": 0.8}}
+- "I'm done, please shut down" -> {{"command": "shutdown", "destination": null, "confidence": 1.0}}
+- "Where is the cafeteria?" -> {{"command": "unknown", "destination": null, "confidence": 0.2}}
+- "Move" -> {{"command": "move", "destination": null, "confidence": 0.6}}
+"""
+
+REQUEST_TEMPLATE = """Current location: "{current_location}"
+User Input: "{user_input}"
+"""
+
+class CommandPrompt:
+    """
+    The Gemini prompt split into a static part (instructions, room list,
+    phrase mappings) and a small per-request part (location and input).
+
+    The static part is only re-rendered when the graph topology or the phrase
+    mappings change, so a command costs a short format call instead of a pass
+    over every node plus a large f-string.
+    """
+
+    def __init__(self, graph: Graph, destination_mappings: Dict[str, str]):
+        self.graph = graph
+        self.destination_mappings = dict(destination_mappings)
+        self._mappings_version = 0
+        # Bumped every time the static part is rebuilt. Per prompt only: models are
+        # keyed on context_hash, since two bots' prompts can share a version
+        self.version = 0
+        self._built_for: Optional[Tuple[int, int]] = None
+        self._static = ""
+        self._destinations: List[str] = []
+        self._context_hash = ""
+
+    def set_mappings(self, destination_mappings: Dict[str, str]):
+        self.destination_mappings = dict(destination_mappings)
+        self._mappings_version += 1
+
+    def _refresh(self):
+        built_for = (self.graph.version, self._mappings_version)
+        if built_for == self._built_for:
+            return
+
+        self._destinations = [node.name for node in self.graph.nodes.values()]
+        implied_destinations = ",\n  ".join(
+            f'"{phrase}" -> "{destination}"' for phrase, destination in self.destination_mappings.items()
+        )
+        self._static = STATIC_TEMPLATE.format(
+            destinations=', '.join(self._destinations),
+            implied_destinations=implied_destinations,
+        )
+        context = json.dumps([self._destinations, self.destination_mappings], sort_keys=True)
+        self._context_hash = hashlib.sha1(context.encode('utf-8')).hexdigest()[:16]
+        self._built_for = built_for
+        self.version += 1
+
+    @property
+    def static_prefix(self) -> str:
+        self._refresh()
+        return self._static
+
+    @property
+    def destinations(self) -> List[str]:
+        self._refresh()
+        return self._destinations
+
+    @property
+    def context_hash(self) -> str:
+        """Changes whenever the room list or the phrase mappings change."""
+        self._refresh()
+        return self._context_hash
+
+    def request_part(self, current_location: str, user_input: str) -> str:
+        return REQUEST_TEMPLATE.format(current_location=current_location, user_input=user_input)
+
+    def render(self, current_location: str, user_input: str) -> str:
+        """The full prompt, for models that get everything in one message."""
+        return self.static_prefix + "\n" + self.request_part(current_location, user_input)
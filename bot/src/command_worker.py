@@ -0,0 +1,51 @@
+# command_worker.py
+
+import contextvars
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+_STOP = object()
+
+class CommandWorker:
+    """
+    Runs a bot's commands one at a time on a dedicated thread.
+
+    Requests can be parsed concurrently, but a bot can only be in one place
+    at a time, so execution is queued per bot. Each job runs in a copy of the
+    submitter's context, which keeps per-request log capture working.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"command-worker-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        future: Future = Future()
+        context = contextvars.copy_context()
+        self._queue.put((future, context, fn, args))
+        return future
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            future, context, fn, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(context.run(fn, *args))
+            except BaseException as e:
+                future.set_exception(e)
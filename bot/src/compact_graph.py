@@ -0,0 +1,185 @@
+# compact_graph.py
+
+from array import array
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Sequence, Tuple
+from graph import EdgeChanges, Graph, Node, edge_key
+from name_index import NameIndex
+
+class CompactGraph(EdgeChanges):
+    """
+    Read-only graph stored in CSR (compressed sparse row) form.
+
+    Nodes are numbered 0..n-1 internally. The edges of node index i live in
+    targets[offsets[i]:offsets[i + 1]] with their distances at the same
+    positions in weights, so the whole map is three flat arrays instead of a
+    dict per edge. Node ids and the `get_neighbors`/`get_node_by_id` API are
+    the same as `Graph`, so Navigator and Bot work with either.
+
+    The arrays are never written (they may be memory-mapped from a snapshot):
+    blocked corridors and changed distances live in a small overlay that
+    `iter_edges` applies.
+    """
+
+    def __init__(self, nodes: List[Node], offsets: Sequence[int], targets: Sequence[int], weights: Sequence[float]):
+        if len(offsets) != len(nodes) + 1 or len(targets) != len(weights):
+            raise ValueError("CSR arrays do not match the number of nodes/edges.")
+
+        self.node_list = nodes
+        self.nodes: Dict[int, Node] = {node.id: node for node in nodes}
+        self.index: Dict[int, int] = {node.id: i for i, node in enumerate(nodes)}
+        self.ids = array('q', (node.id for node in nodes))
+        self._name_index: Optional[NameIndex] = None
+        self.aliases: Dict[str, Optional[int]] = {} # Other names find_node accepts, e.g. room types
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        # The topology never changes after construction
+        self.version = 0
+        self._init_edge_changes()
+        self._overrides: Dict[Tuple[int, int], float] = {} # Changed distances by edge_key
+        self.search_mode: Optional[str] = None
+
+    @classmethod
+    def from_edges(cls, nodes: Iterable[Tuple[Any, ...]], edges: Iterable[Tuple[int, int, float]]) -> "CompactGraph":
+        """
+        Builds the CSR arrays in bulk from (id, name) or (id, name, x, y) and
+        undirected (node_a_id, node_b_id, distance) records.
+        """
+        node_list = [Node(*record) for record in nodes]
+        index = {node.id: i for i, node in enumerate(node_list)}
+        edge_list = list(edges)
+
+        degree = [0] * len(node_list)
+        for node_a_id, node_b_id, _ in edge_list:
+            if node_a_id not in index or node_b_id not in index:
+                raise ValueError(f"One or both nodes ({node_a_id}, {node_b_id}) not found in graph.")
+            degree[index[node_a_id]] += 1
+            degree[index[node_b_id]] += 1
+
+        offsets = array('q', [0]) * (len(node_list) + 1)
+        for i, count in enumerate(degree):
+            offsets[i + 1] = offsets[i] + count
+
+        targets = array('q', [0]) * offsets[-1]
+        weights = array('d', [0.0]) * offsets[-1]
+        cursor = list(offsets[:-1])
+        for node_a_id, node_b_id, distance in edge_list:
+            a, b = index[node_a_id], index[node_b_id]
+            # Undirected, same as Graph.add_connection
+            targets[cursor[a]] = b
+            weights[cursor[a]] = distance
+            cursor[a] += 1
+            targets[cursor[b]] = a
+            weights[cursor[b]] = distance
+            cursor[b] += 1
+
+        return cls(node_list, offsets, targets, weights)
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> "CompactGraph":
+        """
+        Freezes a mutable `Graph` into CSR form. Blocked corridors are kept,
+        still blocked, so they can be reopened later.
+        """
+        node_list = [Node(node.id, node.name, node.x, node.y) for node in graph.nodes.values()]
+        index = {node.id: i for i, node in enumerate(node_list)}
+
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = array('d')
+        for node in node_list:
+            # Not iter_edges, which skips blocked edges
+            for neighbor_info in graph.get_neighbors(node):
+                targets.append(index[neighbor_info['node'].id])
+                weights.append(neighbor_info['distance'])
+            offsets.append(len(targets))
+
+        compact = cls(node_list, offsets, targets, weights)
+        compact.blocked.update(graph.blocked)
+        for alias, node_id in graph.aliases.items():
+            compact.add_alias(alias, node_id)
+        compact.search_mode = graph.search_mode
+        return compact
+
+    @property
+    def name_index(self) -> NameIndex:
+        # Built on the first name lookup so loading a large map stays cheap
+        if self._name_index is None:
+            self._name_index = NameIndex()
+            for node in self.node_list:
+                self._name_index.add(node.name, node.id)
+            for alias, node_id in self.aliases.items():
+                self._name_index.add_alias(alias, node_id)
+        return self._name_index
+
+    def add_alias(self, alias: str, node_id: Optional[int]):
+        """
+        Another name `find_node` accepts for a node, e.g. its room type
+        ("Lounge Area"). None marks a name several nodes share ("Patient Room").
+        """
+        if node_id is None or node_id in self.nodes:
+            self.aliases[alias] = node_id
+            if self._name_index is not None:
+                self._name_index.add_alias(alias, node_id)
+
+    def get_node_by_id(self, node_id: int) -> Node:
+        return self.nodes.get(node_id) # type: ignore
+
+    def get_node_by_name(self, node_name: str) -> Node | None:
+        node_id = self.name_index.exact(node_name)
+        return self.nodes[node_id] if node_id is not None else None
+
+    def find_node(self, node_name: str) -> Node | None:
+        node_id = self.name_index.resolve(node_name)
+        return self.nodes[node_id] if node_id is not None else None
+
+    def get_neighbors(self, node: Node) -> List[Dict[str, Any]]:
+        """Same shape as `Graph.get_neighbors`; built on demand from the arrays."""
+        i: Optional[int] = self.index.get(node.id)
+        if i is None:
+            return []
+        start, end = self.offsets[i], self.offsets[i + 1]
+        overrides = self._overrides
+        return [{'node': self.node_list[self.targets[k]],
+                 'distance': overrides.get(edge_key(node.id, self.ids[self.targets[k]]), self.weights[k]) if overrides else self.weights[k]}
+                for k in range(start, end)]
+
+    def iter_edges(self, node_id: int) -> Iterator[Tuple[int, float]]:
+        """Returns (neighbor_id, distance) pairs straight from the CSR arrays."""
+        i: Optional[int] = self.index.get(node_id)
+        if i is None:
+            return iter(())
+        start, end = self.offsets[i], self.offsets[i + 1]
+        edges = zip(map(self.ids.__getitem__, self.targets[start:end]), self.weights[start:end])
+        if not self.blocked and not self._overrides:
+            return edges
+        return self._with_overlay(node_id, edges)
+
+    def _with_overlay(self, node_id: int, edges: Iterator[Tuple[int, float]]) -> Iterator[Tuple[int, float]]:
+        blocked, overrides = self.blocked, self._overrides
+        for neighbor_id, distance in edges:
+            key = edge_key(node_id, neighbor_id)
+            if key in blocked:
+                continue
+            yield neighbor_id, overrides.get(key, distance)
+
+    def edge_distance(self, node_a_id: int, node_b_id: int) -> Optional[float]:
+        """The connection's distance (ignoring blocks), or None if the nodes aren't connected."""
+        override = self._overrides.get(edge_key(node_a_id, node_b_id))
+        if override is not None:
+            return override
+        i: Optional[int] = self.index.get(node_a_id)
+        b: Optional[int] = self.index.get(node_b_id)
+        if i is None or b is None:
+            return None
+        for k in range(self.offsets[i], self.offsets[i + 1]):
+            if self.targets[k] == b:
+                return self.weights[k]
+        return None
+
+    def _store_edge_distance(self, node_a_id: int, node_b_id: int, distance: float):
+        self._overrides[edge_key(node_a_id, node_b_id)] = distance
+
+    def edge_count(self) -> int:
+        """Number of undirected connections."""
+        return len(self.targets) // 2
@@ -0,0 +1,205 @@
+# dispatcher.py
+
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+from graph import Graph, Node
+from navigator import Navigator
+from latency_stats import LatencyStats
+
+# Lower sorts first; unknown priorities are treated as "normal"
+PRIORITY_ORDER = {"high": 0, "normal": 1, "low": 2}
+# How much a task's travel cost counts when the batch is optimised as a whole
+PRIORITY_WEIGHT = {"high": 3.0, "normal": 1.0, "low": 0.5}
+STRATEGIES = ("greedy", "hungarian")
+
+
+class BotCandidate(NamedTuple):
+    bot_id: str
+    node: Node
+    battery: float = 100.0 # Percent
+
+
+class TaskRequest(NamedTuple):
+    task_id: Any
+    room: Node
+    priority: str = "normal"
+
+
+class Assignment(NamedTuple):
+    task_id: Any
+    bot_id: str
+    room: Node
+    distance: float # Travel distance from the bot to the room
+    cost: float     # Distance plus the bot's battery penalty
+
+
+class Dispatcher:
+    """
+    Assigns queued tasks to idle bots by travel cost.
+
+    A bot's cost for a task is its shortest-path distance to the task's room
+    plus a battery penalty (`battery_weight` distance units per missing
+    percent); bots under `min_battery` are not dispatched.
+
+    "greedy" takes tasks in priority order and gives each the cheapest bot
+    still free, using one multi-source Dijkstra from all idle bots (rerun only
+    when a task's nearest bot has just been taken). "hungarian" takes the
+    highest-priority tasks that can be served this tick and solves the
+    task/bot matrix optimally, weighting each task's cost by its priority.
+
+    Latency of every `assign` call is recorded in `stats` by strategy.
+    """
+
+    def __init__(self, graph: Graph, navigator: Optional[Navigator] = None, strategy: str = "greedy",
+                 battery_weight: float = 0.5, min_battery: float = 20.0):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown dispatch strategy '{strategy}'. Expected one of {STRATEGIES}.")
+        self.graph = graph
+        self.navigator = navigator if navigator is not None else Navigator()
+        self.strategy = strategy
+        self.battery_weight = battery_weight
+        self.min_battery = min_battery
+        self.stats = LatencyStats()
+
+    def penalty(self, bot: BotCandidate) -> float:
+        return self.battery_weight * max(0.0, 100.0 - bot.battery)
+
+    def assign(self, tasks: Sequence[TaskRequest], bots: Sequence[BotCandidate],
+               strategy: Optional[str] = None) -> List[Assignment]:
+        """Assignments for this tick; tasks left over wait for the next one."""
+        strategy = strategy or self.strategy
+        start = time.perf_counter()
+        bots = [bot for bot in bots if bot.battery >= self.min_battery]
+        tasks = sorted(tasks, key=lambda task: PRIORITY_ORDER.get(task.priority, 1)) # Stable: arrival order within a priority
+        if not bots or not tasks:
+            assignments: List[Assignment] = []
+        elif strategy == "greedy":
+            assignments = self._greedy(tasks, bots)
+        elif strategy == "hungarian":
+            assignments = self._hungarian(tasks, bots)
+        else:
+            raise ValueError(f"Unknown dispatch strategy '{strategy}'. Expected one of {STRATEGIES}.")
+        self.stats.record(strategy, time.perf_counter() - start)
+        return assignments
+
+    def _greedy(self, tasks: Sequence[TaskRequest], bots: Sequence[BotCandidate]) -> List[Assignment]:
+        # The cheapest free bot at each node stands in for that node in the search
+        free: Dict[int, List[BotCandidate]] = {}
+        for bot in sorted(bots, key=self.penalty):
+            free.setdefault(bot.node.id, []).append(bot)
+
+        distances: Dict[int, float] = {}
+        origin: Dict[int, int] = {}
+        taken_since_search = set() # Nodes whose search result no longer matches their free bots
+        assignments: List[Assignment] = []
+        for index, task in enumerate(tasks):
+            if not free:
+                break
+            room_id = task.room.id
+            if room_id not in origin or origin[room_id] in taken_since_search:
+                # The nearest bot for this room was taken (or never searched): search again
+                # from the bots still free, for every room not assigned yet
+                sources = {node_id: self.penalty(candidates[0]) for node_id, candidates in free.items()}
+                distances, origin = self.navigator.multi_source_distances(
+                    self.graph, sources, targets={t.room.id for t in tasks[index:]})
+                taken_since_search.clear()
+                if room_id not in origin:
+                    continue # Unreachable from every free bot
+
+            bot = free[origin[room_id]].pop(0)
+            taken_since_search.add(bot.node.id)
+            if not free[bot.node.id]:
+                del free[bot.node.id]
+            cost = distances[room_id]
+            assignments.append(Assignment(task.task_id, bot.bot_id, task.room, cost - self.penalty(bot), cost))
+        return assignments
+
+    def _hungarian(self, tasks: Sequence[TaskRequest], bots: Sequence[BotCandidate]) -> List[Assignment]:
+        batch = list(tasks[:len(bots)]) # Highest priority first; the rest wait for the next tick
+        bot_nodes = {bot.node.id for bot in bots}
+        unreachable = float('inf')
+        distance_rows = []
+        route_table = self.navigator._get_route_table(self.graph) if self.navigator.use_route_table else None
+        for task in batch:
+            if route_table is not None:
+                distance_rows.append([route_table.get_distance(task.room, bot.node) for bot in bots])
+                continue
+            # Undirected connections: distance room -> bot equals bot -> room
+            distances, _ = self.navigator.multi_source_distances(self.graph, {task.room.id: 0.0}, targets=bot_nodes)
+            distance_rows.append([distances.get(bot.node.id, unreachable) for bot in bots])
+
+        finite = [d for row in distance_rows for d in row if d != unreachable]
+        big = (max(finite) if finite else 0.0) * 10 + 1e6
+        cost_matrix = [
+            [PRIORITY_WEIGHT.get(task.priority, 1.0) * (distance + self.penalty(bot)) if distance != unreachable else big
+             for distance, bot in zip(row, bots)]
+            for task, row in zip(batch, distance_rows)
+        ]
+
+        assignments = []
+        for row, column in enumerate(hungarian(cost_matrix)):
+            distance = distance_rows[row][column]
+            if distance == unreachable:
+                continue
+            task, bot = batch[row], bots[column]
+            assignments.append(Assignment(task.task_id, bot.bot_id, task.room, distance, distance + self.penalty(bot)))
+        return assignments
+
+
+def hungarian(cost: List[List[float]]) -> List[int]:
+    """
+    Minimum-cost assignment for a rows <= columns cost matrix (Kuhn-Munkres
+    with potentials, O(rows^2 * columns)). Returns the column for each row.
+    """
+    rows = len(cost)
+    if not rows:
+        return []
+    columns = len(cost[0])
+    if rows > columns:
+        raise ValueError("hungarian() needs at least as many columns as rows")
+
+    inf = float('inf')
+    u = [0.0] * (rows + 1)
+    v = [0.0] * (columns + 1)
+    matched_row = [0] * (columns + 1) # 1-based row matched to each column, 0 = free
+    way = [0] * (columns + 1)
+    for row in range(1, rows + 1):
+        matched_row[0] = row
+        column0 = 0
+        min_slack = [inf] * (columns + 1)
+        used = [False] * (columns + 1)
+        while True:
+            used[column0] = True
+            row0 = matched_row[column0]
+            delta = inf
+            column1 = 0
+            costs = cost[row0 - 1]
+            for column in range(1, columns + 1):
+                if used[column]:
+                    continue
+                slack = costs[column - 1] - u[row0] - v[column]
+                if slack < min_slack[column]:
+                    min_slack[column] = slack
+                    way[column] = column0
+                if min_slack[column] < delta:
+                    delta = min_slack[column]
+                    column1 = column
+            for column in range(columns + 1):
+                if used[column]:
+                    u[matched_row[column]] += delta
+                    v[column] -= delta
+                else:
+                    min_slack[column] -= delta
+            column0 = column1
+            if matched_row[column0] == 0:
+                break
+        while column0:
+            column1 = way[column0]
+            matched_row[column0] = matched_row[column1]
+            column0 = column1
+
+    result = [0] * rows
+    for column in range(1, columns + 1):
+        if matched_row[column]:
+            result[matched_row[column] - 1] = column - 1
+    return result
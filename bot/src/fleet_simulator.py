@@ -0,0 +1,279 @@
+# fleet_simulator.py
+
+import heapq
+import itertools
+import random
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+from graph import Graph, Node
+from navigator import Navigator
+from dispatcher import BotCandidate, Dispatcher, TaskRequest
+from bot import Bot
+from gcp import GCP
+from command_prompt import DESTINATION_MAPPINGS
+from llm_backend import LocalStubBackend
+from parse_cache import ParseCache
+from speech_recognizer import SimpleVoiceRecorder
+from streaming_recognizer import FakeStreamingRecognizer
+
+# Phrasings for tasks that arrive as free-text requests. The first is answered
+# by the local intent parser, the others need the (stubbed) model.
+COMMAND_TEMPLATES = (
+    "move to {room}",
+    "could you take these supplies over to {room} please",
+    "the patient in {room} is asking for a porter",
+)
+
+
+class SimTask(NamedTuple):
+    task_id: int
+    room: Node
+    priority: str
+    arrival: float                 # Simulated seconds since the start
+    command: Optional[str] = None  # Free-text request the assigned bot must parse, if any
+
+
+class SimulationReport(NamedTuple):
+    bots: int
+    tasks: int
+    completed: int
+    failed: int                    # Unparseable command or unreachable room
+    misrouted: int                 # Free-text requests parsed to the wrong room
+    simulated_seconds: float
+    tasks_per_hour: float
+    latency_p50_s: float           # Task arrival to service finished
+    latency_p95_s: float
+    wait_p50_s: float              # Task arrival to a bot being assigned
+    wait_p95_s: float
+    utilization: float             # Share of bot time spent travelling or serving
+    events: int
+    wall_seconds: float
+    dispatch_ms_p95: float
+
+
+def poisson_tasks(graph: Graph, rate_per_hour: float, duration_seconds: float, seed: Optional[int] = None,
+                  command_fraction: float = 0.0, rooms: Optional[Sequence[Node]] = None) -> List[SimTask]:
+    """
+    A synthetic task stream: Poisson arrivals at `rate_per_hour` to random
+    rooms, 20% high / 60% normal / 20% low priority. `command_fraction` of
+    them arrive as free-text requests instead of structured tasks.
+    """
+    rng = random.Random(seed)
+    rooms = list(rooms) if rooms is not None else list(graph.nodes.values())
+    tasks = []
+    now = 0.0
+    for task_id in itertools.count(1):
+        now += rng.expovariate(rate_per_hour / 3600.0)
+        if now > duration_seconds:
+            break
+        room = rng.choice(rooms)
+        priority = rng.choices(("high", "normal", "low"), weights=(2, 6, 2))[0]
+        command = rng.choice(COMMAND_TEMPLATES).format(room=room.name) if rng.random() < command_fraction else None
+        tasks.append(SimTask(task_id, room, priority, now, command))
+    return tasks
+
+
+def build_bots(graph: Graph, count: int, navigator: Navigator, seed: Optional[int] = None) -> List[Bot]:
+    """
+    `count` Bots at random nodes, sharing one navigator, a local stub model
+    backend, a parse cache and a speech stub, so nothing leaves the machine.
+    """
+    rng = random.Random(seed)
+    nodes = list(graph.nodes.values())
+    backend = LocalStubBackend(graph, DESTINATION_MAPPINGS)
+    parse_cache = ParseCache()
+    voice_recorder = SimpleVoiceRecorder(streaming=True, recognizer=FakeStreamingRecognizer("", 16000))
+    bots = []
+    for i in range(count):
+        start = rng.choice(nodes)
+        gcp = GCP(start, graph, backend=backend, parse_cache=parse_cache)
+        bots.append(Bot(f"Porter-{i + 1:03d}", graph, start, navigator=navigator, gcp=gcp,
+                        voice_recorder=voice_recorder))
+    return bots
+
+
+class FleetSimulator:
+    """
+    Discrete-event simulation of a fleet working through a task stream.
+
+    Simulated time jumps from event to event (task arrivals, dispatch
+    rounds, a bot reaching the next node, service finished), so a shift of
+    work runs in seconds. The real pieces do the work: the Dispatcher
+    assigns tasks, each Bot's Navigator plans its path and its GCP parses
+    free-text requests, and the bot's `current_node` follows the path edge
+    by edge at `speed` map units per second. Each task then takes
+    `service_seconds` at the room.
+
+    With `dispatch_interval` 0, open tasks are assigned as soon as a task
+    arrives or a bot frees up; otherwise in rounds, like the API's
+    DispatchService.
+    """
+
+    def __init__(self, graph: Graph, bots: Sequence[Bot], dispatcher: Optional[Dispatcher] = None,
+                 speed: float = 1.0, service_seconds: float = 30.0, dispatch_interval: float = 0.0):
+        self.graph = graph
+        self.bots = {bot.id: bot for bot in bots}
+        navigator = bots[0].navigator if bots else None
+        self.dispatcher = dispatcher if dispatcher is not None else Dispatcher(graph, navigator)
+        self.speed = speed
+        self.service_seconds = service_seconds
+        self.dispatch_interval = dispatch_interval
+
+    def run(self, tasks: Sequence[SimTask], until: Optional[float] = None) -> SimulationReport:
+        """
+        Simulates until every task is done (or failed), or until `until`
+        simulated seconds. Tasks still open at the end count as not completed;
+        tasks no idle bot can reach once nothing else is happening count as failed.
+        """
+        began = time.perf_counter()
+        self._events: List[Any] = []
+        self._sequence = itertools.count()
+        self._now = 0.0
+        self._open: List[SimTask] = []
+        self._idle = set(self.bots)
+        self._trips: Dict[str, Dict[str, Any]] = {}
+        self._busy_seconds = 0.0
+        self._latencies: List[float] = []
+        self._waits: List[float] = []
+        self._failed = 0
+        self._misrouted = 0
+        self._dispatch_pending = False
+        self._tasks_by_id = {task.task_id: task for task in tasks}
+
+        for task in tasks:
+            self._push(task.arrival, "arrival", task)
+        if self.dispatch_interval > 0:
+            self._push(self.dispatch_interval, "dispatch", None)
+
+        events = 0
+        remaining = len(tasks)
+        while self._events and remaining > 0:
+            when, _, kind, payload = heapq.heappop(self._events)
+            if until is not None and when > until:
+                break
+            self._now = when
+            events += 1
+            if kind == "arrival":
+                self._open.append(payload)
+                self._request_dispatch()
+            elif kind == "dispatch":
+                self._dispatch_pending = False
+                remaining -= self._dispatch()
+                if not self._trips and not self._events:
+                    # No bot out and nothing left to arrive: what is still open can't be placed
+                    self._failed += len(self._open)
+                    self._open = []
+                    break
+                if self.dispatch_interval > 0:
+                    self._push(self._now + self.dispatch_interval, "dispatch", None)
+            elif kind == "step":
+                self._step(payload)
+            elif kind == "done":
+                remaining -= self._finish(payload)
+
+        end = self._now if until is None else until
+        # Bots still out at the end have been busy up to now
+        for trip in self._trips.values():
+            self._busy_seconds += end - trip["started"]
+        return self._report(len(tasks), end, events, time.perf_counter() - began)
+
+    def _push(self, when: float, kind: str, payload: Any):
+        heapq.heappush(self._events, (when, next(self._sequence), kind, payload))
+
+    def _request_dispatch(self):
+        if self.dispatch_interval <= 0 and not self._dispatch_pending:
+            self._dispatch_pending = True
+            self._push(self._now, "dispatch", None)
+
+    def _dispatch(self) -> int:
+        """Assigns open tasks to idle bots; returns how many tasks failed outright."""
+        if not self._open or not self._idle:
+            return 0
+        candidates = [BotCandidate(bot_id, self.bots[bot_id].current_node) for bot_id in sorted(self._idle)]
+        requests = [TaskRequest(task.task_id, task.room, task.priority) for task in self._open]
+        assigned = set()
+        failed = 0
+        for assignment in self.dispatcher.assign(requests, candidates):
+            task = self._tasks_by_id[assignment.task_id]
+            assigned.add(task.task_id)
+            self._idle.discard(assignment.bot_id)
+            self._waits.append(self._now - task.arrival)
+            if not self._start_trip(self.bots[assignment.bot_id], task):
+                failed += 1
+                self._idle.add(assignment.bot_id)
+        if assigned:
+            self._open = [task for task in self._open if task.task_id not in assigned]
+        return failed
+
+    def _start_trip(self, bot: Bot, task: SimTask) -> bool:
+        destination: Optional[Node] = task.room
+        if task.command is not None:
+            # The bot hears the request itself and has to work out where to go
+            command, params = bot.gcp.parse_command_with_gemini(task.command)
+            destination = self.graph.find_node(params[0]) if command == "move" and params and params[0] else None
+            if destination is not None and destination.id != task.room.id:
+                self._misrouted += 1
+        path = bot.navigator.find_shortest_path(self.graph, bot.current_node, destination) if destination else None
+        if path is None:
+            self._failed += 1
+            return False
+
+        bot.path_to_destination = path
+        self._trips[bot.id] = {"task": task, "path": path, "index": 0, "started": self._now}
+        self._advance(bot.id)
+        return True
+
+    def _advance(self, bot_id: str):
+        trip = self._trips[bot_id]
+        path, index = trip["path"], trip["index"]
+        if index + 1 >= len(path):
+            self._push(self._now + self.service_seconds, "done", bot_id)
+            return
+        distance = self.graph.edge_distance(path[index].id, path[index + 1].id) or 0.0
+        self._push(self._now + distance / self.speed, "step", bot_id)
+
+    def _step(self, bot_id: str):
+        trip = self._trips[bot_id]
+        trip["index"] += 1
+        bot = self.bots[bot_id]
+        bot.current_node = trip["path"][trip["index"]]
+        bot.gcp.current_node = bot.current_node
+        self._advance(bot_id)
+
+    def _finish(self, bot_id: str) -> int:
+        trip = self._trips.pop(bot_id)
+        task: SimTask = trip["task"]
+        self.bots[bot_id].path_to_destination = []
+        self._busy_seconds += self._now - trip["started"]
+        self._latencies.append(self._now - task.arrival)
+        self._idle.add(bot_id)
+        self._request_dispatch()
+        return 1
+
+    def _report(self, task_count: int, end: float, events: int, wall_seconds: float) -> SimulationReport:
+        completed = len(self._latencies)
+        dispatch = self.dispatcher.stats.summary()["paths"].get(self.dispatcher.strategy, {})
+        return SimulationReport(
+            bots=len(self.bots),
+            tasks=task_count,
+            completed=completed,
+            failed=self._failed,
+            misrouted=self._misrouted,
+            simulated_seconds=end,
+            tasks_per_hour=completed / end * 3600 if end > 0 else 0.0,
+            latency_p50_s=_percentile(self._latencies, 0.5),
+            latency_p95_s=_percentile(self._latencies, 0.95),
+            wait_p50_s=_percentile(self._waits, 0.5),
+            wait_p95_s=_percentile(self._waits, 0.95),
+            utilization=self._busy_seconds / (len(self.bots) * end) if self.bots and end > 0 else 0.0,
+            events=events,
+            wall_seconds=wall_seconds,
+            dispatch_ms_p95=dispatch.get("p95_ms", 0.0),
+        )
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
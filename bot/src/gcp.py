@@ -1,36 +1,74 @@
 # gcp.py
 
-from typing import Callable, Tuple, List, Any
+from typing import Callable, Dict, Optional, Tuple, List, Any
 import os
 import json
+import time
 
 # These would be in your project structure
 from graph import Graph, Node
 from navigator import Navigator
-
-import google.generativeai as genai
+from intent_parser import LocalIntentParser
+from latency_stats import LatencyStats
+from parse_cache import ParseCache
+from command_prompt import CommandPrompt, DESTINATION_MAPPINGS
+from llm_backend import LLMBackend, MicroBatcher, ParseRequest, create_backend, shared_model_loop
 
 class GCP:
     _do_shutdown = False
 
-    def __init__(self, current_node: Node, graph: Graph):
+    def __init__(self, current_node: Node, graph: Graph, backend: Optional[LLMBackend] = None,
+                 parse_cache: Optional[ParseCache] = None, batcher: Optional[MicroBatcher] = None):
         """
         Initializes the GCP instance.
+
+        Args:
+            backend: Model used for commands the local parser can't handle.
+                Chosen by PORTER_LLM_BACKEND in _setup_gemini() when not given.
+            parse_cache, batcher: Shared across bots by the fleet manager;
+                a private cache (and batcher, if configured) otherwise.
         """
         self.current_node = current_node
         self.graph = graph
-        self.gemini_model = None
+        self.backend = backend
+        self.batcher = batcher
+        self.destination_mappings = dict(DESTINATION_MAPPINGS)
+        self.intent_parser = LocalIntentParser(graph, self.destination_mappings)
+        self.prompt = CommandPrompt(graph, self.destination_mappings)
+        self.parse_stats = LatencyStats()
+        self.parse_cache = parse_cache if parse_cache is not None else ParseCache.from_env()
         print("GCP module initialized.")
 
+    def set_destination_mappings(self, destination_mappings: Dict[str, str]):
+        """Replaces the common-phrase mappings and drops parse results based on the old ones."""
+        self.destination_mappings = dict(destination_mappings)
+        self.intent_parser.update_mappings(self.destination_mappings)
+        self.prompt.set_mappings(self.destination_mappings)
+        self.parse_cache.invalidate()
+
     def _setup_gemini(self):
-        """Initialize Gemini AI with API key from environment."""
-        api_key = os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY environment variable not set. This bot requires Gemini AI to function.")
-        
-        genai.configure(api_key=api_key)
-        self.gemini_model = genai.GenerativeModel('gemini-1.5-flash') # Using a common, powerful model
-        print("Gemini initialized successfully.")
+        """
+        Initialize the command-parsing backend: Gemini (API key from the
+        environment) or, with PORTER_LLM_BACKEND=stub, the local stand-in.
+        PORTER_LLM_BATCH_WINDOW_MS > 0 merges concurrent requests into one model call.
+        """
+        if self.backend is None:
+            self.backend = create_backend(os.getenv('PORTER_LLM_BACKEND', 'gemini'), self.graph, self.destination_mappings)
+
+        batch_window_ms = float(os.getenv('PORTER_LLM_BATCH_WINDOW_MS', '0'))
+        if batch_window_ms > 0 and self.backend.supports_batching and self.batcher is None:
+            self.batcher = MicroBatcher(self.backend, window_ms=batch_window_ms)
+        print(f"{self.backend.name.capitalize()} initialized successfully.")
+
+    def _build_request(self, user_input: str) -> ParseRequest:
+        if self.backend is None:
+            raise RuntimeError("No model backend is initialized. Call _setup_gemini() first.")
+        return ParseRequest(
+            static_prefix=self.prompt.static_prefix,
+            prompt_key=self.prompt.context_hash,
+            request_part=self.prompt.request_part(self.current_node.name, user_input),
+            user_input=user_input,
+        )
     
     def listen_for_command(self) -> Tuple[str, List[Any]]:
         """
@@ -55,68 +93,68 @@ class GCP:
 
     def parse_command_with_gemini(self, user_input: str) -> Tuple[str, List[str]]:
         """
-        Use Gemini to parse natural language input into commands and parameters.
-        """
-        available_destinations = self.get_available_destinations()
-        current_location = self.current_node.name
-        
-        # This mapping helps Gemini understand common language requests
-        destination_mappings = {
-            "water": "room 100",
-            "drinks": "room 100",
-            "blankets": "room 100",
-            "restroom": "room 200",
-            "washroom": "room 200",
-            "food": "room 310",
-            "snacks": "room 310",
-            "kitchen": "room 310",
-            "lounge area": "room 310"
-        }
-        
-        implied_dest_list = []
-        
-        for phrase, dest in destination_mappings.items():
-            implied_dest_list.append(f'"{phrase}" -> "{dest}"')
-        implied_dest_str = ",\n          ".join(implied_dest_list)
-
-
-        prompt = f"""
-        You are a navigation assistant for a bot named Porter. Parse the user's input and return a JSON response.
+        Parse natural language input into commands and parameters.
 
-        Current Context:
-        - Porter is operating within a hospital unit/ward.
-        - Current location: "{current_location}"
-        - Available destinations on this unit: {', '.join(available_destinations)}
-        - Important common phrases and their implied destinations:
-          {implied_dest_str}
-        - Available commands: "move", "shutdown"
-        
-        User Input: "{user_input}"
-
-        Parse this input and return ONLY a JSON object with this exact structure:
-        {{
-            "command": "move" or "shutdown" or "unknown",
-            "destination": "destination_name" or null,
-            "confidence": 0.0 to 1.0
-        }}
-
-        Rules:
-        1. If the user wants to go somewhere, use the "move" command and specify the destination from the available list. Use the implied destinations for common phrases.
-        2. If the user wants to stop, quit, or shutdown, use the "shutdown" command.
-        3. If the destination is unclear, not on the available list, or if the request is not a move/shutdown command, set command to "unknown" and destination to null.
-        4. Your response must be ONLY the JSON object, with no other text or formatting.
-
-        Examples:
-        - "Take me to Room 305" -> {{"command": "move", "destination": "room 310", "confidence": 0.9}}
-        - "I need to go to the washroom" -> {{"command": "move", "destination": "room 200", "confidence": 0.8}}
-        - "I'm done, please shut down" -> {{"command": "shutdown", "destination": null, "confidence": 1.0}}
-        - "Where is the cafeteria?" -> {{"command": "unknown", "destination": null, "confidence": 0.2}}
-        - "Move" -> {{"command": "move", "destination": null, "confidence": 0.6}}
+        Unambiguous commands ("shutdown", "move to room 100", "bring water")
+        are answered by the local parser without a network call. Everything
+        else is served from the parse cache when possible and from Gemini
+        otherwise.
+        """
+        start = time.perf_counter()
+        fast_result, cache_key = self._parse_without_llm(user_input, start)
+        if fast_result is not None:
+            return fast_result
+
+        result = self._parse_with_llm(user_input)
+        return self._finish_llm_parse(result, cache_key, start)
+
+    def _parse_without_llm(self, user_input: str, start: float) -> Tuple[Optional[Tuple[str, List[str]]], str]:
+        """Local parser, then the parse cache. Returns (result or None, cache key)."""
+        local_result = self.intent_parser.parse(user_input)
+        if local_result is not None:
+            self.parse_stats.record("local", time.perf_counter() - start)
+            command, params = local_result
+            print(f"Local parser: command='{command}', destination={params[0] if params else None!r}")
+            return local_result, ""
+
+        cache_key = ParseCache.make_key(user_input, self.prompt.context_hash)
+        cached_result = self.parse_cache.get(cache_key)
+        if cached_result is not None:
+            self.parse_stats.record("cache", time.perf_counter() - start)
+            print(f"Cached parse: command='{cached_result[0]}', destination={cached_result[1][0] if cached_result[1] else None!r}")
+        return cached_result, cache_key
+
+    def _finish_llm_parse(self, result: Optional[Tuple[str, List[str]]], cache_key: str, start: float) -> Tuple[str, List[str]]:
+        self.parse_stats.record("llm", time.perf_counter() - start)
+        if result is None:
+            return "unknown", [] # Don't cache failed calls
+        self.parse_cache.put(cache_key, result)
+        return result
+
+    def _parse_with_llm(self, user_input: str) -> Optional[Tuple[str, List[str]]]:
+        """
+        Use Gemini to parse natural language input into commands and parameters.
+        Returns None if the call or the response parsing failed.
         """
+        try:
+            request = self._build_request(user_input)
+            if self.batcher is not None:
+                response_text = self.batcher.submit(request).result()
+            elif self.backend.supports_async: # type: ignore[union-attr]
+                # Awaited on the shared model loop, so concurrent requests share one async client
+                response_text = shared_model_loop().submit(self.backend.generate_async(request)).result() # type: ignore[union-attr]
+            else:
+                response_text = self.backend.generate(request) # type: ignore[union-attr]
+            return self._interpret_response(response_text)
+        except Exception as e:
+            print(f"An error occurred during Gemini parsing: {e}")
+            return None
 
+    def _interpret_response(self, response_text: str) -> Optional[Tuple[str, List[str]]]:
+        """Turns the model's JSON reply into (command, params); None if it isn't valid JSON."""
         try:
-            response = self.gemini_model.generate_content(prompt)
-            response_text = response.text.strip()
+            raw_response = response_text
+            response_text = response_text.strip()
             
             if response_text.startswith('```json'):
                 response_text = response_text.split('```json')[1].split('```')[0].strip()
@@ -137,14 +175,11 @@ class GCP:
                 return "unknown", []
                 
         except json.JSONDecodeError as e:
-            print(f"⚠ Failed to parse Gemini response as JSON: {e}. Raw response: '{response.text}'")
-            return "unknown", []
-        except Exception as e:
-            print(f"An error occurred during Gemini parsing: {e}")
-            return "unknown", []
+            print(f"⚠ Failed to parse Gemini response as JSON: {e}. Raw response: '{raw_response}'")
+            return None
     
     def get_available_destinations(self) -> List[str]:
         """
         Returns a list of all node names in the graph.
         """
-        return [node.name for node in self.graph.nodes.values()]
\ No newline at end of file
+        return list(self.prompt.destinations)
\ No newline at end of file
@@ -1,10 +1,21 @@
 # graph.py
-from typing import Dict, List, Any
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Dict, List, Any, Iterator, NamedTuple, Optional, Set, Tuple
+from name_index import NameIndex
+
+# How many edge changes are kept for caches to catch up on incrementally
+EDGE_LOG_SIZE = 1024
 
 class Node:
-    def __init__(self, id: int, name: str):
+    __slots__ = ('id', 'name', 'x', 'y')
+
+    def __init__(self, id: int, name: str, x: Optional[float] = None, y: Optional[float] = None):
         self.id = id
         self.name = name
+        # Optional map coordinates, in the same units as connection distances
+        self.x = x
+        self.y = y
 
     def __repr__(self):
         return f"Node(id={self.id}, name='{self.name}')"
@@ -15,32 +26,160 @@ class Node:
     def __eq__(self, other): # type: ignore
         return isinstance(other, Node) and self.id == other.id
 
-class Graph:
+class EdgeChange(NamedTuple):
+    edge_version: int  # Graph.edge_version right after this change
+    node_a_id: int
+    node_b_id: int
+    old_distance: float # inf while blocked
+    new_distance: float
+
+class EdgeChanges(ABC):
+    """
+    Runtime corridor changes (closures, crowding) shared by Graph and
+    CompactGraph. They aren't topology changes, so they bump `edge_version`
+    rather than `version`, and are logged so caches can update selectively
+    instead of starting over. Subclasses provide `edge_distance` and
+    `_store_edge_distance`, and skip `blocked` edges in `iter_edges`.
+    """
+
+    def _init_edge_changes(self):
+        # Call from __init__
+        self.edge_version = 0
+        self.blocked: Set[Tuple[int, int]] = set() # (low id, high id) pairs
+        self._edge_log: Deque[EdgeChange] = deque(maxlen=EDGE_LOG_SIZE)
+
+    @abstractmethod
+    def edge_distance(self, node_a_id: int, node_b_id: int) -> Optional[float]:
+        """The connection's distance (ignoring blocks), or None if the nodes aren't connected."""
+
+    @abstractmethod
+    def _store_edge_distance(self, node_a_id: int, node_b_id: int, distance: float):
+        """Sets the connection's distance in both directions."""
+
+    def is_blocked(self, node_a_id: int, node_b_id: int) -> bool:
+        return edge_key(node_a_id, node_b_id) in self.blocked
+
+    def block_edge(self, node_a_id: int, node_b_id: int):
+        """Closes a corridor (both directions) until unblock_edge."""
+        distance = self._require_edge(node_a_id, node_b_id)
+        key = edge_key(node_a_id, node_b_id)
+        if key not in self.blocked:
+            self.blocked.add(key)
+            self._log_edge_change(node_a_id, node_b_id, distance, float('inf'))
+
+    def unblock_edge(self, node_a_id: int, node_b_id: int):
+        distance = self._require_edge(node_a_id, node_b_id)
+        key = edge_key(node_a_id, node_b_id)
+        if key in self.blocked:
+            self.blocked.discard(key)
+            self._log_edge_change(node_a_id, node_b_id, float('inf'), distance)
+
+    def set_edge_weight(self, node_a_id: int, node_b_id: int, distance: float):
+        """
+        Changes a connection's distance in both directions, e.g. to steer bots
+        away from a crowded corridor. Keep it at least the straight-line
+        distance between the rooms, or A* stops being exact.
+        """
+        old_distance = self._require_edge(node_a_id, node_b_id)
+        if distance == old_distance:
+            return
+        self._store_edge_distance(node_a_id, node_b_id, distance)
+        if edge_key(node_a_id, node_b_id) not in self.blocked:
+            self._log_edge_change(node_a_id, node_b_id, old_distance, distance)
+
+    def edge_changes_since(self, edge_version: int) -> Optional[List[EdgeChange]]:
+        """Edge changes after `edge_version`, oldest first, or None if the log no longer goes back that far."""
+        if edge_version == self.edge_version:
+            return []
+        changes = list(self._edge_log)
+        if not changes or changes[0].edge_version > edge_version + 1:
+            return None
+        return [change for change in changes if change.edge_version > edge_version]
+
+    def _require_edge(self, node_a_id: int, node_b_id: int) -> float:
+        distance = self.edge_distance(node_a_id, node_b_id)
+        if distance is None:
+            raise ValueError(f"Nodes {node_a_id} and {node_b_id} are not connected.")
+        return distance
+
+    def _log_edge_change(self, node_a_id: int, node_b_id: int, old_distance: float, new_distance: float):
+        self._edge_log.append(EdgeChange(self.edge_version + 1, node_a_id, node_b_id, old_distance, new_distance))
+        self.edge_version += 1
+
+class Graph(EdgeChanges):
     def __init__(self):
         self.nodes: Dict[int, Node] = {}
         self.adjacency_list: Dict[int, List[Dict[str, Any]]] = {}
+        # Bumped on every topology change so route caches know when to rebuild
+        self.version = 0
+        self.name_index = NameIndex()
+        self.aliases: Dict[str, Optional[int]] = {} # Other names find_node accepts, e.g. room types
+        # Default Navigator search mode for this map ("dijkstra", "astar", "bidirectional")
+        self.search_mode: Optional[str] = None
+        self._init_edge_changes()
 
-    def add_node(self, node_id: int, node_name: str):
+    def add_node(self, node_id: int, node_name: str, x: Optional[float] = None, y: Optional[float] = None):
         if node_id not in self.nodes:
-            new_node = Node(node_id, node_name)
+            new_node = Node(node_id, node_name, x, y)
             self.nodes[node_id] = new_node
             self.adjacency_list[node_id] = []
+            self.name_index.add(node_name, node_id)
+            self.version += 1
 
     def add_connection(self, node_a_id: int, node_b_id: int, distance: int):
         if node_a_id in self.nodes and node_b_id in self.nodes:
             self.adjacency_list[node_a_id].append({'node': self.nodes[node_b_id], 'distance': distance})
             self.adjacency_list[node_b_id].append({'node': self.nodes[node_a_id], 'distance': distance}) # Assuming undirected graph
+            self.version += 1
         else:
             raise ValueError(f"One or both nodes ({node_a_id}, {node_b_id}) not found in graph.")
 
+    def add_alias(self, alias: str, node_id: Optional[int]):
+        """
+        Another name `find_node` accepts for a node, e.g. its room type
+        ("Lounge Area"). None marks a name several nodes share ("Patient Room").
+        """
+        if node_id is None or node_id in self.nodes:
+            self.aliases[alias] = node_id
+            self.name_index.add_alias(alias, node_id)
+
     def get_node_by_id(self, node_id: int) -> Node:
         return self.nodes.get(node_id) # type: ignore
 
     def get_node_by_name(self, node_name: str) -> Node | None:
-        for node in self.nodes.values():
-            if node.name.lower() == node_name.lower():
-                return node
-        return None
+        """Exact lookup, ignoring case, spacing and punctuation ("Room 310" == "room310")."""
+        node_id = self.name_index.exact(node_name)
+        return self.nodes[node_id] if node_id is not None else None
+
+    def find_node(self, node_name: str) -> Node | None:
+        """Like get_node_by_name, but also accepts a unique prefix or a close fuzzy match."""
+        node_id = self.name_index.resolve(node_name)
+        return self.nodes[node_id] if node_id is not None else None
 
     def get_neighbors(self, node: Node) -> List[Dict[str, Any]]:
-        return self.adjacency_list.get(node.id, [])
\ No newline at end of file
+        return self.adjacency_list.get(node.id, [])
+
+    def iter_edges(self, node_id: int) -> Iterator[Tuple[int, float]]:
+        """Yields (neighbor_id, distance) pairs, the form the search code works on. Blocked edges are skipped."""
+        blocked = self.blocked
+        for neighbor_info in self.adjacency_list.get(node_id, []):
+            neighbor_id = neighbor_info['node'].id
+            if blocked and edge_key(node_id, neighbor_id) in blocked:
+                continue
+            yield neighbor_id, neighbor_info['distance']
+
+    def edge_distance(self, node_a_id: int, node_b_id: int) -> Optional[float]:
+        """The connection's distance (ignoring blocks), or None if the nodes aren't connected."""
+        for neighbor_info in self.adjacency_list.get(node_a_id, []):
+            if neighbor_info['node'].id == node_b_id:
+                return neighbor_info['distance']
+        return None
+
+    def _store_edge_distance(self, node_a_id: int, node_b_id: int, distance: float):
+        for from_id, to_id in ((node_a_id, node_b_id), (node_b_id, node_a_id)):
+            for neighbor_info in self.adjacency_list[from_id]:
+                if neighbor_info['node'].id == to_id:
+                    neighbor_info['distance'] = distance
+
+def edge_key(node_a_id: int, node_b_id: int) -> Tuple[int, int]:
+    return (node_a_id, node_b_id) if node_a_id <= node_b_id else (node_b_id, node_a_id)
@@ -0,0 +1,216 @@
+# graph_loader.py
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+from graph import Graph, Node
+from compact_graph import CompactGraph
+
+# Binary snapshot layout (little-endian), all arrays 8-byte aligned:
+#   header     SNAPSHOT_HEADER (magic, version, sha256 of graph.json, counts)
+#   meta       JSON blob with map-level settings (search_mode, aliases, ...)
+#   ids        int64[nodes]
+#   offsets    int64[nodes + 1]      CSR row offsets
+#   targets    int64[entries]        neighbor node indices
+#   weights    float64[entries]      connection distances
+#   xs, ys     float64[nodes]        coordinates, NaN when missing
+#   name_offs  int64[nodes + 1]      byte offsets into the name table
+#   names      utf-8 name table
+SNAPSHOT_MAGIC = b'PORTRGPH'
+SNAPSHOT_VERSION = 2
+SNAPSHOT_SUFFIX = '.snap'
+SNAPSHOT_HEADER = struct.Struct('<8sII32sQQQQ') # 80 bytes, keeps the arrays aligned
+
+
+def snapshot_path_for(json_path: str) -> str:
+    return json_path + SNAPSHOT_SUFFIX
+
+
+def load_graph(json_path: str, use_snapshot: bool = True, write_snapshot: bool = True) -> CompactGraph:
+    """
+    Loads a graph.json map into a CompactGraph.
+
+    If a snapshot written for the same graph.json content sits next to it,
+    the CSR arrays are memory-mapped straight from it instead of re-parsing
+    the JSON. Otherwise the JSON is parsed, built in bulk and (optionally) a
+    fresh snapshot is written for the next start.
+    """
+    with open(json_path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).digest()
+    snapshot_path = snapshot_path_for(json_path)
+
+    if use_snapshot and os.path.exists(snapshot_path):
+        try:
+            graph = read_snapshot(snapshot_path, expected_digest=digest)
+            if graph is not None:
+                return graph
+        except (OSError, ValueError, struct.error, BufferError) as e:
+            print(f"Ignoring unreadable graph snapshot {snapshot_path}: {e}")
+
+    graph = graph_from_dict(json.loads(raw))
+    if write_snapshot:
+        try:
+            write_graph_snapshot(graph, snapshot_path, digest)
+        except OSError as e:
+            print(f"Could not write graph snapshot {snapshot_path}: {e}")
+    return graph
+
+
+def load_mutable_graph(json_path: str) -> Graph:
+    """Loads graph.json into a regular, editable Graph."""
+    with open(json_path, 'r') as f:
+        data = json.load(f)
+
+    graph = Graph()
+    for node in data['nodes']:
+        graph.add_node(node['id'], node['name'], node.get('x'), node.get('y'))
+    for connection in data['connections']:
+        graph.add_connection(connection['node_a'], connection['node_b'], connection['distance'])
+    graph.search_mode = data.get('search_mode')
+    for alias, node_id in type_aliases(data).items():
+        graph.add_alias(alias, node_id)
+    return graph
+
+
+def type_aliases(data: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    """
+    Room types as aliases: one held by a single node ("Lounge Area") names
+    that node, so "lounge" finds room 310. A shared type ("Patient Room")
+    maps to None, so it is never guessed to be one of its rooms.
+    """
+    by_type: Dict[str, List[int]] = {}
+    for node in data['nodes']:
+        if node.get('type'):
+            by_type.setdefault(node['type'], []).append(node['id'])
+    return {node_type: ids[0] if len(ids) == 1 else None for node_type, ids in by_type.items()}
+
+
+def graph_from_dict(data: Dict[str, Any]) -> CompactGraph:
+    """Bulk-builds a CompactGraph from parsed graph.json content."""
+    nodes = [(node['id'], node['name'], node.get('x'), node.get('y')) for node in data['nodes']]
+    edges = [(c['node_a'], c['node_b'], c['distance']) for c in data['connections']]
+    graph = CompactGraph.from_edges(nodes, edges)
+    graph.search_mode = data.get('search_mode')
+    for alias, node_id in type_aliases(data).items():
+        graph.add_alias(alias, node_id)
+    return graph
+
+
+def write_graph_snapshot(graph: CompactGraph, snapshot_path: str, digest: bytes):
+    """Writes `graph` in the snapshot format, atomically replacing any old file."""
+    meta = json.dumps({'search_mode': graph.search_mode, 'aliases': graph.aliases}).encode('utf-8')
+    encoded_names = [node.name.encode('utf-8') for node in graph.node_list]
+    name_offsets = array('q', [0])
+    for name in encoded_names:
+        name_offsets.append(name_offsets[-1] + len(name))
+    nan = float('nan')
+
+    sections = [
+        array('q', graph.ids),
+        array('q', graph.offsets),
+        array('q', graph.targets),
+        array('d', graph.weights),
+        array('d', (nan if node.x is None else node.x for node in graph.node_list)),
+        array('d', (nan if node.y is None else node.y for node in graph.node_list)),
+        name_offsets,
+    ]
+
+    tmp_path = snapshot_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, digest, len(graph.node_list),
+                                     len(graph.targets), len(meta), name_offsets[-1]))
+        f.write(_padded(meta))
+        for section in sections:
+            section.tofile(f)
+        f.write(b''.join(encoded_names))
+    os.replace(tmp_path, snapshot_path)
+
+
+def read_snapshot(snapshot_path: str, expected_digest: Optional[bytes] = None) -> Optional[CompactGraph]:
+    """
+    Memory-maps a snapshot and builds a CompactGraph over views of it.
+    Returns None if the snapshot was written for different graph.json content,
+    and raises ValueError if it is truncated or its sections don't add up.
+    """
+    with open(snapshot_path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    graph: Optional[CompactGraph] = None
+    try:
+        if len(mapped) < SNAPSHOT_HEADER.size:
+            raise ValueError("graph snapshot is truncated")
+        magic, version, _flags, digest, node_count, entry_count, meta_size, names_size = SNAPSHOT_HEADER.unpack_from(mapped, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"not a version {SNAPSHOT_VERSION} graph snapshot")
+        if expected_digest is not None and digest != expected_digest:
+            return None
+
+        # Every section's extent, checked against the file before anything is cast
+        meta_start = SNAPSHOT_HEADER.size
+        arrays_start = meta_start + meta_size + (-meta_size % 8)
+        array_words = 5 * node_count + 2 + 2 * entry_count # ids, offsets, xs, ys, name_offs; targets, weights
+        names_start = arrays_start + array_words * 8
+        if names_start + names_size != len(mapped):
+            raise ValueError(f"graph snapshot is {len(mapped)} bytes, its header describes {names_start + names_size}")
+
+        meta = json.loads(bytes(mapped[meta_start:meta_start + meta_size]))
+        view = memoryview(mapped)
+        position = arrays_start
+        def take(fmt: str, count: int) -> memoryview:
+            nonlocal position
+            section = view[position:position + count * 8].cast(fmt)
+            position += count * 8
+            return section
+
+        ids = take('q', node_count)
+        offsets = take('q', node_count + 1)
+        targets = take('q', entry_count)
+        weights = take('d', entry_count)
+        xs = take('d', node_count)
+        ys = take('d', node_count)
+        name_offsets = take('q', node_count + 1)
+        names = bytes(view[position:position + names_size])
+        if offsets[node_count] != entry_count or name_offsets[node_count] != names_size:
+            raise ValueError("graph snapshot sections are inconsistent")
+        # Offsets index the edge and name arrays and targets index the nodes: a bad
+        # value would only fail (or read the wrong node) once a search reaches it
+        if not _ascending_from_zero(offsets) or not _ascending_from_zero(name_offsets):
+            raise ValueError("graph snapshot offsets are out of order")
+        if entry_count and not 0 <= min(targets) <= max(targets) < node_count:
+            raise ValueError("graph snapshot edges point outside the node list")
+
+        nodes: List[Node] = []
+        for i in range(node_count):
+            x, y = xs[i], ys[i]
+            nodes.append(Node(ids[i], names[name_offsets[i]:name_offsets[i + 1]].decode('utf-8'),
+                              None if math.isnan(x) else x, None if math.isnan(y) else y))
+
+        graph = CompactGraph(nodes, offsets, targets, weights)
+        graph.search_mode = meta.get('search_mode')
+        for alias, node_id in meta.get('aliases', {}).items():
+            graph.add_alias(alias, node_id)
+        # Keep the mapping alive for as long as the graph uses views into it
+        graph.snapshot = mapped # type: ignore[attr-defined]
+        return graph
+    finally:
+        if graph is None:
+            # Views into the mapping must be gone before it can close
+            view = ids = offsets = targets = weights = xs = ys = name_offsets = None # type: ignore
+            try:
+                mapped.close()
+            except BufferError:
+                pass # A view is still referenced (e.g. by a traceback); the mapping closes once it's collected
+
+
+def _ascending_from_zero(offsets: Sequence[int]) -> bool:
+    return offsets[0] == 0 and all(a <= b for a, b in zip(offsets, offsets[1:]))
+
+
+def _padded(blob: bytes) -> bytes:
+    return blob + b'\0' * (-len(blob) % 8)
@@ -0,0 +1,107 @@
+# intent_parser.py
+
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from graph import Graph
+
+_SHUTDOWN = re.compile(
+    r"^(?:please |ok |okay |porter )*(?:shut ?down|power (?:off|down)|turn off|switch off|quit|exit|stop|go to sleep)"
+    r"(?: now| please| porter)*$"
+)
+_MOVE = re.compile(
+    r"^(?:please |ok |okay |porter |can you |could you )*"
+    r"(?:move|go|head|navigate|drive|take me|bring me|come|return|get me|walk me)(?: over| back)?"
+    r"(?: to| into| towards)? (?:the )?(?P<destination>.+?)(?: please| now| porter)*$"
+)
+_QUESTION = re.compile(r"^(?:where|what|why|how|when|who|which|is|are|does|do)\b")
+_NEGATION = re.compile(r"\b(?:don ?t|do not|not|no|never|cancel|instead)\b")
+_PUNCTUATION = re.compile(r"[^a-z0-9 ]+")
+# "room 200", "room200": a room named by number, whether or not the map has it
+_ROOM_NUMBER = re.compile(r"\broom ?([0-9]+)\b")
+# Longest run of words checked against the room names
+_MAX_NAME_WORDS = 3
+
+
+def normalize_command(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    text = _PUNCTUATION.sub(' ', text.lower().replace("'", ''))
+    return ' '.join(text.split())
+
+
+class LocalIntentParser:
+    """
+    Deterministic parser tried before the LLM.
+
+    It only answers when the input is unambiguous: a shutdown phrase, an
+    exact room name (optionally after "move to"/"go to"/...), one room named
+    within the sentence ("take the blankets to room 550"), or a single common
+    phrase from the destination mappings ("bring water"). A room the map
+    doesn't have, several rooms, or a phrase pointing somewhere other than
+    the named room return None and are left to Gemini.
+    """
+
+    def __init__(self, graph: Graph, destination_mappings: Dict[str, str]):
+        self.graph = graph
+        self.destination_mappings = destination_mappings
+        self._phrase_patterns: List[Tuple[re.Pattern, str]] = []
+        self.update_mappings(destination_mappings)
+
+    def update_mappings(self, destination_mappings: Dict[str, str]):
+        self.destination_mappings = destination_mappings
+        # Longest phrases first so "lounge area" wins over a shorter overlap
+        phrases = sorted(destination_mappings, key=len, reverse=True)
+        self._phrase_patterns = [
+            (re.compile(r"\b" + re.escape(normalize_command(phrase)) + r"\b"), destination_mappings[phrase])
+            for phrase in phrases
+        ]
+
+    def parse(self, user_input: str) -> Optional[Tuple[str, List[str]]]:
+        text = normalize_command(user_input)
+        if not text or _NEGATION.search(text) or _QUESTION.match(text) or '?' in user_input:
+            return None
+
+        if _SHUTDOWN.match(text):
+            return "shutdown", []
+
+        # "room 310" on its own, or "go to room 310"
+        destination = self._room(text)
+        if destination is None:
+            match = _MOVE.match(text)
+            if match:
+                destination = self._room(match.group('destination'))
+        if destination is not None:
+            return "move", [destination]
+
+        # Common phrases ("bring water", "I need the washroom")
+        implied = {self._room(destination) for pattern, destination in self._phrase_patterns if pattern.search(text)}
+        named = self._named_rooms(text)
+        if named is None or len(named) > 1:
+            return None # A room we don't know, or more than one destination
+        if named:
+            # "bring water to room 200": the named room, unless a phrase points elsewhere
+            return ("move", [named.pop()]) if implied <= named else None
+        if len(implied) == 1:
+            room = implied.pop()
+            if room is not None:
+                return "move", [room]
+        return None
+
+    def _named_rooms(self, text: str) -> Optional[Set[str]]:
+        """Rooms named anywhere in `text`, or None if it names a room number the map lacks."""
+        rooms: Set[str] = set()
+        for number in _ROOM_NUMBER.findall(text):
+            room = self._room(f"room {number}")
+            if room is None:
+                return None
+            rooms.add(room)
+        words = text.split()
+        for length in range(1, _MAX_NAME_WORDS + 1):
+            for start in range(len(words) - length + 1):
+                room = self._room(' '.join(words[start:start + length]))
+                if room is not None:
+                    rooms.add(room)
+        return rooms
+
+    def _room(self, name: str) -> Optional[str]:
+        node = self.graph.get_node_by_name(name)
+        return node.name if node else None
@@ -0,0 +1,40 @@
+# latency_stats.py
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict
+
+class LatencyStats:
+    """
+    Counts and latencies per named path: command parsing ("local", "llm", ...),
+    dispatcher ticks, route planning, task and connection waits.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._counts: Dict[str, int] = {}
+        self._total_seconds: Dict[str, float] = {}
+        self._recent: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, path: str, seconds: float):
+        with self._lock:
+            self._counts[path] = self._counts.get(path, 0) + 1
+            self._total_seconds[path] = self._total_seconds.get(path, 0.0) + seconds
+            self._recent.setdefault(path, deque(maxlen=self.window)).append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-path count, share of all records and latency (ms, p50/p95 over the recent window)."""
+        with self._lock:
+            total = sum(self._counts.values())
+            paths = {}
+            for path, count in self._counts.items():
+                recent = sorted(self._recent[path])
+                paths[path] = {
+                    "count": count,
+                    "hit_rate": count / total,
+                    "avg_ms": self._total_seconds[path] * 1000 / count,
+                    "p50_ms": recent[len(recent) // 2] * 1000,
+                    "p95_ms": recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000,
+                }
+            return {"total": total, "paths": paths}
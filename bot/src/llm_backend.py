@@ -0,0 +1,317 @@
+# llm_backend.py
+
+import asyncio
+import datetime
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from graph import Graph
+from intent_parser import LocalIntentParser, normalize_command
+
+# Optional Gemini import with fallback, so the stub backend works without it
+try:
+    import google.generativeai as genai
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
+
+GEMINI_MODEL_NAME = 'gemini-1.5-flash' # Using a common, powerful model
+# Context caching needs an explicitly versioned model
+GEMINI_CACHE_MODEL_NAME = os.getenv('PORTER_GEMINI_CACHE_MODEL', 'models/gemini-1.5-flash-001')
+
+# Distinct static prompts (fleets with per-bot mappings, map edits) kept as ready models
+PROMPT_MODEL_CACHE_SIZE = 8
+
+BATCH_INSTRUCTION = """Parse each numbered request below independently, using the rules above.
+Return ONLY a JSON array with exactly one JSON object per request, in the same order.
+"""
+
+
+class ParseRequest(NamedTuple):
+    static_prefix: str   # Instructions, room list and phrase mappings
+    prompt_key: str      # CommandPrompt.context_hash: equal keys, equal static_prefix
+    request_part: str    # Current location and user input
+    user_input: str
+
+
+class LLMBackend(ABC):
+    """
+    A model that turns a ParseRequest into the raw JSON text GCP expects:
+    {"command": ..., "destination": ..., "confidence": ...}
+    """
+    name = "base"
+    # True if generate_batch answers several requests with a single model call
+    supports_batching = False
+    # True if generate_async awaits an async client rather than a worker thread
+    supports_async = False
+
+    @abstractmethod
+    def generate(self, request: ParseRequest) -> str:
+        """The model's raw JSON answer to one request."""
+
+    async def generate_async(self, request: ParseRequest) -> str:
+        """generate() as a coroutine. Run it on the ModelLoop, not a loop of your own."""
+        return await asyncio.to_thread(self.generate, request)
+
+    def generate_batch(self, requests: List[ParseRequest]) -> List[str]:
+        return [self.generate(request) for request in requests]
+
+
+class GeminiBackend(LLMBackend):
+    """
+    Gemini adapter. How the static part of the prompt reaches the model is
+    set by `prompt_mode`:
+      "system_instruction" - sent once per model as its system instruction (default)
+      "cached_content"     - stored server-side with context caching (large maps only,
+                             the API has a minimum cached size); falls back to system_instruction
+      "inline"             - the whole prompt in every request
+    """
+    name = "gemini"
+    supports_batching = True
+    supports_async = True
+
+    def __init__(self, api_key: str, prompt_mode: str = "system_instruction"):
+        if not GEMINI_AVAILABLE:
+            raise ValueError("google-generativeai is not installed. Install it or use the 'stub' backend.")
+        genai.configure(api_key=api_key)
+        self.prompt_mode = prompt_mode
+        self.gemini_model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+        # Models (with their static part) by prompt key, most recently used last.
+        # Bots in a fleet can have different mappings, so several are live at once.
+        self._prompt_models: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prepare(self, request: ParseRequest, contents: str) -> Tuple[Any, str]:
+        """
+        Returns the model to call and the content to send it. Outside "inline"
+        mode only the per-request part is sent; the static part lives in a
+        model built once per distinct static part (keyed by its hash).
+        """
+        if self.prompt_mode == "inline":
+            return self.gemini_model, request.static_prefix + "\n" + contents
+
+        with self._lock:
+            model = self._prompt_models.get(request.prompt_key)
+            if model is None:
+                model = self._build_prompt_model(request.static_prefix)
+                self._prompt_models[request.prompt_key] = model
+                # Evicted models are just dropped: a request may still be using
+                # one, and their cached content expires on its own (ttl)
+                while len(self._prompt_models) > PROMPT_MODEL_CACHE_SIZE:
+                    self._prompt_models.popitem(last=False)
+            else:
+                self._prompt_models.move_to_end(request.prompt_key)
+            return model, contents
+
+    def _build_prompt_model(self, static_prefix: str):
+        if self.prompt_mode == "cached_content":
+            try:
+                from google.generativeai import caching
+                cached_content = caching.CachedContent.create(
+                    model=GEMINI_CACHE_MODEL_NAME,
+                    system_instruction=static_prefix,
+                    ttl=datetime.timedelta(hours=1),
+                )
+                return genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+            except Exception as e:
+                print(f"Gemini context caching unavailable ({e}); using a system instruction instead.")
+        return genai.GenerativeModel(GEMINI_MODEL_NAME, system_instruction=static_prefix)
+
+    def generate(self, request: ParseRequest) -> str:
+        model, contents = self._prepare(request, request.request_part)
+        return model.generate_content(contents).text
+
+    async def generate_async(self, request: ParseRequest) -> str:
+        model, contents = self._prepare(request, request.request_part)
+        response = await model.generate_content_async(contents)
+        return response.text
+
+    def generate_batch(self, requests: List[ParseRequest]) -> List[str]:
+        # Requests with a different static part (map changed mid-batch) can't share a call
+        if len(requests) == 1 or len({request.prompt_key for request in requests}) > 1:
+            return [self.generate(request) for request in requests]
+
+        numbered = "\n".join(f"{i + 1}.\n{request.request_part}" for i, request in enumerate(requests))
+        model, contents = self._prepare(requests[0], BATCH_INSTRUCTION + numbered)
+        try:
+            items = json.loads(_strip_code_fence(model.generate_content(contents).text))
+            if isinstance(items, list) and len(items) == len(requests):
+                return [json.dumps(item) for item in items]
+            print(f"Gemini batch returned {len(items) if isinstance(items, list) else 'no'} results for {len(requests)} requests; retrying one by one.")
+        except (json.JSONDecodeError, ValueError) as e:
+            print(f"Failed to parse Gemini batch response: {e}; retrying one by one.")
+        return [self.generate(request) for request in requests]
+
+
+class LocalStubBackend(LLMBackend):
+    """
+    Deterministic stand-in for Gemini, for offline development and load tests.
+
+    It answers from the local intent parser, then looks for a room name
+    anywhere in the input. It can simulate the real API: `latency_ms` per
+    model call, `per_item_ms` for every request in a batch, and at most
+    `max_concurrent` calls in flight (a quota), 0 meaning unlimited.
+    """
+    name = "stub"
+    supports_batching = True
+
+    def __init__(self, graph: Graph, destination_mappings: Dict[str, str], latency_ms: float = 0.0,
+                 per_item_ms: float = 0.0, max_concurrent: int = 0):
+        self.graph = graph
+        self.parser = LocalIntentParser(graph, destination_mappings)
+        self.latency_ms = latency_ms
+        self.per_item_ms = per_item_ms
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        # Longest names first so "room 310" isn't matched as "room 3"
+        self._room_names = sorted(((normalize_command(node.name), node.name) for node in graph.nodes.values()),
+                                  key=lambda item: len(item[0]), reverse=True)
+        self.calls = 0
+
+    def _answer(self, request: ParseRequest) -> str:
+        result = self.parser.parse(request.user_input)
+        if result is None:
+            text = f" {normalize_command(request.user_input)} "
+            room = next((name for key, name in self._room_names if f" {key} " in text), None)
+            result = ("move", [room]) if room else ("unknown", [])
+        command, params = result
+        return json.dumps({
+            "command": command,
+            "destination": params[0] if params else None,
+            "confidence": 0.9 if command != "unknown" else 0.2,
+        })
+
+    def generate(self, request: ParseRequest) -> str:
+        return self.generate_batch([request])[0]
+
+    def generate_batch(self, requests: List[ParseRequest]) -> List[str]:
+        if self._slots is not None:
+            self._slots.acquire()
+        try:
+            self.calls += 1
+            delay = self.latency_ms + self.per_item_ms * len(requests)
+            if delay:
+                time.sleep(delay / 1000)
+            return [self._answer(request) for request in requests]
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+
+class MicroBatcher:
+    """
+    Merges parse requests that arrive within `window_ms` of each other into a
+    single `generate_batch` call (up to `max_batch` at a time). Up to
+    `max_in_flight` batches run concurrently while the next one collects.
+    """
+
+    def __init__(self, backend: LLMBackend, window_ms: float = 5.0, max_batch: int = 16, max_in_flight: int = 8):
+        self.backend = backend
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm-batch")
+        self._pending: List[Tuple[ParseRequest, Future]] = []
+        self._condition = threading.Condition()
+        self.batches = 0
+        self.batched_requests = 0
+        self._thread = threading.Thread(target=self._run, name="llm-micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, request: ParseRequest) -> Future:
+        future: Future = Future()
+        with self._condition:
+            self._pending.append((request, future))
+            self._condition.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                # Give concurrent requests a few milliseconds to join this batch
+                deadline = time.monotonic() + self.window_ms / 1000
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                self._pending = self._pending[self.max_batch:]
+
+            self.batches += 1
+            self.batched_requests += len(batch)
+            self._executor.submit(self._call_backend, batch)
+
+    def _call_backend(self, batch: List[Tuple[ParseRequest, Future]]):
+        try:
+            results = self.backend.generate_batch([request for request, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"{self.backend.name} backend returned {len(results)} results for {len(batch)} requests")
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as e:
+            # Every caller is blocked on its future, so none may be left unresolved
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+
+class ModelLoop:
+    """
+    One event loop, on its own thread, for the async model calls of every
+    request thread. The Gemini async client is a grpc.aio channel that stays
+    bound to the loop it first ran on, so all calls must share one loop that
+    outlives any single request; callers get a concurrent Future to wait on.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-model-loop", daemon=True)
+        self._thread.start()
+
+    def submit(self, coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+
+_model_loop: Optional[ModelLoop] = None
+_model_loop_lock = threading.Lock()
+
+
+def shared_model_loop() -> ModelLoop:
+    """The process's ModelLoop, started on first use."""
+    global _model_loop
+    with _model_loop_lock:
+        if _model_loop is None:
+            _model_loop = ModelLoop()
+        return _model_loop
+
+
+def create_backend(name: str, graph: Graph, destination_mappings: Dict[str, str]) -> LLMBackend:
+    """Builds the backend selected by PORTER_LLM_BACKEND ("gemini" or "stub")."""
+    if name == "stub":
+        return LocalStubBackend(
+            graph, destination_mappings,
+            latency_ms=float(os.getenv('PORTER_STUB_LATENCY_MS', '0')),
+            per_item_ms=float(os.getenv('PORTER_STUB_PER_ITEM_MS', '0')),
+            max_concurrent=int(os.getenv('PORTER_STUB_MAX_CONCURRENT', '0')),
+        )
+    if name == "gemini":
+        api_key = os.getenv('GOOGLE_API_KEY')
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY environment variable not set. This bot requires Gemini AI to function.")
+        return GeminiBackend(api_key, prompt_mode=os.getenv('PORTER_PROMPT_MODE', 'system_instruction'))
+    raise ValueError(f"Unknown LLM backend '{name}'. Expected 'gemini' or 'stub'.")
+
+
+def _strip_code_fence(text: str) -> str:
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+        text = text.rsplit('```', 1)[0]
+    return text.strip()
+
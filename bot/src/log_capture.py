@@ -0,0 +1,70 @@
+# log_capture.py
+
+import contextlib
+import contextvars
+import io
+import sys
+import threading
+from typing import Iterator, List, Optional
+
+_current_buffer: contextvars.ContextVar[Optional[io.StringIO]] = contextvars.ContextVar('porter_log_buffer', default=None)
+_install_lock = threading.Lock()
+
+
+class _ContextRoutedStream(io.TextIOBase):
+    """
+    Stand-in for sys.stdout that still writes everything to the real stream,
+    and additionally copies it into the log buffer of the current context.
+
+    Unlike contextlib.redirect_stdout this is installed once and never swapped
+    per request, so concurrent requests each see only their own output.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text: str) -> int:
+        buffer = _current_buffer.get()
+        if buffer is not None:
+            buffer.write(text)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def isatty(self) -> bool:
+        return self.stream.isatty()
+
+    @property
+    def encoding(self): # type: ignore[override]
+        return self.stream.encoding
+
+
+class LogCollector:
+    def __init__(self, buffer: io.StringIO):
+        self._buffer = buffer
+
+    def lines(self) -> List[str]:
+        return self._buffer.getvalue().splitlines()
+
+
+def install():
+    """Routes sys.stdout through the per-context collector (idempotent)."""
+    with _install_lock:
+        if not isinstance(sys.stdout, _ContextRoutedStream):
+            sys.stdout = _ContextRoutedStream(sys.stdout)
+
+
+@contextlib.contextmanager
+def capture_logs() -> Iterator[LogCollector]:
+    """
+    Collects everything printed in the current context (thread, asyncio task,
+    or work submitted with contextvars.copy_context()) until the block exits.
+    """
+    install()
+    buffer = io.StringIO()
+    token = _current_buffer.set(buffer)
+    try:
+        yield LogCollector(buffer)
+    finally:
+        _current_buffer.reset(token)
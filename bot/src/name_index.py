@@ -0,0 +1,203 @@
+# name_index.py
+
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+# Room numbers; ordinals ("3rd floor") aren't
+_DIGITS = re.compile(r'[0-9]+(?![0-9]|st|nd|rd|th)')
+_WORDS = re.compile(r'[a-z]{3,}')
+
+
+def normalize_name(name: str) -> str:
+    """
+    Canonical lookup key for a room name: lowercase with all spacing and
+    punctuation dropped, so "Room 310", "room310" and " ROOM-310 " all match.
+    """
+    return _NON_ALNUM.sub('', name.lower())
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Room-name index kept up to date by `Graph.add_node`.
+
+    Exact lookups are a single dict hit on the normalized name. Prefix lookups
+    bisect a sorted key list, and fuzzy lookups score candidates by trigram
+    overlap or by the words they share, so an almost-right name ("3rd floor
+    lounge") can be resolved locally instead of asking the LLM again. Besides
+    its name, a node can be indexed under aliases such as its room type.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._sorted_keys: List[str] = []
+        self._trigram_postings: Dict[str, Set[str]] = defaultdict(set)
+        self._key_trigrams: Dict[str, Set[str]] = {}
+        self._keys_by_id: Dict[int, str] = {}
+        self._word_ids: Dict[str, Set[Optional[int]]] = defaultdict(set)
+        self._shared: Set[str] = set() # Names of several nodes ("Patient Room"), never resolved to one
+        # Prefix/trigram structures are only built on the first fuzzy-style
+        # lookup, so bulk-loading a large map only pays for the exact index.
+        self._pending: List[str] = []
+        self._pending_words: List[Tuple[str, Optional[int]]] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, name: str, node_id: int):
+        key = normalize_name(name)
+        if not key or key in self._ids:
+            return # First node with a given name wins, like the old linear scan
+        self._ids[key] = node_id
+        self._keys_by_id.setdefault(node_id, key) # The name, not an alias
+        self._pending.append(key)
+        self._pending_words.append((name, node_id))
+
+    def add_alias(self, alias: str, node_id: Optional[int]):
+        """
+        Another name for a node ("Lounge Area" for room 310); exact names are
+        added first and win. A node_id of None marks a name several nodes
+        share, which resolve() then treats as ambiguous.
+        """
+        if node_id is None:
+            key = normalize_name(alias)
+            if key and key not in self._ids and key not in self._shared:
+                # Indexed for prefix/fuzzy lookups too, so it can tie with its own rooms
+                self._shared.add(key)
+                self._pending.append(key)
+                self._pending_words.append((alias, None))
+        else:
+            self.add(alias, node_id)
+
+    def _index_pending(self):
+        if not self._pending:
+            return
+        for name, node_id in self._pending_words:
+            for word in _WORDS.findall(name.lower()):
+                self._word_ids[word].add(node_id)
+        self._pending_words = []
+        for key in self._pending:
+            grams = _trigrams(key)
+            self._key_trigrams[key] = grams
+            for gram in grams:
+                self._trigram_postings[gram].add(key)
+        self._sorted_keys.extend(self._pending)
+        self._sorted_keys.sort()
+        self._pending = []
+
+    def exact(self, name: str) -> Optional[int]:
+        return self._ids.get(normalize_name(name))
+
+    def prefix(self, name: str, limit: int = 10) -> List[int]:
+        """Ids of nodes whose normalized name starts with `name`."""
+        matches: List[int] = []
+        for key in self._prefix_keys(normalize_name(name)):
+            if len(matches) == limit:
+                break
+            if key in self._ids:
+                matches.append(self._ids[key])
+        return matches
+
+    def _prefix_keys(self, key: str) -> Iterator[str]:
+        if not key:
+            return
+        self._index_pending()
+        i = bisect_left(self._sorted_keys, key)
+        while i < len(self._sorted_keys) and self._sorted_keys[i].startswith(key):
+            yield self._sorted_keys[i]
+            i += 1
+
+    def fuzzy(self, name: str, limit: int = 5, min_score: float = 0.3) -> List[Tuple[int, float]]:
+        """
+        Returns up to `limit` (node_id, score) pairs, best first. The score is
+        the Jaccard similarity of the trigram sets, from 0.0 to 1.0.
+        """
+        key = normalize_name(name)
+        if not key:
+            return []
+        scored: List[Tuple[int, float]] = []
+        for candidate, score in self._fuzzy_keys(key, min_score):
+            if candidate in self._ids:
+                scored.append((self._ids[candidate], score))
+        return scored[:limit]
+
+    def _fuzzy_keys(self, key: str, min_score: float) -> List[Tuple[str, float]]:
+        """(key, score) pairs, best first; a node's name and aliases are separate keys."""
+        self._index_pending()
+        grams = _trigrams(key)
+
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for candidate in self._trigram_postings.get(gram, ()):
+                shared[candidate] += 1
+
+        scored: List[Tuple[str, float]] = []
+        for candidate, overlap in shared.items():
+            score = overlap / (len(grams) + len(self._key_trigrams[candidate]) - overlap)
+            if score >= min_score:
+                scored.append((candidate, score))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored
+
+    def resolve(self, name: str, min_score: float = 0.5, margin: float = 0.1) -> Optional[int]:
+        """
+        Best-effort lookup: exact match, then a unique prefix match, then the
+        best fuzzy match if it clearly beats the runner-up, then the one node
+        sharing every known word of the name ("3rd floor lounge" -> "Lounge
+        Area"). Returns None when the name is ambiguous so callers can fall
+        back to asking again.
+        """
+        node_id = self.exact(name)
+        if node_id is not None:
+            return node_id
+
+        # Never guess across room numbers: "room 31" must not become "room 310".
+        # Checked against the matched key, so an alias without a number still counts.
+        key = normalize_name(name)
+        if key in self._shared:
+            return None
+        numbers = _DIGITS.findall(key)
+        def same_numbers(candidate_key: str) -> bool:
+            candidate_numbers = _DIGITS.findall(candidate_key)
+            return not numbers or not candidate_numbers or candidate_numbers == numbers
+
+        # Filtered before counting, so a wrong-numbered key can't crowd out the right one.
+        # A shared name counts as a candidate of its own (None) and is never returned.
+        prefixed: Set[Optional[int]] = set()
+        for candidate in self._prefix_keys(key):
+            if same_numbers(candidate):
+                prefixed.add(self._ids.get(candidate))
+                if len(prefixed) > 1:
+                    break
+        if len(prefixed) == 1:
+            return prefixed.pop()
+
+        best: Dict[Optional[int], float] = {} # A node's best-scoring key
+        for candidate, score in self._fuzzy_keys(key, min_score):
+            if same_numbers(candidate):
+                best.setdefault(self._ids.get(candidate), score)
+        candidates = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        if candidates and (len(candidates) == 1 or candidates[0][1] - candidates[1][1] >= margin):
+            return candidates[0][0]
+
+        if numbers:
+            return None
+        return self._by_words(name)
+
+    def _by_words(self, name: str) -> Optional[int]:
+        """The single node whose name or aliases contain every word of `name` the index knows."""
+        matches: Optional[Set[Optional[int]]] = None
+        for word in _WORDS.findall(name.lower()):
+            ids = self._word_ids.get(word)
+            if ids:
+                matches = set(ids) if matches is None else matches & ids
+        if matches is not None and len(matches) == 1:
+            return next(iter(matches)) # None for a shared name's words
+        return None
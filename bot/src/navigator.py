@@ -1,14 +1,115 @@
 # navigator.py
 import heapq
+import math
 from collections import deque
 from graph import Graph, Node
-from typing import List, Tuple, Dict, Optional # Added Any for the tie-breaker
+from route_table import RouteTable
+from typing import Callable, Iterable, List, Tuple, Dict, Optional
+
+SEARCH_MODES = ("dijkstra", "astar", "bidirectional")
 
 class Navigator:
-    def __init__(self):
-        pass
+    def __init__(self, use_route_table: bool = False, cache_size: int = 256, mode: str = "dijkstra"):
+        """
+        Args:
+            use_route_table: Serve paths from precomputed shortest-path trees
+                instead of running a search on every request.
+            cache_size: How many on-demand shortest-path trees to keep (routes
+                from corridor waypoints, or every route on maps with too many
+                rooms to precompute).
+            mode: Default search used when the route table is off:
+                "dijkstra", "astar" or "bidirectional".
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}'. Expected one of {SEARCH_MODES}.")
+        self.use_route_table = use_route_table
+        self.cache_size = cache_size
+        self.mode = mode
+        self.route_table: Optional[RouteTable] = None
+        # Number of nodes popped off the frontier by the last search
+        self.last_expanded = 0
+
+    def precompute(self, graph: Graph) -> RouteTable:
+        """Builds the route table for `graph` up front (e.g. right after loading it)."""
+        self.route_table = RouteTable(graph, cache_size=self.cache_size)
+        return self.route_table
+
+    def _get_route_table(self, graph: Graph) -> RouteTable:
+        if self.route_table is None or self.route_table.graph is not graph:
+            return self.precompute(graph)
+        return self.route_table
+
+    def find_shortest_path(self, graph: Graph, start_node: Node, end_node: Node, mode: Optional[str] = None) -> Optional[List[Node]]:
+        """
+        Finds the shortest path between two nodes.
+
+        Paths come from the route table when it is enabled, unless a search
+        mode is requested explicitly for this call. Otherwise the mode is taken
+        from the call, then the graph's `search_mode`, then this Navigator's
+        default.
+
+        Returns:
+            A list of Nodes representing the shortest path, or None if no path exists.
+        """
+        if self.use_route_table and mode is None:
+            return self._get_route_table(graph).get_path(start_node, end_node)
+
+        mode = mode or getattr(graph, 'search_mode', None) or self.mode
+        if mode == "astar":
+            return self._astar(graph, start_node, end_node)
+        if mode == "bidirectional":
+            return self._bidirectional_dijkstra(graph, start_node, end_node)
+        if mode == "dijkstra":
+            return self._dijkstra(graph, start_node, end_node)
+        raise ValueError(f"Unknown search mode '{mode}'. Expected one of {SEARCH_MODES}.")
+
+    def multi_source_distances(self, graph: Graph, sources: Dict[int, float],
+                               targets: Optional[Iterable[int]] = None) -> Tuple[Dict[int, float], Dict[int, int]]:
+        """
+        One Dijkstra from several start nodes at once, e.g. every idle bot.
+
+        Args:
+            sources: Start node id -> initial cost (0, or a per-source penalty
+                such as low battery, which is added to every distance from it).
+            targets: Node ids we need; the search stops once they are all settled.
 
-    def find_shortest_path(self, graph: Graph, start_node: Node, end_node: Node) -> Optional[List[Node]]:
+        Returns:
+            (distances, origin) keyed by node id: the cheapest cost of reaching
+            each settled node from any source, and which source it came from.
+        """
+        distances: Dict[int, float] = {}
+        priority_queue: List[Tuple[float, int, int]] = []
+        for source_id, initial_cost in sources.items():
+            distances[source_id] = initial_cost
+            priority_queue.append((initial_cost, source_id, source_id))
+        heapq.heapify(priority_queue)
+
+        remaining = set(targets) if targets is not None else None
+        settled: Dict[int, float] = {}
+        origin: Dict[int, int] = {}
+        expanded = 0
+        while priority_queue:
+            current_distance, current_id, source_id = heapq.heappop(priority_queue)
+            if current_id in settled or current_distance > distances[current_id]:
+                continue
+            settled[current_id] = current_distance
+            origin[current_id] = source_id
+            expanded += 1
+            if remaining is not None:
+                remaining.discard(current_id)
+                if not remaining:
+                    break
+
+            for neighbor_id, weight in graph.iter_edges(current_id):
+                distance = current_distance + weight
+                if distance < distances.get(neighbor_id, float('inf')):
+                    distances[neighbor_id] = distance
+                    heapq.heappush(priority_queue, (distance, neighbor_id, source_id))
+
+        self.last_expanded = expanded
+        return settled, origin
+
+    def _dijkstra(self, graph: Graph, start_node: Node, end_node: Node) -> Optional[List[Node]]:
         """
         Implements Dijkstra's algorithm to find the shortest path between two nodes.
 
@@ -20,49 +121,125 @@ class Navigator:
         Returns:
             A list of Nodes representing the shortest path, or None if no path exists.
         """
-        # Dictionary to store the shortest distance from start_node to every other node
-        distances: Dict[Node, float] = {node: float('inf') for node in graph.nodes.values()}
-        distances[start_node] = 0
+        return self._best_first(graph, start_node, end_node, lambda node_id: 0)
+
+    def _astar(self, graph: Graph, start_node: Node, end_node: Node) -> Optional[List[Node]]:
+        """
+        A* with a straight-line (Euclidean) heuristic to the destination.
+
+        Coordinates must be in the same units as connection distances so the
+        heuristic never overestimates. Nodes without coordinates get a heuristic
+        of 0, which degrades gracefully to Dijkstra for those nodes.
+        """
+        goal = graph.get_node_by_id(end_node.id)
+        if goal.x is None or goal.y is None:
+            return self._dijkstra(graph, start_node, end_node)
+
+        nodes = graph.nodes
+        def heuristic(node_id: int) -> float:
+            node = nodes[node_id]
+            if node.x is None or node.y is None:
+                return 0
+            return math.hypot(node.x - goal.x, node.y - goal.y)
+
+        return self._best_first(graph, start_node, end_node, heuristic)
+
+    def _best_first(self, graph: Graph, start_node: Node, end_node: Node, heuristic: Callable[[int], float]) -> Optional[List[Node]]:
+        # Shortest known distance per node id. Nodes we haven't reached yet are
+        # simply absent, so we don't pay for a pass over the whole graph up front.
+        distances: Dict[int, float] = {start_node.id: 0}
 
         # Dictionary to reconstruct the path
-        previous_nodes: Dict[Node, Optional[Node]] = {node: None for node in graph.nodes.values()}
+        previous_nodes: Dict[int, Optional[int]] = {start_node.id: None}
 
-        # Priority queue to store (distance, tie_breaker, node) tuples.
-        # The tie_breaker is crucial for handling cases where distances are equal
-        # and preventing TypeError on Node comparison.
-        priority_queue: List[Tuple[float, int, Node]] = []
-        heapq.heappush(priority_queue, (0, 0, start_node)) # (distance, tie_breaker, node)
-        
-        # A simple counter for tie-breaking
-        tie_breaker_counter = 0
+        # Priority queue of (distance + heuristic, distance, node_id) tuples.
+        # Node ids are plain ints, so equal keys never fall back to comparing Node objects.
+        priority_queue: List[Tuple[float, float, int]] = [(heuristic(start_node.id), 0, start_node.id)]
+        expanded = 0
 
         while priority_queue:
-            current_distance, _, current_node = heapq.heappop(priority_queue) # Ignore tie_breaker
+            _, current_distance, current_id = heapq.heappop(priority_queue)
 
             # If we've already found a shorter path to current_node, skip
-            if current_distance > distances[current_node]:
+            if current_distance > distances[current_id]:
                 continue
+            expanded += 1
 
             # If we reached the end node, reconstruct the path
-            if current_node == end_node:
-                path: deque[Node] = deque()
-                current = end_node
-                while current:
-                    path.appendleft(current)
-                    current = previous_nodes[current]
-                return list(path)
+            if current_id == end_node.id:
+                self.last_expanded = expanded
+                return self._build_path(graph, previous_nodes, current_id)
 
             # Explore neighbors
-            for neighbor_info in graph.get_neighbors(current_node):
-                neighbor_node = neighbor_info['node']
-                weight = neighbor_info['distance']
+            for neighbor_id, weight in graph.iter_edges(current_id):
                 distance = current_distance + weight
 
                 # If a shorter path to the neighbor is found
-                if distance < distances[neighbor_node]:
-                    distances[neighbor_node] = distance
-                    previous_nodes[neighbor_node] = current_node
-                    tie_breaker_counter += 1 # Increment for unique tie-breaker
-                    heapq.heappush(priority_queue, (distance, tie_breaker_counter, neighbor_node))
+                if distance < distances.get(neighbor_id, float('inf')):
+                    distances[neighbor_id] = distance
+                    previous_nodes[neighbor_id] = current_id
+                    heapq.heappush(priority_queue, (distance + heuristic(neighbor_id), distance, neighbor_id))
+
+        self.last_expanded = expanded
+        return None # No path found
+
+    def _bidirectional_dijkstra(self, graph: Graph, start_node: Node, end_node: Node) -> Optional[List[Node]]:
+        """
+        Runs Dijkstra from both ends at once (connections are undirected) and
+        stops once the two frontiers can no longer improve on the best meeting
+        point, which roughly halves the search radius on large maps.
+        """
+        if start_node.id == end_node.id:
+            self.last_expanded = 1
+            return [graph.get_node_by_id(start_node.id)]
+
+        distances: Tuple[Dict[int, float], Dict[int, float]] = ({start_node.id: 0}, {end_node.id: 0})
+        previous: Tuple[Dict[int, Optional[int]], Dict[int, Optional[int]]] = ({start_node.id: None}, {end_node.id: None})
+        queues: Tuple[List[Tuple[float, int]], List[Tuple[float, int]]] = ([(0, start_node.id)], [(0, end_node.id)])
+        best = float('inf')
+        meeting_id: Optional[int] = None
+        expanded = 0
+
+        while queues[0] and queues[1]:
+            # No meeting point found from here on can beat the best one so far
+            if queues[0][0][0] + queues[1][0][0] >= best:
+                break
+
+            # Grow whichever frontier is currently smaller
+            side = 0 if len(queues[0]) <= len(queues[1]) else 1
+            other = 1 - side
+            current_distance, current_id = heapq.heappop(queues[side])
+            if current_distance > distances[side][current_id]:
+                continue
+            expanded += 1
+
+            for neighbor_id, weight in graph.iter_edges(current_id):
+                distance = current_distance + weight
+                if distance < distances[side].get(neighbor_id, float('inf')):
+                    distances[side][neighbor_id] = distance
+                    previous[side][neighbor_id] = current_id
+                    heapq.heappush(queues[side], (distance, neighbor_id))
+
+                    # The other search has reached this node too: candidate meeting point
+                    if neighbor_id in distances[other] and distance + distances[other][neighbor_id] < best:
+                        best = distance + distances[other][neighbor_id]
+                        meeting_id = neighbor_id
+
+        self.last_expanded = expanded
+        if meeting_id is None:
+            return None
+
+        path = self._build_path(graph, previous[0], meeting_id)
+        current = previous[1][meeting_id]
+        while current is not None:
+            path.append(graph.get_node_by_id(current))
+            current = previous[1][current]
+        return path
 
-        return None # No path found
\ No newline at end of file
+    def _build_path(self, graph: Graph, previous_nodes: Dict[int, Optional[int]], end_id: int) -> List[Node]:
+        path: deque[Node] = deque()
+        current: Optional[int] = end_id
+        while current is not None:
+            path.appendleft(graph.get_node_by_id(current))
+            current = previous_nodes[current]
+        return list(path)
@@ -0,0 +1,106 @@
+# parse_cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from intent_parser import normalize_command
+
+ParseResult = Tuple[str, List[str]]
+
+class ParseCache:
+    """
+    LRU + TTL cache of LLM parse results.
+
+    Keys combine the normalized user input with a hash of the destination
+    context (room names and phrase mappings), so a map or mapping change
+    can never serve a stale destination. With `db_path` set, entries are
+    written through to a small sqlite table and survive restarts.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 24 * 3600, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, ParseResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache ("
+                "key TEXT PRIMARY KEY, command TEXT NOT NULL, params TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            # Expired rows are never served, drop them so the file doesn't grow forever
+            self._db.execute("DELETE FROM parse_cache WHERE created < ?", (time.time() - ttl_seconds,))
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> "ParseCache":
+        """Sized by PORTER_PARSE_CACHE_SIZE/_TTL; PORTER_PARSE_CACHE_PATH keeps warm entries across restarts."""
+        return cls(
+            max_entries=int(os.getenv('PORTER_PARSE_CACHE_SIZE', '512')),
+            ttl_seconds=float(os.getenv('PORTER_PARSE_CACHE_TTL', str(24 * 3600))),
+            db_path=os.getenv('PORTER_PARSE_CACHE_PATH'),
+        )
+
+    @staticmethod
+    def make_key(user_input: str, context_hash: str) -> str:
+        return f"{context_hash}|{normalize_command(user_input)}"
+
+    def get(self, key: str) -> Optional[ParseResult]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, result = entry
+                if now - created <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    return result
+                del self._entries[key]
+
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT command, params, created FROM parse_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            command, params, created = row
+            if now - created > self.ttl_seconds:
+                self._db.execute("DELETE FROM parse_cache WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            result = (command, json.loads(params))
+            self._remember(key, created, result)
+            return result
+
+    def put(self, key: str, result: ParseResult):
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, result)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO parse_cache (key, command, params, created) VALUES (?, ?, ?, ?)",
+                    (key, result[0], json.dumps(result[1]), created),
+                )
+                self._db.commit()
+
+    def invalidate(self):
+        """Drops every entry, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM parse_cache")
+                self._db.commit()
+
+    def _remember(self, key: str, created: float, result: ParseResult):
+        self._entries[key] = (created, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
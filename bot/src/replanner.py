@@ -0,0 +1,143 @@
+# replanner.py
+
+import heapq
+import math
+from typing import Dict, List, Optional, Tuple
+from graph import Graph, Node
+
+
+class DStarLite:
+    """
+    Keeps one bot's route to a fixed goal up to date while the bot moves and
+    corridors are blocked, reopened or reweighted (D* Lite, Koenig &
+    Likhachev 2002).
+
+    The search runs backwards from the goal, so after a change only the nodes
+    whose distance-to-goal actually changed are re-expanded, and the bot's
+    current node is the only thing that moves. Call `move_to` as the bot
+    advances and `update` after the graph's edges change; `path` is then the
+    shortest route from the bot's node.
+
+    The heuristic is straight-line distance (0 for nodes without
+    coordinates), the same one the Navigator's A* uses.
+    """
+
+    def __init__(self, graph: Graph, start: Node, goal: Node):
+        self.graph = graph
+        self.goal = goal
+        self.start_id = start.id
+        # Nodes expanded by the initial search and by each update
+        self.last_expanded = 0
+        self.total_expanded = 0
+        self._reset()
+
+    def _reset(self):
+        """Searches from scratch for the current graph."""
+        self._km = 0.0
+        self._g: Dict[int, float] = {}
+        self._rhs: Dict[int, float] = {self.goal.id: 0.0}
+        self._queue: List[Tuple[Tuple[float, float], int]] = []
+        self._queued: Dict[int, Tuple[float, float]] = {} # Current key per queued node; older heap entries are stale
+        self._edge_version = self.graph.edge_version
+        self._push(self.goal.id)
+        self._compute()
+
+    def move_to(self, node: Node):
+        """The bot is now at `node`."""
+        self._km += self._heuristic(self.start_id, node.id)
+        self.start_id = node.id
+
+    def update(self) -> bool:
+        """
+        Applies the graph's edge changes since the last call and repairs the
+        route. Returns False when they had to be re-read from scratch.
+        """
+        changes = self.graph.edge_changes_since(self._edge_version)
+        self._edge_version = self.graph.edge_version
+        if changes is None:
+            self._reset()
+            return False
+        for change in changes:
+            self._update_vertex(change.node_a_id)
+            self._update_vertex(change.node_b_id)
+        self._compute()
+        return True
+
+    def distance(self) -> float:
+        """Shortest distance from the bot's node to the goal (inf if cut off)."""
+        return self._g.get(self.start_id, math.inf)
+
+    def path(self) -> Optional[List[Node]]:
+        """The current shortest route from the bot's node to the goal, or None if it is cut off."""
+        if self.distance() == math.inf:
+            return None
+        nodes = self.graph.nodes
+        path = [nodes[self.start_id]]
+        current = self.start_id
+        while current != self.goal.id:
+            best_id, best = None, math.inf
+            for neighbor_id, weight in self.graph.iter_edges(current):
+                cost = weight + self._g.get(neighbor_id, math.inf)
+                if cost < best:
+                    best_id, best = neighbor_id, cost
+            if best_id is None or len(path) > len(nodes):
+                return None
+            current = best_id
+            path.append(nodes[current])
+        return path
+
+    def _heuristic(self, a_id: int, b_id: int) -> float:
+        a, b = self.graph.nodes[a_id], self.graph.nodes[b_id]
+        if a.x is None or a.y is None or b.x is None or b.y is None:
+            return 0.0
+        return math.hypot(a.x - b.x, a.y - b.y)
+
+    def _key(self, node_id: int) -> Tuple[float, float]:
+        best = min(self._g.get(node_id, math.inf), self._rhs.get(node_id, math.inf))
+        return (best + self._heuristic(self.start_id, node_id) + self._km, best)
+
+    def _push(self, node_id: int):
+        key = self._key(node_id)
+        self._queued[node_id] = key
+        heapq.heappush(self._queue, (key, node_id))
+
+    def _update_vertex(self, node_id: int):
+        if node_id != self.goal.id:
+            self._rhs[node_id] = min(
+                (weight + self._g.get(neighbor_id, math.inf) for neighbor_id, weight in self.graph.iter_edges(node_id)),
+                default=math.inf)
+        if self._g.get(node_id, math.inf) != self._rhs.get(node_id, math.inf):
+            self._push(node_id)
+        else:
+            self._queued.pop(node_id, None)
+
+    def _compute(self):
+        queue, queued = self._queue, self._queued
+        g, rhs = self._g, self._rhs
+        expanded = 0
+        while queue:
+            key, node_id = queue[0]
+            if queued.get(node_id) != key:
+                heapq.heappop(queue) # Stale entry
+                continue
+            start_g = g.get(self.start_id, math.inf)
+            if key >= self._key(self.start_id) and rhs.get(self.start_id, math.inf) == start_g:
+                break
+            heapq.heappop(queue)
+            del queued[node_id]
+            expanded += 1
+
+            new_key = self._key(node_id)
+            if key < new_key:
+                self._push(node_id)
+            elif g.get(node_id, math.inf) > rhs.get(node_id, math.inf):
+                g[node_id] = rhs[node_id]
+                for neighbor_id, _ in self.graph.iter_edges(node_id):
+                    self._update_vertex(neighbor_id)
+            else:
+                g[node_id] = math.inf
+                self._update_vertex(node_id)
+                for neighbor_id, _ in self.graph.iter_edges(node_id):
+                    self._update_vertex(neighbor_id)
+        self.last_expanded = expanded
+        self.total_expanded += expanded
@@ -0,0 +1,381 @@
+# reservations.py
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+from graph import Graph, Node
+
+
+class Schedule(NamedTuple):
+    bot_id: str
+    waypoints: List[Tuple[int, Node]] # (time step, node) for every step the bot is at a node, waits included
+    shortest_steps: int               # Steps the trip would take with the corridors to itself
+
+    @property
+    def path(self) -> List[Node]:
+        """The nodes visited, without the waits."""
+        path: List[Node] = []
+        for _, node in self.waypoints:
+            if not path or path[-1] != node:
+                path.append(node)
+        return path
+
+    @property
+    def start_time(self) -> int:
+        return self.waypoints[0][0]
+
+    @property
+    def arrival_time(self) -> int:
+        return self.waypoints[-1][0]
+
+    @property
+    def wait_steps(self) -> int:
+        """Steps lost to other bots compared with an empty ward."""
+        return self.arrival_time - self.start_time - self.shortest_steps
+
+
+class ReservationTable:
+    """
+    Who is where, and when, on a discrete time axis (one step =
+    `CooperativePlanner.step_seconds`).
+
+    A bot holds a node for every step it stands on it and a directed edge for
+    every step it spends moving along it. Corridors are one bot wide: two
+    bots may not be on an edge in opposite directions at the same step, nor
+    enter it in the same direction on the same step. A bot that has reached
+    its goal is parked there from its arrival until its next reservation.
+    """
+
+    def __init__(self):
+        self._nodes: Dict[Tuple[int, int], str] = {}            # (node, step) -> bot
+        self._edges: Dict[Tuple[int, int, int], str] = {}       # (from, to, step) -> bot on the edge
+        self._entries: Dict[Tuple[int, int, int], str] = {}     # (from, to, step) -> bot entering the edge
+        self._parked: Dict[int, Tuple[int, str]] = {}           # node -> (from step, bot)
+        self._last_use: Dict[int, Dict[str, int]] = {}          # node -> bot -> last step it is held
+        self._by_bot: Dict[str, List[Tuple[str, Tuple[int, ...]]]] = {}
+        self._lock = threading.RLock()
+
+    def node_free(self, node_id: int, step: int, bot_id: str) -> bool:
+        with self._lock:
+            holder = self._nodes.get((node_id, step))
+            if holder is not None and holder != bot_id:
+                return False
+            parked = self._parked.get(node_id)
+            return parked is None or parked[1] == bot_id or parked[0] > step
+
+    def edge_free(self, from_id: int, to_id: int, step: int, steps: int, bot_id: str) -> bool:
+        """Can `bot_id` move from -> to during [step, step + steps)?"""
+        with self._lock:
+            entering = self._entries.get((from_id, to_id, step))
+            if entering is not None and entering != bot_id:
+                return False
+            for t in range(step, step + steps):
+                oncoming = self._edges.get((to_id, from_id, t))
+                if oncoming is not None and oncoming != bot_id:
+                    return False
+            return True
+
+    def can_park(self, node_id: int, step: int, bot_id: str) -> bool:
+        """Can `bot_id` stay at `node_id` from `step` on, without anyone else passing through?"""
+        with self._lock:
+            parked = self._parked.get(node_id)
+            if parked is not None and parked[1] != bot_id:
+                return False
+            return all(last < step for bot, last in self._last_use.get(node_id, {}).items() if bot != bot_id)
+
+    def hold(self, bot_id: str, node_id: int, step: int):
+        """Reserves a single node step, e.g. where a bot stands before it is planned."""
+        with self._lock:
+            self._hold_node(bot_id, node_id, step)
+
+    def reserve(self, schedule: Schedule, steps_for: Dict[Tuple[int, int], int]):
+        """Books a planned schedule; `steps_for[(from, to)]` is each move's length in steps."""
+        with self._lock:
+            bot_id = schedule.bot_id
+            previous: Optional[Tuple[int, Node]] = None
+            for step, node in schedule.waypoints:
+                self._hold_node(bot_id, node.id, step)
+                if previous is not None and previous[1] != node:
+                    depart = previous[0]
+                    key = (previous[1].id, node.id)
+                    self._entries[key + (depart,)] = bot_id
+                    self._by_bot[bot_id].append(("entry", key + (depart,)))
+                    for t in range(depart, depart + steps_for[key]):
+                        self._edges[key + (t,)] = bot_id
+                        self._by_bot[bot_id].append(("edge", key + (t,)))
+                previous = (step, node)
+            arrival, goal = schedule.waypoints[-1]
+            self.park(bot_id, goal.id, arrival)
+
+    def park(self, bot_id: str, node_id: int, step: int):
+        """Marks `bot_id` as standing at `node_id` from `step` until it is released."""
+        with self._lock:
+            self._parked[node_id] = (step, bot_id)
+            self._by_bot.setdefault(bot_id, []).append(("parked", (node_id,)))
+
+    def release(self, bot_id: str):
+        """Drops everything `bot_id` holds, e.g. before planning its next trip."""
+        with self._lock:
+            for kind, key in self._by_bot.pop(bot_id, []):
+                if kind == "node":
+                    if self._nodes.get(key) == bot_id: # type: ignore
+                        del self._nodes[key] # type: ignore
+                    users = self._last_use.get(key[0])
+                    if users is not None:
+                        users.pop(bot_id, None)
+                elif kind == "edge":
+                    if self._edges.get(key) == bot_id: # type: ignore
+                        del self._edges[key] # type: ignore
+                elif kind == "entry":
+                    if self._entries.get(key) == bot_id: # type: ignore
+                        del self._entries[key] # type: ignore
+                elif self._parked.get(key[0], (0, None))[1] == bot_id:
+                    del self._parked[key[0]]
+
+    def prune(self, before: int):
+        """Forgets node and edge steps earlier than `before`; parked bots stay parked."""
+        with self._lock:
+            for table in (self._nodes, self._edges, self._entries):
+                for key in [key for key in table if key[-1] < before]:
+                    del table[key]
+            for bot_id, keys in self._by_bot.items():
+                self._by_bot[bot_id] = [(kind, key) for kind, key in keys if kind == "parked" or key[-1] >= before]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._nodes) + len(self._edges)
+
+    def _hold_node(self, bot_id: str, node_id: int, step: int):
+        self._nodes[(node_id, step)] = bot_id
+        users = self._last_use.setdefault(node_id, {})
+        users[bot_id] = max(step, users.get(bot_id, step))
+        self._by_bot.setdefault(bot_id, []).append(("node", (node_id, step)))
+
+
+class CooperativePlanner:
+    """
+    Prioritized cooperative A* (space-time A* over a shared ReservationTable).
+
+    Each trip is searched over (node, time step) states: at every step a bot
+    may wait where it is or start along an edge, as long as the reservation
+    table allows it. The heuristic is the bot's step count to the goal in an
+    empty ward (one reverse Dijkstra per goal, cached). Planned trips are
+    booked immediately, so bots planned later route around them; the order
+    of `plan_all` is the priority order.
+
+    Edge lengths are turned into whole steps at `speed` map units per second.
+    """
+
+    def __init__(self, graph: Graph, reservations: Optional[ReservationTable] = None, speed: float = 1.0,
+                 step_seconds: float = 1.0, max_wait_steps: int = 120, cache_size: int = 256):
+        """
+        Args:
+            max_wait_steps: How much longer than the empty-ward trip a search
+                may look before giving up on a bot.
+            cache_size: Goals whose heuristic tables are kept.
+        """
+        self.graph = graph
+        self.reservations = reservations if reservations is not None else ReservationTable()
+        self.speed = speed
+        self.step_seconds = step_seconds
+        self.max_wait_steps = max_wait_steps
+        self.cache_size = cache_size
+        # (from, to) -> whole steps to cross that edge, filled in as edges are met
+        self.edge_steps: Dict[Tuple[int, int], int] = {}
+        self._heuristics: "OrderedDict[int, Dict[int, int]]" = OrderedDict()
+        self._graph_version = (graph.version, graph.edge_version)
+        # Held for a whole plan, so no other bot books between our search and our booking
+        self._lock = threading.RLock()
+        # Search states popped by the last plan() call
+        self.last_expanded = 0
+
+    def now(self) -> int:
+        """The current wall-clock time step, for planning live bots."""
+        return int(time.monotonic() / self.step_seconds)
+
+    def wait_until(self, step: int):
+        """Sleeps until wall-clock time step `step` begins (see `now`)."""
+        delay = step * self.step_seconds - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def steps(self, distance: float) -> int:
+        return max(1, math.ceil(distance / (self.speed * self.step_seconds) - 1e-9))
+
+    def plan(self, bot_id: str, start: Node, goal: Node, start_time: Optional[int] = None) -> Optional[Schedule]:
+        """
+        Plans and books one bot's trip around everything already reserved,
+        replacing the bot's previous reservations. Without `start_time` the
+        trip starts now and reservations in the past are dropped. Returns
+        None (and books nothing) when no conflict-free trip is found.
+
+        Plans are serialized: concurrent callers (one per bot worker) each
+        search against the table as the previous plan left it.
+        """
+        with self._lock:
+            if start_time is None:
+                # Live bots: steps before now can't conflict with anything any more
+                start_time = self.now()
+                self.reservations.prune(start_time)
+            self._check_graph()
+            heuristic = self._heuristic(goal.id)
+            if start.id not in heuristic:
+                return None
+
+            self.reservations.release(bot_id)
+            waypoints = self._search(bot_id, start, goal, start_time, heuristic)
+            if waypoints is None:
+                # Keep standing where we are
+                self.reservations.hold(bot_id, start.id, start_time)
+                return None
+            schedule = Schedule(bot_id, waypoints, heuristic[start.id])
+            self.reservations.reserve(schedule, self.edge_steps)
+            return schedule
+
+    def plan_all(self, trips: Sequence[Tuple[str, Node, Node]],
+                 start_time: Optional[int] = None) -> Dict[str, Optional[Schedule]]:
+        """
+        Plans (bot_id, start, goal) trips in priority order. Every bot first
+        holds its starting node, so bots planned earlier don't run into bots
+        that haven't moved yet.
+        """
+        start_time = self.now() if start_time is None else start_time
+        with self._lock:
+            for bot_id, start, _ in trips:
+                self.reservations.release(bot_id)
+                self.reservations.hold(bot_id, start.id, start_time)
+            return {bot_id: self.plan(bot_id, start, goal, start_time) for bot_id, start, goal in trips}
+
+    def _check_graph(self):
+        # Blocked or reweighted corridors change step counts and heuristics too
+        if self._graph_version != (self.graph.version, self.graph.edge_version):
+            self.edge_steps.clear()
+            self._heuristics.clear()
+            self._graph_version = (self.graph.version, self.graph.edge_version)
+
+    def _heuristic(self, goal_id: int) -> Dict[int, int]:
+        """Empty-ward step counts from every node to `goal_id`."""
+        table = self._heuristics.get(goal_id)
+        if table is not None:
+            self._heuristics.move_to_end(goal_id)
+            return table
+
+        table = {}
+        queue = [(0, goal_id)]
+        while queue:
+            cost, node_id = heapq.heappop(queue)
+            if node_id in table:
+                continue
+            table[node_id] = cost
+            for neighbor_id, distance in self.graph.iter_edges(node_id):
+                if neighbor_id not in table:
+                    steps = self.edge_steps.get((neighbor_id, node_id))
+                    if steps is None:
+                        steps = self.edge_steps[(neighbor_id, node_id)] = self.steps(distance)
+                    heapq.heappush(queue, (cost + steps, neighbor_id))
+        self._heuristics[goal_id] = table
+        while len(self._heuristics) > self.cache_size:
+            self._heuristics.popitem(last=False)
+        return table
+
+    def _search(self, bot_id: str, start: Node, goal: Node, start_time: int,
+                heuristic: Dict[int, int]) -> Optional[List[Tuple[int, Node]]]:
+        reservations = self.reservations
+        deadline = start_time + heuristic[start.id] + self.max_wait_steps
+        counter = itertools.count() # Tie-breaker so the heap never compares nodes
+        frontier = [(start_time + heuristic[start.id], start_time, next(counter), start.id)]
+        parents: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {(start.id, start_time): None}
+        closed: Set[Tuple[int, int]] = set()
+        self.last_expanded = 0
+
+        while frontier:
+            _, step, _, node_id = heapq.heappop(frontier)
+            if (node_id, step) in closed:
+                continue
+            closed.add((node_id, step))
+            self.last_expanded += 1
+            if node_id == goal.id and reservations.can_park(node_id, step, bot_id):
+                return self._waypoints(parents, (node_id, step))
+
+            moves = [(node_id, 1)] # Wait one step
+            for neighbor_id, distance in self.graph.iter_edges(node_id):
+                steps = self.edge_steps.get((node_id, neighbor_id))
+                if steps is None:
+                    steps = self.edge_steps[(node_id, neighbor_id)] = self.steps(distance)
+                moves.append((neighbor_id, steps))
+
+            for next_id, steps in moves:
+                arrival = step + steps
+                remaining = heuristic.get(next_id)
+                if remaining is None or arrival + remaining > deadline or (next_id, arrival) in closed:
+                    continue
+                if not reservations.node_free(next_id, arrival, bot_id):
+                    continue
+                if next_id != node_id and not reservations.edge_free(node_id, next_id, step, steps, bot_id):
+                    continue
+                if (next_id, arrival) not in parents:
+                    parents[(next_id, arrival)] = (node_id, step)
+                    heapq.heappush(frontier, (arrival + remaining, arrival, next(counter), next_id))
+        return None
+
+    def _waypoints(self, parents: Dict[Tuple[int, int], Optional[Tuple[int, int]]],
+                   state: Tuple[int, int]) -> List[Tuple[int, Node]]:
+        waypoints = []
+        current: Optional[Tuple[int, int]] = state
+        while current is not None:
+            waypoints.append((current[1], self.graph.nodes[current[0]]))
+            current = parents[current]
+        waypoints.reverse()
+        return waypoints
+
+
+def schedule_metrics(schedules: Dict[str, Optional[Schedule]], step_seconds: float = 1.0) -> Dict[str, float]:
+    """Makespan and total wait (seconds) of a set of planned trips, and how many bots couldn't be planned."""
+    planned = [schedule for schedule in schedules.values() if schedule is not None]
+    if not planned:
+        return {"planned": 0, "failed": len(schedules), "makespan_s": 0.0, "total_wait_s": 0.0}
+    start = min(schedule.start_time for schedule in planned)
+    return {
+        "planned": len(planned),
+        "failed": len(schedules) - len(planned),
+        "makespan_s": (max(schedule.arrival_time for schedule in planned) - start) * step_seconds,
+        "total_wait_s": sum(schedule.wait_steps for schedule in planned) * step_seconds,
+    }
+
+
+def find_conflicts(schedules: Sequence[Schedule], steps_for: Dict[Tuple[int, int], int]) -> List[Tuple[str, str, str, int]]:
+    """
+    Every pair of bots that would meet: ("node", bot, bot, step) when two
+    bots stand on one node, ("edge", ...) when they pass head-on in a corridor.
+    Bots stay at their final node after arriving. Used to check plans.
+    """
+    at: Dict[Tuple[int, int], str] = {}
+    on_edge: Dict[Tuple[int, int, int], str] = {}
+    conflicts: List[Tuple[str, str, str, int]] = []
+    horizon = max((schedule.arrival_time for schedule in schedules), default=0)
+    for schedule in schedules:
+        bot_id = schedule.bot_id
+        previous: Optional[Tuple[int, Node]] = None
+        occupied = []
+        for step, node in schedule.waypoints:
+            occupied.append((node.id, step))
+            if previous is not None and previous[1] != node:
+                key = (previous[1].id, node.id)
+                for t in range(previous[0], previous[0] + steps_for[key]):
+                    other = on_edge.get((key[1], key[0], t))
+                    if other is not None and other != bot_id:
+                        conflicts.append(("edge", other, bot_id, t))
+                    on_edge[key + (t,)] = bot_id
+            previous = (step, node)
+        arrival, goal = schedule.waypoints[-1]
+        occupied.extend((goal.id, t) for t in range(arrival + 1, horizon + 1))
+        for key in occupied:
+            other = at.get(key)
+            if other is not None and other != bot_id:
+                conflicts.append(("node", other, bot_id, key[1]))
+            at[key] = bot_id
+    return conflicts
@@ -0,0 +1,239 @@
+# route_planner.py
+
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from graph import Graph, Node
+from navigator import Navigator
+from latency_stats import LatencyStats
+from dispatcher import PRIORITY_WEIGHT
+
+# Visit orders are exact (Held-Karp) up to this many stops, heuristic above
+EXACT_LIMIT = 10
+
+
+class Stop(NamedTuple):
+    room: Node
+    priority: str = "normal"
+    deadline: Optional[float] = None # Seconds from now; None = no deadline
+    task_id: Any = None
+
+
+class RoutePlan(NamedTuple):
+    stops: List[Stop]        # Visit order
+    legs: List[List[Node]]   # Path to each stop from the previous one
+    path: List[Node]         # The whole route, start node first
+    distance: float
+    lateness: float          # Priority-weighted seconds past deadlines, summed over stops
+    late_stops: int
+    method: str              # "exact", "heuristic" or "trivial"
+    skipped: List[Stop]      # Stops that can't be reached from the start
+
+
+class RoutePlanner:
+    """
+    Orders a bot's stops to keep one trip through all of them short.
+
+    The cost of a visit order is its travel distance plus, for every stop
+    reached after its deadline, the lateness (as distance at `speed`) times
+    the stop's priority weight times `lateness_weight`. Up to `exact_limit`
+    stops the best order is found with Held-Karp dynamic programming over
+    (visited set, last stop), keeping every (cost, arrival) pair that isn't
+    beaten on both so deadlines stay exact. Larger sets start from a
+    nearest-neighbour order and are improved with 2-opt segment reversals.
+
+    Distances come from the navigator's route table when it is enabled,
+    otherwise from one bounded Dijkstra per stop. Planning time is recorded
+    in `stats` by method.
+    """
+
+    def __init__(self, graph: Graph, navigator: Optional[Navigator] = None, speed: float = 1.0,
+                 lateness_weight: float = 1.0, exact_limit: int = EXACT_LIMIT):
+        """
+        Args:
+            speed: Travel speed in map distance units per second, to turn
+                deadlines into distances.
+            lateness_weight: How many units of distance one unit of
+                (priority-weighted) lateness is worth.
+        """
+        self.graph = graph
+        self.navigator = navigator if navigator is not None else Navigator()
+        self.speed = speed
+        self.lateness_weight = lateness_weight
+        self.exact_limit = exact_limit
+        self.stats = LatencyStats()
+
+    def distance_matrix(self, points: Sequence[Node]) -> List[List[float]]:
+        """Shortest travel distances between every pair of `points` (inf if unreachable)."""
+        if self.navigator.use_route_table:
+            route_table = self.navigator._get_route_table(self.graph)
+            return [[route_table.get_distance(a, b) for b in points] for a in points]
+
+        unreachable = float('inf')
+        targets = {point.id for point in points}
+        matrix = []
+        for point in points:
+            distances, _ = self.navigator.multi_source_distances(self.graph, {point.id: 0.0}, targets=targets)
+            matrix.append([distances.get(other.id, unreachable) for other in points])
+        return matrix
+
+    def plan(self, start: Node, stops: Sequence[Stop], method: Optional[str] = None) -> RoutePlan:
+        """
+        Plans a route from `start` through every reachable stop.
+
+        `method` forces "exact" or "heuristic"; by default it follows
+        `exact_limit`.
+        """
+        began = time.perf_counter()
+        matrix = self.distance_matrix([start] + [stop.room for stop in stops])
+        reachable = [i for i in range(len(stops)) if matrix[0][i + 1] != float('inf')]
+        skipped = [stop for i, stop in enumerate(stops) if matrix[0][i + 1] == float('inf')]
+        stops = [stops[i] for i in reachable]
+        # Keep the start row/column and the reachable stops only
+        keep = [0] + [i + 1 for i in reachable]
+        matrix = [[matrix[a][b] for b in keep] for a in keep]
+
+        if method is None:
+            method = "exact" if len(stops) <= self.exact_limit else "heuristic"
+        if len(stops) <= 1:
+            method = "trivial"
+            order = list(range(len(stops)))
+        elif method == "exact":
+            order = self._held_karp(matrix, stops)
+        elif method == "heuristic":
+            order = self._two_opt(self._nearest_neighbour(matrix, stops), matrix, stops)
+        else:
+            raise ValueError(f"Unknown planning method '{method}'. Expected 'exact' or 'heuristic'.")
+        self.stats.record(method, time.perf_counter() - began)
+        return self._build_plan(start, order, matrix, stops, method, skipped)
+
+    def evaluate(self, start: Node, stops: Sequence[Stop]) -> RoutePlan:
+        """The plan for visiting `stops` in the given order, e.g. one by one as they arrived."""
+        matrix = self.distance_matrix([start] + [stop.room for stop in stops])
+        return self._build_plan(start, list(range(len(stops))), matrix, list(stops), "given", [])
+
+    def _late_penalty(self, stop: Stop, arrival: float) -> float:
+        """Cost of reaching `stop` after travelling `arrival` distance units."""
+        if stop.deadline is None:
+            return 0.0
+        late = arrival - stop.deadline * self.speed
+        if late <= 0:
+            return 0.0
+        return self.lateness_weight * PRIORITY_WEIGHT.get(stop.priority, 1.0) * late
+
+    def _cost(self, order: Sequence[int], matrix: List[List[float]], stops: Sequence[Stop]) -> float:
+        cost = arrival = 0.0
+        previous = 0
+        for index in order:
+            arrival += matrix[previous][index + 1]
+            cost += self._late_penalty(stops[index], arrival)
+            previous = index + 1
+        return arrival + cost
+
+    def _held_karp(self, matrix: List[List[float]], stops: Sequence[Stop]) -> List[int]:
+        count = len(stops)
+        # labels[mask][last] -> non-dominated (cost, arrival, parent label) ending at stop `last`
+        labels: List[Dict[int, List[Tuple[float, float, int, Any]]]] = [dict() for _ in range(1 << count)]
+        for index in range(count):
+            arrival = matrix[0][index + 1]
+            cost = arrival + self._late_penalty(stops[index], arrival)
+            labels[1 << index][index] = [(cost, arrival, index, None)]
+
+        for mask in range(1, 1 << count):
+            for last, bucket in labels[mask].items():
+                row = matrix[last + 1]
+                for label in bucket:
+                    cost, arrival = label[0], label[1]
+                    for index in range(count):
+                        if mask & (1 << index):
+                            continue
+                        step = row[index + 1]
+                        reach = arrival + step
+                        candidate = (cost + step + self._late_penalty(stops[index], reach), reach, index, label)
+                        _add_label(labels[mask | (1 << index)].setdefault(index, []), candidate)
+
+        best = min((label for bucket in labels[(1 << count) - 1].values() for label in bucket), key=lambda l: l[0])
+        order = []
+        label = best
+        while label is not None:
+            order.append(label[2])
+            label = label[3]
+        order.reverse()
+        return order
+
+    def _nearest_neighbour(self, matrix: List[List[float]], stops: Sequence[Stop]) -> List[int]:
+        remaining = set(range(len(stops)))
+        order = []
+        previous = 0
+        arrival = 0.0
+        while remaining:
+            # Nearest by distance plus any lateness this stop would pick up
+            index = min(remaining, key=lambda i: (
+                matrix[previous][i + 1] + self._late_penalty(stops[i], arrival + matrix[previous][i + 1]), i))
+            arrival += matrix[previous][index + 1]
+            order.append(index)
+            remaining.remove(index)
+            previous = index + 1
+        return order
+
+    def _two_opt(self, order: List[int], matrix: List[List[float]], stops: Sequence[Stop],
+                 max_passes: int = 20) -> List[int]:
+        has_deadlines = any(stop.deadline is not None for stop in stops)
+        best_cost = self._cost(order, matrix, stops)
+        for _ in range(max_passes):
+            improved = False
+            for i in range(len(order) - 1):
+                for j in range(i + 1, len(order)):
+                    if not has_deadlines:
+                        # Open route: only the edges into the segment and out of it change
+                        a = order[i - 1] + 1 if i > 0 else 0
+                        b, c = order[i] + 1, order[j] + 1
+                        before = matrix[a][b]
+                        after = matrix[a][c]
+                        if j + 1 < len(order):
+                            d = order[j + 1] + 1
+                            before += matrix[c][d]
+                            after += matrix[b][d]
+                        if after < before - 1e-9:
+                            order[i:j + 1] = reversed(order[i:j + 1])
+                            best_cost += after - before
+                            improved = True
+                        continue
+                    candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                    cost = self._cost(candidate, matrix, stops)
+                    if cost < best_cost - 1e-9:
+                        order, best_cost = candidate, cost
+                        improved = True
+            if not improved:
+                break
+        return order
+
+    def _build_plan(self, start: Node, order: Sequence[int], matrix: List[List[float]], stops: Sequence[Stop],
+                    method: str, skipped: List[Stop]) -> RoutePlan:
+        legs: List[List[Node]] = []
+        path = [start]
+        current = start
+        arrival = lateness = 0.0
+        late_stops = 0
+        previous = 0
+        for index in order:
+            stop = stops[index]
+            arrival += matrix[previous][index + 1]
+            previous = index + 1
+            if stop.deadline is not None and arrival > stop.deadline * self.speed:
+                late_stops += 1
+                lateness += PRIORITY_WEIGHT.get(stop.priority, 1.0) * (arrival / self.speed - stop.deadline)
+            leg = self.navigator.find_shortest_path(self.graph, current, stop.room) or [current]
+            legs.append(leg)
+            path.extend(leg[1:])
+            current = stop.room
+        return RoutePlan([stops[i] for i in order], legs, path, arrival, lateness, late_stops, method, skipped)
+
+
+def _add_label(bucket: List[Tuple[float, float, int, Any]], label: Tuple[float, float, int, Any]):
+    """Adds `label` unless another is at least as cheap and as early; drops the ones it beats."""
+    cost, arrival = label[0], label[1]
+    for other in bucket:
+        if other[0] <= cost and other[1] <= arrival:
+            return
+    bucket[:] = [other for other in bucket if not (cost <= other[0] and arrival <= other[1])]
+    bucket.append(label)
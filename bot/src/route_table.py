@@ -0,0 +1,189 @@
+# route_table.py
+
+import heapq
+import re
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+from graph import EdgeChange, Graph, Node
+
+# Above this many rooms we stop precomputing a tree per room up front and only
+# keep the most recently used shortest-path trees around. Each tree covers the
+# whole graph, so memory grows with rooms x nodes.
+DEFAULT_PRECOMPUTE_LIMIT = 250
+
+# Corridor waypoints are routed through, not to; they get no precomputed tree
+_WAYPOINT_NAME = re.compile(r"\b(hall|hallway|corridor|junction|intersection|waypoint)\b", re.IGNORECASE)
+
+
+def is_room(node: Node) -> bool:
+    """Whether a node is a destination rather than a corridor waypoint, going by its name."""
+    return not _WAYPOINT_NAME.search(node.name)
+
+
+def shortest_path_tree(graph: Graph, source: Node) -> Tuple[Dict[int, float], Dict[int, Optional[int]]]:
+    """
+    Runs a full single-source Dijkstra from `source`.
+
+    Returns:
+        (distances, previous) keyed by node id. `previous` maps every reached
+        node to its predecessor on the shortest path (None for the source).
+    """
+    distances: Dict[int, float] = {source.id: 0}
+    previous: Dict[int, Optional[int]] = {source.id: None}
+    priority_queue: List[Tuple[float, int]] = [(0, source.id)]
+
+    while priority_queue:
+        current_distance, current_id = heapq.heappop(priority_queue)
+        if current_distance > distances[current_id]:
+            continue
+
+        for neighbor_id, weight in graph.iter_edges(current_id):
+            distance = current_distance + weight
+            if distance < distances.get(neighbor_id, float('inf')):
+                distances[neighbor_id] = distance
+                previous[neighbor_id] = current_id
+                heapq.heappush(priority_queue, (distance, neighbor_id))
+
+    return distances, previous
+
+
+class RouteTable:
+    """
+    Shortest-path trees for a graph, keyed by source node.
+
+    Small maps get a tree for every room at build time, so any route from a
+    room is just a walk back along the predecessor links (O(path length)).
+    Routes from corridor waypoints, and every route on larger maps, build
+    trees on demand and keep the `cache_size` most recently used ones.
+    When the graph's topology changes the table is dropped and the room
+    trees are rebuilt on a background thread; lookups meanwhile search on
+    demand. When a corridor is blocked or reweighted only the trees that
+    change are dropped (and rebuilt on their next lookup): those routing
+    over a lengthened edge, or that a shortened edge would improve.
+    It is safe to share between bots running on different threads.
+    """
+
+    def __init__(self, graph: Graph, cache_size: int = 256, precompute_limit: int = DEFAULT_PRECOMPUTE_LIMIT):
+        self.graph = graph
+        self.cache_size = cache_size
+        self.precompute_limit = precompute_limit
+        self._trees: Dict[int, Tuple[Dict[int, float], Dict[int, Optional[int]]]] = {} # Room trees
+        self._recent: "OrderedDict[int, Tuple[Dict[int, float], Dict[int, Optional[int]]]]" = OrderedDict()
+        self._version = -1
+        self._edge_version = -1
+        self._generation = 0 # Bumped by every rebuild, so an outdated background build stops
+        self.precomputed = False
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0 # Trees dropped by edge changes
+        self._lock = threading.RLock()
+        self.rebuild()
+
+    def rebuild(self, background: bool = False):
+        """Drops every cached tree and, for small maps, precomputes the room trees again."""
+        with self._lock:
+            self._trees.clear()
+            self._recent.clear()
+            self._version = self.graph.version
+            self._edge_version = self.graph.edge_version
+            self._generation += 1
+            generation = self._generation
+            rooms = [node for node in list(self.graph.nodes.values()) if is_room(node)]
+            self.precomputed = len(rooms) <= self.precompute_limit
+        if not self.precomputed:
+            return
+        if background:
+            threading.Thread(target=self._precompute, args=(generation, rooms),
+                             name="route-table-rebuild", daemon=True).start()
+        else:
+            self._precompute(generation, rooms)
+
+    def _precompute(self, generation: int, rooms: List[Node]):
+        for room in rooms:
+            version = (self.graph.version, self.graph.edge_version)
+            tree = shortest_path_tree(self.graph, room)
+            with self._lock:
+                if generation != self._generation:
+                    return # Rebuilt again meanwhile
+                if version == (self.graph.version, self.graph.edge_version):
+                    self._trees.setdefault(room.id, tree)
+
+    def sync(self):
+        """Catches up with graph changes now instead of on the next lookup."""
+        with self._lock:
+            if self._version != self.graph.version:
+                self.rebuild(background=True)
+            elif self._edge_version != self.graph.edge_version:
+                self._apply_edge_changes()
+
+    def _tree(self, source: Node) -> Tuple[Dict[int, float], Dict[int, Optional[int]]]:
+        with self._lock:
+            self.sync()
+
+            tree = self._trees.get(source.id)
+            if tree is None:
+                tree = self._recent.get(source.id)
+                if tree is not None:
+                    self._recent.move_to_end(source.id)
+            if tree is not None:
+                self.hits += 1
+                return tree
+            self.misses += 1
+            version = (self._version, self._edge_version)
+
+        # Searched outside the lock, other bots' lookups don't wait on it
+        tree = shortest_path_tree(self.graph, source)
+        with self._lock:
+            if version != (self.graph.version, self.graph.edge_version):
+                return tree # The graph changed while searching, don't cache a stale tree
+            if self.precomputed and is_room(source):
+                self._trees[source.id] = tree # Not built yet by a background rebuild
+            else:
+                self._recent[source.id] = tree
+                while len(self._recent) > self.cache_size:
+                    self._recent.popitem(last=False)
+        return tree
+
+    def _apply_edge_changes(self):
+        changes = self.graph.edge_changes_since(self._edge_version)
+        self._edge_version = self.graph.edge_version
+        if changes is None:
+            self.rebuild(background=True) # Too many changes to catch up on
+            return
+        for trees in (self._trees, self._recent):
+            stale = [source for source, tree in trees.items() if any(_affects(tree, change) for change in changes)]
+            for source in stale:
+                del trees[source]
+            self.invalidated += len(stale)
+
+    def get_path(self, start_node: Node, end_node: Node) -> Optional[List[Node]]:
+        """Returns the shortest path from start_node to end_node, or None if unreachable."""
+        _, previous = self._tree(start_node)
+        if end_node.id not in previous:
+            return None
+
+        path: deque[Node] = deque()
+        current: Optional[int] = end_node.id
+        while current is not None:
+            path.appendleft(self.graph.nodes[current])
+            current = previous[current]
+        return list(path)
+
+    def get_distance(self, start_node: Node, end_node: Node) -> float:
+        """Returns the shortest travel distance between two nodes (inf if unreachable)."""
+        distances, _ = self._tree(start_node)
+        return distances.get(end_node.id, float('inf'))
+
+
+def _affects(tree: Tuple[Dict[int, float], Dict[int, Optional[int]]], change: EdgeChange) -> bool:
+    """Whether a shortest-path tree built before `change` may be wrong after it."""
+    distances, previous = tree
+    a, b = change.node_a_id, change.node_b_id
+    if change.new_distance > change.old_distance:
+        # Longer or blocked: only matters if the tree routes over this edge
+        return previous.get(b) == a or previous.get(a) == b
+    # Shorter or reopened: matters if it now beats the route to either end
+    infinity = float('inf')
+    distance_a, distance_b = distances.get(a, infinity), distances.get(b, infinity)
+    return distance_a + change.new_distance < distance_b or distance_b + change.new_distance < distance_a
@@ -1,9 +1,18 @@
 # speech_recognizer.py
 
-import pyaudio
-import wave
-import tempfile
 import os
+import threading
+from typing import Callable, Iterable, Iterator, Optional
+from audio_buffer import AudioRingBuffer
+from streaming_recognizer import GoogleStreamingRecognizer, StreamingRecognizer, SAMPLE_WIDTH
+
+# Optional PyAudio import, so recorded audio can be transcribed without a microphone
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    PYAUDIO_AVAILABLE = False
+    print("Warning: PyAudio not found. Microphone capture will be disabled.")
 
 # Optional Google Cloud import with fallback
 try:
@@ -14,20 +23,50 @@ except ImportError:
     print("Warning: Google Cloud Speech library not found. Speech-to-text will be disabled.")
 
 class SimpleVoiceRecorder:
-    """Lightweight voice recorder for command capture"""
+    """
+    Lightweight voice recorder for command capture.
+
+    In streaming mode (the default, PORTER_SPEECH_STREAMING=0 to disable)
+    chunks go to a streaming recognizer while recording, partial transcripts
+    are reported as they arrive and the command is returned as soon as the
+    recognizer sends its final result. Otherwise the whole utterance is
+    recorded until the voice-activity detector hears the speaker stop, and transcribed in one call.
+
+    Pass `recognizer` (e.g. a FakeStreamingRecognizer) to run without Google
+    Cloud; `transcribe_stream` accepts any chunk source, such as `wav_chunks`.
+
+    The microphone stream is opened once and only stopped between commands;
+    call `close()` to release the device. One-shot recordings go into a
+    preallocated ring buffer and are sent as raw LINEAR16, never via disk.
+    """
     
-    def __init__(self):
+    def __init__(self, streaming: Optional[bool] = None, recognizer: Optional[StreamingRecognizer] = None):
         self.rate = 16000
         self.channels = 1
-        self.format = pyaudio.paInt16
+        self.format = pyaudio.paInt16 if PYAUDIO_AVAILABLE else None
         self.chunk = 1024
         self.max_duration = 5 # Maximum recording duration
+        self.end_silence = 1.2 # Seconds of silence after speech (plus the VAD's 0.3 s hangover) to stop
+        self.sample_width = pyaudio.get_sample_size(self.format) if PYAUDIO_AVAILABLE else SAMPLE_WIDTH
+        self.max_chunks = int(self.rate / self.chunk * (self.max_duration + self.end_silence + 0.3))
+        self._recording = AudioRingBuffer(self.max_chunks * self.chunk * self.sample_width)
+        self._audio = None
+        self._stream = None
+        self._stream_lock = threading.Lock()
+        if streaming is None:
+            streaming = os.getenv('PORTER_SPEECH_STREAMING', '1') != '0'
+        self.streaming = streaming
+        self.recognizer = recognizer
+        self.speech_client = None # Google's one-shot client; None with an injected recognizer
         
         self.speech_enabled = False # Assume false until verified
-        if SPEECH_AVAILABLE:
+        if recognizer is not None:
+            self.speech_enabled = True
+        elif SPEECH_AVAILABLE:
             try:
                 # If not using a service account key file, make sure gcloud is authenticated
                 self.speech_client = speech.SpeechClient()
+                self.recognizer = GoogleStreamingRecognizer(self.speech_client, self.rate)
                 self.speech_enabled = True
                 print("Google Cloud Speech-to-Text client initialized.")
             except Exception as e:
@@ -38,78 +77,165 @@ class SimpleVoiceRecorder:
             print("Google Cloud Speech library not available. Speech-to-text will be disabled.")
 
 
-    def record_command(self) -> str:
+    def record_command(self, on_partial: Optional[Callable[[str], None]] = None) -> str:
         """Record voice command and return text"""
         if not self.speech_enabled:
             print("Speech-to-text is not enabled or failed to initialize.")
             return ""
+        if not PYAUDIO_AVAILABLE:
+            print("PyAudio is not installed, no microphone to record from.")
+            return ""
             
         try:
-            audio = pyaudio.PyAudio()
+            stream = self._input_stream()
             print("🎤 Listening... (speak now)")
+            stream.start_stream() # Stopped between commands, so no stale audio is queued
             
-            stream = audio.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.rate,
-                input=True,
-                frames_per_buffer=self.chunk
-            )
+            try:
+                chunks = self._microphone_chunks(stream)
+                if self.streaming and self.recognizer is not None:
+                    return self.transcribe_stream(chunks, on_partial)
+                print(f"Recording for max {self.max_duration} seconds or until silence detected...")
+                recording = self._record_until_silence(chunks)
+            finally:
+                stream.stop_stream()
             
-            frames = []
-            # Parameters for silence detection
-            silence_threshold = 500  # Adjust based on your microphone and environment (avg amplitude)
-            max_silence_chunks = int(1.5 * self.rate / self.chunk) # 1.5 seconds of silence to stop
-            silence_count = 0
+            return self._audio_to_text(recording)
             
-            print(f"Recording for max {self.max_duration} seconds or until silence detected...")
+        except Exception as e:
+            print(f"Error during audio recording: {e}")
+            self.close() # Reopen the device on the next command
+            return ""
 
-            for _ in range(0, int(self.rate / self.chunk * self.max_duration) + max_silence_chunks):
-                data = stream.read(self.chunk, exception_on_overflow=False)
-                frames.append(data)
-                
-                # Simple silence detection
-                # Convert bytes to short integers for amplitude check
-                audio_data = wave.struct.unpack(f"{self.chunk}h", data)
-                max_amplitude = max(abs(sample) for sample in audio_data)
-                
-                if max_amplitude < silence_threshold:
-                    silence_count += 1
-                    if silence_count > max_silence_chunks:
-                        print("Silence detected. Stopping recording.")
-                        break
-                else:
-                    silence_count = 0 # Reset silence counter if sound is detected
-            
+    def _input_stream(self):
+        """The microphone stream, opened on first use and kept open between commands."""
+        with self._stream_lock:
+            if self._stream is None:
+                self._audio = pyaudio.PyAudio()
+                self._stream = self._audio.open(
+                    format=self.format,
+                    channels=self.channels,
+                    rate=self.rate,
+                    input=True,
+                    frames_per_buffer=self.chunk,
+                    start=False
+                )
+            return self._stream
+
+    def listen_chunks(self, stop: threading.Event) -> Iterator[bytes]:
+        """Microphone chunks until `stop` is set, for continuous listeners."""
+        stream = self._input_stream()
+        stream.start_stream()
+        try:
+            while not stop.is_set():
+                yield stream.read(self.chunk, exception_on_overflow=False)
+        finally:
             stream.stop_stream()
-            stream.close()
-            audio.terminate()
-            
-            return self._audio_to_text(frames)
-            
+
+    def close(self):
+        """Releases the microphone."""
+        with self._stream_lock:
+            if self._stream is not None:
+                try:
+                    self._stream.close()
+                except Exception as e:
+                    print(f"Error closing microphone stream: {e}")
+                self._stream = None
+            if self._audio is not None:
+                self._audio.terminate()
+                self._audio = None
+
+    def transcribe_stream(self, chunks: Iterable[bytes], on_partial: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Feeds `chunks` to the streaming recognizer and returns the final
+        transcript. No further chunks are read once it has arrived, and none
+        is being read when this returns, so the caller can stop the stream
+        they come from.
+        """
+        finished = threading.Event()
+        reading = threading.Lock() # Held while a chunk is read from `chunks`
+
+        def feed() -> Iterator[bytes]:
+            # The Google client reads requests on its own thread
+            source = iter(chunks)
+            while True:
+                with reading:
+                    if finished.is_set():
+                        return
+                    chunk = next(source, None)
+                if chunk is None:
+                    return
+                yield chunk
+
+        try:
+            for event in self.recognizer.stream(feed()):
+                if event.is_final:
+                    text = event.text.strip()
+                    print(f"Heard: '{text}'")
+                    return text.lower()
+                if on_partial is not None:
+                    on_partial(event.text)
+                else:
+                    print(f"Hearing: '{event.text}'")
+            print("No speech recognized.")
+            return ""
         except Exception as e:
-            print(f"Error during audio recording: {e}")
+            print(f"Error during streaming transcription: {e}")
             return ""
+        finally:
+            finished.set()
+            with reading:
+                pass # Waits out a read still in progress on the request thread
 
-    def _audio_to_text(self, frames) -> str:
-        """Convert audio to text using Google Cloud Speech-to-Text"""
+    def _microphone_chunks(self, stream) -> Iterator[bytes]:
+        # Recording stops after max_duration plus the time needed to detect trailing silence
+        for _ in range(self.max_chunks):
+            yield stream.read(self.chunk, exception_on_overflow=False)
+
+    def _record_until_silence(self, chunks: Iterable[bytes]) -> memoryview:
+        """
+        Records until the speaker has finished: speech must have started and
+        then stayed silent for `end_silence` seconds. Silence before the speaker
+        starts never ends the recording (max_duration still applies).
+
+        Returns a view of the recording ring buffer, valid until the next call.
+        """
+        from vad import VoiceActivityDetector # NumPy is only needed once something records
+
+        recording = self._recording
+        recording.clear()
+        vad = VoiceActivityDetector(self.rate)
+        end_silence_samples = self.end_silence * self.rate
+        silent_samples = 0
+
+        for data in chunks:
+            if len(recording) + len(data) > recording.capacity:
+                print("Maximum recording length reached.")
+                break
+            recording.write(data)
+            if vad.process(data) or not vad.speech_started:
+                silent_samples = 0
+                continue
+            silent_samples += len(data) // self.sample_width
+            if silent_samples >= end_silence_samples:
+                print("Silence detected. Stopping recording.")
+                break
+        segments = recording.views()
+        return segments[0] if segments else memoryview(b'')
+
+    def _audio_to_text(self, recording: memoryview) -> str:
+        """Convert raw LINEAR16 audio to text using Google Cloud Speech-to-Text"""
         if not self.speech_enabled:
             return "" # Should not be called if speech is not enabled
+        if self.speech_client is None:
+            # An injected recognizer: send it the recording in microphone-sized chunks
+            step = self.chunk * self.sample_width
+            return self.transcribe_stream(bytes(recording[i:i + step]) for i in range(0, len(recording), step))
             
         try:
-            # Use tempfile.NamedTemporaryFile to handle file creation and cleanup securely
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-                temp_file_name = temp_file.name
-                with wave.open(temp_file_name, 'wb') as wf:
-                    wf.setnchannels(self.channels)
-                    wf.setsampwidth(pyaudio.PyAudio().get_sample_size(self.format))
-                    wf.setframerate(self.rate)
-                    wf.writeframes(b''.join(frames))
-            
-            with open(temp_file_name, 'rb') as f:
-                audio_content = f.read()
-            
-            audio = speech.RecognitionAudio(content=audio_content)
+            # Raw samples need no WAV header, the encoding and rate are in the config.
+            # The protobuf message needs bytes, this is the only copy of the audio.
+            audio = speech.RecognitionAudio(content=bytes(recording))
             config = speech.RecognitionConfig(
                 encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
                 sample_rate_hertz=self.rate,
@@ -121,8 +247,6 @@ class SimpleVoiceRecorder:
             
             print("Transcribing audio...")
             response = self.speech_client.recognize(config=config, audio=audio)
-            
-            os.unlink(temp_file_name) # Clean up the temporary file
 
             if response.results:
                 text = response.results[0].alternatives[0].transcript
@@ -133,8 +257,4 @@ class SimpleVoiceRecorder:
                 
         except Exception as e:
             print(f"Error during audio transcription: {e}")
-            # Ensure temp file is cleaned up even if an error occurs
-            if 'temp_file_name' in locals() and os.path.exists(temp_file_name):
-                os.unlink(temp_file_name)
             return ""
-
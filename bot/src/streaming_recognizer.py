@@ -0,0 +1,134 @@
+# streaming_recognizer.py
+
+import math
+import time
+import wave
+from abc import ABC, abstractmethod
+from array import array
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+# Optional Google Cloud import with fallback, the fake recognizer works without it
+try:
+    from google.cloud import speech
+    SPEECH_AVAILABLE = True
+except ImportError:
+    SPEECH_AVAILABLE = False
+
+SAMPLE_WIDTH = 2 # LINEAR16
+
+
+class TranscriptEvent(NamedTuple):
+    text: str
+    is_final: bool
+
+
+class StreamingRecognizer(ABC):
+    """
+    Turns a stream of LINEAR16 mono chunks into transcript events while the
+    audio is still being recorded. Partial events may be revised by later
+    ones; the utterance is over at the first final event.
+    """
+
+    @abstractmethod
+    def stream(self, chunks: Iterable[bytes]) -> Iterator[TranscriptEvent]:
+        """Transcript events for `chunks`, ending at the first final event."""
+
+
+class GoogleStreamingRecognizer(StreamingRecognizer):
+    """Google Cloud Speech-to-Text streaming_recognize with interim results."""
+
+    def __init__(self, client, rate: int = 16000, language_code: str = 'en-US', phrase_hints: Optional[List[str]] = None):
+        self.client = client
+        self.rate = rate
+        self.language_code = language_code
+        self.phrase_hints = phrase_hints or []
+
+    def stream(self, chunks: Iterable[bytes]) -> Iterator[TranscriptEvent]:
+        config = speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            sample_rate_hertz=self.rate,
+            language_code=self.language_code,
+            model='command_and_search', # Optimized for short commands and search queries
+            speech_contexts=[speech.SpeechContext(phrases=self.phrase_hints)] if self.phrase_hints else None,
+        )
+        streaming_config = speech.StreamingRecognitionConfig(
+            config=config,
+            interim_results=True,
+            single_utterance=True, # The server endpoints the utterance and sends a final result
+        )
+        requests = (speech.StreamingRecognizeRequest(audio_content=chunk) for chunk in chunks)
+        for response in self.client.streaming_recognize(config=streaming_config, requests=requests):
+            for result in response.results:
+                if result.alternatives:
+                    yield TranscriptEvent(result.alternatives[0].transcript, result.is_final)
+
+
+class FakeStreamingRecognizer(StreamingRecognizer):
+    """
+    Local stand-in for offline runs and WAV fixtures.
+
+    It "hears" `transcript`: a chunk louder than `threshold` counts as speech,
+    one more word is revealed every `chunks_per_word` speech chunks as a
+    partial, and the final result comes after `endpoint_ms` of quiet that
+    follows speech (or when the audio runs out).
+    """
+
+    def __init__(self, transcript: str, rate: int = 16000, threshold: int = 500,
+                 chunks_per_word: int = 3, endpoint_ms: float = 300.0):
+        self.transcript = transcript
+        self.rate = rate
+        self.threshold = threshold
+        self.chunks_per_word = chunks_per_word
+        self.endpoint_ms = endpoint_ms
+        self.chunks_consumed = 0
+
+    def stream(self, chunks: Iterable[bytes]) -> Iterator[TranscriptEvent]:
+        words = self.transcript.split()
+        endpoint_samples = self.endpoint_ms * self.rate / 1000
+        speech_chunks = 0
+        quiet_samples = 0
+        revealed = 0
+        self.chunks_consumed = 0
+
+        for chunk in chunks:
+            self.chunks_consumed += 1
+            samples = array('h')
+            samples.frombytes(chunk)
+            if samples and max(map(abs, samples)) >= self.threshold:
+                speech_chunks += 1
+                quiet_samples = 0
+                words_heard = min(len(words), math.ceil(speech_chunks / self.chunks_per_word))
+                if words_heard > revealed:
+                    revealed = words_heard
+                    yield TranscriptEvent(' '.join(words[:revealed]), False)
+            elif speech_chunks:
+                quiet_samples += len(samples)
+                if quiet_samples >= endpoint_samples:
+                    yield TranscriptEvent(self.transcript, True)
+                    return
+
+        if speech_chunks:
+            yield TranscriptEvent(self.transcript, True)
+
+
+def wav_chunks(path: str, chunk: int = 1024, realtime: bool = False) -> Iterator[bytes]:
+    """
+    Yields a 16-bit mono WAV file in `chunk`-sample pieces, like the microphone
+    would. With `realtime`, chunks are paced at the file's sample rate.
+    """
+    with wave.open(path, 'rb') as wf:
+        if wf.getsampwidth() != SAMPLE_WIDTH or wf.getnchannels() != 1:
+            raise ValueError(f"{path}: expected 16-bit mono audio")
+        rate = wf.getframerate()
+        started = time.monotonic()
+        sent = 0
+        while True:
+            data = wf.readframes(chunk)
+            if not data:
+                return
+            if realtime:
+                delay = started + sent / rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            sent += len(data) // SAMPLE_WIDTH
+            yield data
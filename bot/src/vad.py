@@ -0,0 +1,125 @@
+# vad.py
+
+from collections import deque
+from typing import Deque, List, Tuple, Union
+import numpy as np
+
+Audio = Union[bytes, bytearray, memoryview, np.ndarray]
+
+
+class VoiceActivityDetector:
+    """
+    Energy/zero-crossing voice-activity detector for 16-bit mono audio.
+
+    A chunk is voiced when its RMS is `threshold_ratio` times above the
+    noise floor (and above `min_rms`) and its zero-crossing rate is
+    speech-like; very loud chunks count regardless of ZCR so fricatives
+    aren't dropped. The noise floor is a low percentile of the chunk RMS over
+    the last `floor_window_ms`, voiced chunks included: the pauses between
+    words keep it at the background level, a noisy corridor raises it
+    instead of looking like speech, and a recording that starts mid-word
+    gets the right floor at the first pause, which also marks the speech
+    already in the window as started. Speech stays "on" for
+    `hangover_ms` after the last voiced chunk to bridge the gaps between
+    words.
+
+    `process` is the streaming interface (one chunk at a time);
+    `segments` runs the same logic over a prerecorded buffer.
+    """
+
+    def __init__(self, rate: int = 16000, threshold_ratio: float = 3.0, min_rms: float = 150.0,
+                 max_zcr: float = 0.25, hangover_ms: float = 300.0,
+                 floor_window_ms: float = 3000.0, floor_percentile: float = 10.0):
+        self.rate = rate
+        self.threshold_ratio = threshold_ratio
+        self.min_rms = min_rms
+        self.max_zcr = max_zcr
+        self.hangover_ms = hangover_ms
+        self.floor_window_ms = floor_window_ms
+        self.floor_percentile = floor_percentile
+        self.reset()
+
+    def reset(self):
+        self.noise_floor = 0.0
+        self._recent: Deque[Tuple[float, int]] = deque() # (rms, samples) over the floor window
+        self._recent_samples = 0
+        self.is_speech = False
+        self.speech_started = False
+        self._hangover_left = 0.0
+
+    @staticmethod
+    def features(frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """RMS and zero-crossing rate of each row of an int16 (frames, samples) array."""
+        signal = frames.astype(np.float32)
+        rms = np.sqrt(np.einsum('ij,ij->i', signal, signal) / frames.shape[1])
+        negative = np.signbit(frames)
+        zcr = np.count_nonzero(negative[:, 1:] != negative[:, :-1], axis=1) / frames.shape[1]
+        return rms, zcr
+
+    def process(self, chunk: Audio) -> bool:
+        """Classifies the next chunk; returns True while speech is active (hangover included)."""
+        samples = _as_samples(chunk)
+        if not len(samples):
+            return self.is_speech
+        rms, zcr = self.features(samples.reshape(1, -1))
+        return self._update(float(rms[0]), float(zcr[0]), len(samples))
+
+    def segments(self, audio: Audio, chunk: int = 1024) -> List[Tuple[float, float]]:
+        """
+        Speech segments in a prerecorded buffer, as (start, end) seconds.
+        Features for every chunk are computed in one vectorized pass.
+        """
+        self.reset()
+        samples = _as_samples(audio)
+        count = len(samples) // chunk
+        if not count:
+            return []
+        rms, zcr = self.features(samples[:count * chunk].reshape(count, chunk))
+
+        segments: List[Tuple[float, float]] = []
+        start = None
+        for i in range(count):
+            active = self._update(float(rms[i]), float(zcr[i]), chunk)
+            if active and start is None:
+                start = i * chunk / self.rate
+            elif not active and start is not None:
+                segments.append((start, i * chunk / self.rate))
+                start = None
+        if start is not None:
+            segments.append((start, count * chunk / self.rate))
+        return segments
+
+    def _update(self, rms: float, zcr: float, samples: int) -> bool:
+        self._track_floor(rms, samples)
+        threshold = max(self.noise_floor * self.threshold_ratio, self.min_rms)
+        voiced = rms > threshold and (zcr <= self.max_zcr or rms > 2 * threshold)
+
+        if voiced:
+            self.is_speech = True
+            self.speech_started = True
+            self._hangover_left = self.hangover_ms
+        elif self.is_speech:
+            self._hangover_left -= samples * 1000 / self.rate
+            if self._hangover_left <= 0:
+                self.is_speech = False
+        return self.is_speech
+
+    def _track_floor(self, rms: float, samples: int):
+        recent = self._recent
+        recent.append((rms, samples))
+        self._recent_samples += samples
+        window = self.floor_window_ms * self.rate / 1000
+        while self._recent_samples - recent[0][1] >= window:
+            self._recent_samples -= recent.popleft()[1]
+        levels = sorted(level for level, _ in recent)
+        self.noise_floor = levels[int(len(levels) * self.floor_percentile / 100)]
+        if not self.speech_started and levels[-1] > max(self.noise_floor * self.threshold_ratio, self.min_rms):
+            # The floor dropped below speech heard earlier in the window (the recording
+            # started mid-word): that was speech, so the end-of-speech wait can begin
+            self.speech_started = True
+
+
+def _as_samples(audio: Audio) -> np.ndarray:
+    if isinstance(audio, np.ndarray):
+        return audio.astype(np.int16, copy=False).ravel()
+    return np.frombuffer(audio, dtype='<i2')
@@ -0,0 +1,272 @@
+# wake_word.py
+
+import queue
+import threading
+import wave
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Deque, Iterable, Iterator, List, Optional
+import numpy as np
+from audio_buffer import AudioRingBuffer
+from vad import VoiceActivityDetector
+
+FEATURE_FRAME = 256 # 16 ms at 16 kHz
+FEATURE_BANDS = 16
+# Added to band energies before the log, roughly the energy of background noise
+# in a band; keeps noise-only bands from dominating the spectral shape
+FEATURE_FLOOR = 1e8
+_END_OF_AUDIO = object() # Closes the queue a transcription reads from
+
+
+def band_features(samples: np.ndarray, rate: int = 16000, frame: int = FEATURE_FRAME) -> np.ndarray:
+    """Log energies in log-spaced bands (100 Hz - 4 kHz) for each `frame` samples."""
+    count = len(samples) // frame
+    if not count:
+        return np.empty((0, FEATURE_BANDS), dtype=np.float32)
+    frames = samples[:count * frame].reshape(count, frame).astype(np.float32) * np.hanning(frame).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+    edges = np.searchsorted(np.fft.rfftfreq(frame, 1 / rate), np.geomspace(100, 4000, FEATURE_BANDS + 1))
+    edges = np.unique(edges)
+    energies = np.add.reduceat(power[:, :edges[-1]], edges[:-1], axis=1)
+    return np.log(energies + FEATURE_FLOOR).astype(np.float32)
+
+
+def dtw_distance(template: np.ndarray, frames: np.ndarray) -> float:
+    """
+    Open-end DTW: how well `template` matches the start of `frames`, as the
+    average frame distance along the best warping path. Lower is closer.
+    """
+    m, n = len(template), len(frames)
+    if not m or not n:
+        return float('inf')
+    cost = np.sqrt(((template[:, None, :] - frames[None, :, :]) ** 2).sum(axis=2)).tolist()
+    inf = float('inf')
+    previous = [0.0] + [inf] * n
+    for i in range(m):
+        row = cost[i]
+        current = [inf] * (n + 1)
+        for j in range(1, n + 1):
+            current[j] = row[j - 1] + min(previous[j], previous[j - 1], current[j - 1])
+        previous = current
+    # The match may end anywhere after half the template's length
+    first = max(1, m // 2)
+    return min(previous[j] / (m + j) for j in range(first, n + 1))
+
+
+class KeywordSpotter(ABC):
+    """Fed every microphone chunk; says when the wake word was just spoken."""
+
+    @abstractmethod
+    def process(self, chunk: bytes) -> bool:
+        """True if the wake word ends with this chunk."""
+
+    def reset(self):
+        pass
+
+
+class TemplateKeywordSpotter(KeywordSpotter):
+    """
+    Small local spotter: compares the start of each speech segment against a
+    few recorded examples of the wake word with DTW over log band energies.
+
+    Features are only computed while the voice-activity detector hears speech,
+    and the DTW runs once per segment (when it is long enough to contain the
+    wake word, or when it ends), so idle listening costs a VAD step per chunk.
+    """
+
+    def __init__(self, templates: List[np.ndarray], rate: int = 16000, threshold: float = 1.4):
+        if not templates:
+            raise ValueError("at least one wake-word template is required")
+        self.templates = [_normalized(template) for template in templates]
+        self.rate = rate
+        self.threshold = threshold
+        frames_per_second = rate / FEATURE_FRAME
+        longest = max(len(template) for template in templates) / frames_per_second
+        shortest = min(len(template) for template in templates) / frames_per_second
+        self.check_after = 1.25 * longest # Seconds of speech before a segment is checked
+        self.min_speech = 0.5 * shortest
+        self.vad = VoiceActivityDetector(rate)
+        self.last_distance = float('inf')
+        self.reset()
+
+    @classmethod
+    def from_wavs(cls, paths: Iterable[str], **kwargs) -> "TemplateKeywordSpotter":
+        """Builds templates from 16-bit mono WAV recordings of the wake word."""
+        rate = kwargs.get('rate', 16000)
+        templates = []
+        for path in paths:
+            with wave.open(path, 'rb') as wf:
+                if wf.getsampwidth() != 2 or wf.getnchannels() != 1 or wf.getframerate() != rate:
+                    raise ValueError(f"{path}: expected {rate} Hz 16-bit mono audio")
+                samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype='<i2')
+            templates.append(cls.template_from_samples(samples, rate))
+        return cls(templates, **kwargs)
+
+    @staticmethod
+    def template_from_samples(samples: np.ndarray, rate: int = 16000) -> np.ndarray:
+        """Features of the first speech segment in a recording of the wake word."""
+        segments = VoiceActivityDetector(rate).segments(samples)
+        if segments:
+            start, end = segments[0]
+            samples = samples[int(start * rate):int(end * rate)]
+        return band_features(samples, rate)
+
+    def reset(self):
+        self.vad.reset()
+        self._segment: List[np.ndarray] = []
+        self._speech_samples = 0
+        self._checked = False
+
+    def process(self, chunk: bytes) -> bool:
+        samples = np.frombuffer(chunk, dtype='<i2')
+        if self.vad.process(samples):
+            self._segment.append(band_features(samples, self.rate))
+            self._speech_samples += len(samples)
+            if not self._checked and self._speech_samples >= self.check_after * self.rate:
+                return self._check()
+            return False
+
+        ended = bool(self._segment)
+        long_enough = self._speech_samples >= self.min_speech * self.rate
+        woke = ended and not self._checked and long_enough and self._check()
+        self._segment = []
+        self._speech_samples = 0
+        self._checked = False
+        return woke
+
+    def _check(self) -> bool:
+        self._checked = True
+        frames = _normalized(np.vstack(self._segment))
+        self.last_distance = min(dtw_distance(template, frames) for template in self.templates)
+        return self.last_distance <= self.threshold
+
+
+class WakeWordListener:
+    """
+    Background listener: keeps the last `preroll_seconds` of microphone audio
+    in a ring buffer and runs the keyword spotter locally on every chunk.
+    Nothing is sent to speech-to-text until the wake word is heard. Then the
+    pre-roll and the live audio are streamed until the recognizer's final
+    result, which is handed to `on_command`; thanks to the pre-roll the start
+    of "Porter, go to ..." is never lost to stream start-up.
+    """
+
+    def __init__(self, recorder, spotter: KeywordSpotter, on_command: Callable[[str], None],
+                 preroll_seconds: float = 1.5):
+        self.recorder = recorder
+        self.spotter = spotter
+        self.on_command = on_command
+        self.preroll = AudioRingBuffer.for_duration(preroll_seconds, recorder.rate, recorder.sample_width)
+        self.wakes = 0
+        self.commands = 0
+        self.shipped_bytes = 0 # Audio sent to speech-to-text
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Listens on the recorder's microphone until stop()."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="wake-word-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _listen(self):
+        try:
+            self.run(self.recorder.listen_chunks(self._stop))
+        except Exception as e:
+            print(f"Wake-word listener stopped: {e}")
+
+    def run(self, chunks: Iterable[bytes]):
+        """Processes `chunks` (the microphone, or a WAV fixture) until they run out."""
+        source = iter(chunks)
+        backlog: Deque[bytes] = deque() # Read during a transcription, after its final result
+        while not self._stop.is_set():
+            chunk = backlog.popleft() if backlog else next(source, None)
+            if chunk is None:
+                return
+            self.preroll.write(chunk)
+            if not self.spotter.process(chunk):
+                continue
+
+            self.wakes += 1
+            print("Wake word detected.")
+            text = self._transcribe(source, backlog)
+            self.preroll.clear()
+            self.spotter.reset()
+            if text:
+                self.commands += 1
+                self.on_command(text)
+
+    def _transcribe(self, source: Iterator[bytes], backlog: Deque[bytes]) -> str:
+        """
+        Streams the pre-roll and the live audio to speech-to-text until the
+        final result. The recognizer reads a queue on its own thread while this
+        thread keeps reading `source`, so the microphone is only ever read here.
+        Chunks still queued when the result arrives go back to `backlog`.
+        """
+        size = self.recorder.chunk * self.recorder.sample_width
+        audio: queue.Queue = queue.Queue(maxsize=2 * max(1, self.preroll.capacity // size))
+        pending = deque(self._preroll_chunks())
+        pending.extend(backlog)
+        backlog.clear()
+        result: List[str] = []
+        worker = threading.Thread(target=lambda: result.append(self.recorder.transcribe_stream(self._queued(audio))),
+                                  name="wake-word-transcriber", daemon=True)
+        worker.start()
+
+        while worker.is_alive() and not self._stop.is_set():
+            if not pending:
+                chunk = next(source, None)
+                if chunk is None:
+                    break
+                pending.append(chunk)
+            try:
+                # Bounded so a WAV fixture isn't queued far ahead of the recognizer
+                audio.put(pending[0], timeout=0.05)
+            except queue.Full:
+                continue
+            pending.popleft()
+
+        while worker.is_alive():
+            try:
+                audio.put(_END_OF_AUDIO, timeout=0.05) # Ends the stream if no final result came
+                break
+            except queue.Full:
+                continue
+        worker.join()
+        while not audio.empty():
+            leftover = audio.get_nowait()
+            if leftover is not _END_OF_AUDIO:
+                backlog.append(leftover)
+        backlog.extend(pending)
+        return result[0] if result else ""
+
+    def _preroll_chunks(self) -> Iterator[bytes]:
+        # Re-chunked to the microphone size, streaming requests have a size limit
+        size = self.recorder.chunk * self.recorder.sample_width
+        audio = self.preroll.getvalue()
+        for start in range(0, len(audio), size):
+            yield audio[start:start + size]
+
+    def _queued(self, audio: queue.Queue) -> Iterator[bytes]:
+        while True:
+            chunk = audio.get()
+            if chunk is _END_OF_AUDIO:
+                return
+            self.shipped_bytes += len(chunk)
+            yield chunk
+
+
+def _normalized(features: np.ndarray) -> np.ndarray:
+    # Spectral shape of each frame, so loudness and microphone gain don't matter
+    return features - features.mean(axis=1, keepdims=True)
@@ -0,0 +1,96 @@
+# test_bot_schedule.py
+# Bots with shared reservations move when their booked schedule says so.
+#
+# Usage: python -m pytest bot/tests
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from fleet_simulator import build_bots
+from graph import Graph
+from navigator import Navigator
+from reservations import CooperativePlanner, find_conflicts
+
+STEP_SECONDS = 0.05
+
+
+def corridor_with_pocket() -> Graph:
+    """Rooms 0-4 in a line, with room 5 a side pocket off room 2."""
+    graph = Graph()
+    for node_id in range(5):
+        graph.add_node(node_id, f"room {node_id}", node_id * 5.0, 0.0)
+    graph.add_node(5, "room 5", 10.0, 5.0)
+    for node_id in range(4):
+        graph.add_connection(node_id, node_id + 1, 5.0)
+    graph.add_connection(2, 5, 5.0)
+    return graph
+
+
+def bot_with_traffic(graph: Graph, start_id: int):
+    # One map unit per step at 5.0 per connection
+    traffic = CooperativePlanner(graph, speed=5.0 / STEP_SECONDS, step_seconds=STEP_SECONDS)
+    with contextlib.redirect_stdout(io.StringIO()):
+        bot = build_bots(graph, 1, Navigator())[0]
+    bot.current_node = graph.nodes[start_id]
+    bot.traffic = traffic
+
+    schedules = []
+    plan = traffic.plan
+
+    def recording_plan(*args, **kwargs):
+        schedule = plan(*args, **kwargs)
+        if args[0] == bot.id:
+            schedules.append(schedule)
+        return schedule
+
+    traffic.plan = recording_plan # type: ignore
+    arrivals = []
+    bot.state_listeners.append(
+        lambda _, event, data: arrivals.append((time.monotonic(), data["location"])) if event == "location" else None)
+    return bot, traffic, schedules, arrivals
+
+
+def check_on_schedule(schedule, arrivals, start_index=0):
+    """Each node is reached no earlier than its booked step, and not long after."""
+    moves = [(step, node) for (_, before), (step, node) in zip(schedule.waypoints, schedule.waypoints[1:])
+             if node != before]
+    assert [name for _, name in arrivals[start_index:start_index + len(moves)]] == [node.name for _, node in moves]
+    for (step, _), (at, _) in zip(moves, arrivals[start_index:]):
+        assert step * STEP_SECONDS - 1e-3 <= at < (step + 1) * STEP_SECONDS
+
+
+def test_move_to_room_holds_where_the_schedule_waits():
+    graph = corridor_with_pocket()
+    bot, traffic, schedules, arrivals = bot_with_traffic(graph, 5)
+    # Another bot coming down the corridor the other way
+    other = traffic.plan("other", graph.nodes[4], graph.nodes[0])
+
+    started = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert bot.move_to_room("room 4") == "success"
+
+    schedule = schedules[0]
+    assert schedule.wait_steps > 0
+    assert not find_conflicts([other, schedule], traffic.edge_steps)
+    check_on_schedule(schedule, arrivals)
+    # The trip takes as long as it was booked for, waits included
+    assert time.monotonic() - started >= (schedule.arrival_time - schedule.start_time - 1) * STEP_SECONDS
+    assert bot.current_node == graph.nodes[4]
+
+
+def test_move_to_rooms_books_every_leg():
+    graph = corridor_with_pocket()
+    bot, traffic, schedules, arrivals = bot_with_traffic(graph, 0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        plan = bot.move_to_rooms(["room 5", "room 4"])
+
+    assert [schedule.waypoints[-1][1] for schedule in schedules] == [stop.room for stop in plan.stops]
+    check_on_schedule(schedules[0], arrivals)
+    check_on_schedule(schedules[1], arrivals, len(schedules[0].path) - 1)
+    # Parked at the last stop until the next trip
+    assert not traffic.reservations.can_park(graph.nodes[4].id, traffic.now() + 10, "other")
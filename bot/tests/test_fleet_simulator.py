@@ -0,0 +1,49 @@
+# test_fleet_simulator.py
+# The simulator finishes even when some tasks can never be served.
+#
+# Usage: python -m pytest bot/tests
+
+import contextlib
+import io
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from fleet_simulator import FleetSimulator, SimTask, build_bots
+from graph import Graph
+from navigator import Navigator
+
+
+def ward_with_closed_wing() -> Graph:
+    graph = Graph()
+    for node_id in range(4):
+        graph.add_node(node_id, f"room {node_id}", node_id * 5.0, 0.0)
+    for node_id in range(3):
+        graph.add_connection(node_id, node_id + 1, 5.0)
+    return graph
+
+
+def run_in_thread(simulator, tasks):
+    reports = []
+    thread = threading.Thread(target=lambda: reports.append(simulator.run(tasks)), daemon=True)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive(), "simulation did not finish"
+    return reports[0]
+
+
+def test_unreachable_task_fails_instead_of_looping():
+    graph = ward_with_closed_wing()
+    with contextlib.redirect_stdout(io.StringIO()):
+        bots = build_bots(graph, 2, Navigator(), seed=1)
+    # Added after the bots are placed, so none of them starts there
+    graph.add_node(9, "room 9", 50.0, 0.0)
+    tasks = [SimTask(1, graph.nodes[3], "normal", 0.0), SimTask(2, graph.nodes[9], "high", 5.0)]
+
+    for dispatch_interval in (0.0, 10.0):
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = run_in_thread(FleetSimulator(graph, bots, dispatch_interval=dispatch_interval), tasks)
+        assert report.completed == 1
+        assert report.failed == 1
@@ -0,0 +1,67 @@
+# test_graph_snapshot.py
+# Damaged graph snapshots are rejected before a search can trip over them,
+# and load_graph falls back to the JSON.
+#
+# Usage: python -m pytest bot/tests
+
+import os
+import shutil
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from graph_loader import SNAPSHOT_HEADER, load_graph, read_snapshot, snapshot_path_for
+
+GRAPH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'graph.json')
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = str(tmp_path / "graph.json")
+    shutil.copy(GRAPH_PATH, path)
+    load_graph(path) # Writes the snapshot
+    return path, snapshot_path_for(path)
+
+
+def sections(snapshot_path):
+    """Byte positions of the offsets and targets arrays, and the node count."""
+    with open(snapshot_path, 'rb') as f:
+        header = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+    node_count, meta_size = header[4], header[6]
+    arrays_start = SNAPSHOT_HEADER.size + meta_size + (-meta_size % 8)
+    offsets_start = arrays_start + node_count * 8
+    targets_start = offsets_start + (node_count + 1) * 8
+    return offsets_start, targets_start, node_count
+
+
+def patch(path, position, value):
+    with open(path, 'r+b') as f:
+        f.seek(position)
+        f.write(struct.pack('<q', value))
+
+
+def test_snapshot_round_trip(snapshot):
+    json_path, snapshot_path = snapshot
+    graph = read_snapshot(snapshot_path)
+    assert graph is not None and graph.find_node("room 310") is not None
+
+
+@pytest.mark.parametrize("damage", ["target past the nodes", "negative target", "offsets out of order"])
+def test_damaged_snapshot_is_rejected(snapshot, damage, capsys):
+    json_path, snapshot_path = snapshot
+    offsets_start, targets_start, node_count = sections(snapshot_path)
+    if damage == "target past the nodes":
+        patch(snapshot_path, targets_start, node_count)
+    elif damage == "negative target":
+        patch(snapshot_path, targets_start + 8, -1)
+    else:
+        patch(snapshot_path, offsets_start + 8, 10 ** 6)
+
+    with pytest.raises(ValueError):
+        read_snapshot(snapshot_path)
+    graph = load_graph(json_path, write_snapshot=False)
+    assert "Ignoring unreadable graph snapshot" in capsys.readouterr().out
+    assert graph.find_node("room 310") is not None
@@ -0,0 +1,57 @@
+# test_intent_parser.py
+# What the local parser answers on the real ward map, and what it leaves to the LLM.
+#
+# Usage: python -m pytest bot/tests
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from command_prompt import DESTINATION_MAPPINGS
+from graph_loader import load_mutable_graph
+from intent_parser import LocalIntentParser
+
+GRAPH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'graph.json')
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return LocalIntentParser(load_mutable_graph(GRAPH_PATH), DESTINATION_MAPPINGS)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("shutdown", ("shutdown", [])),
+    ("room 310", ("move", ["room 310"])),
+    ("Go to Room 310 please", ("move", ["room 310"])),
+    ("take me to the service room", ("move", ["service room"])),
+    ("bring water", ("move", ["room 100"])),
+    ("I need the washroom", ("move", ["room 200"])),
+    # A named room is used, alone or when the phrase agrees with it
+    ("can you head over to the lounge area", ("move", ["room 310"])),
+    ("bring water to room 100", ("move", ["room 100"])),
+    ("please come to room 550 now", ("move", ["room 550"])),
+])
+def test_answers_locally(parser, text, expected):
+    assert parser.parse(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    # The named room overrides the phrase's usual destination: the LLM decides
+    "bring water to room 200",
+    "take the blankets to room 550",
+    "take the blankets to the service room",
+    # A room the map doesn't have
+    "bring water to room 999",
+    "go to room 31",
+    # More than one destination
+    "go to room 100 then room 200",
+    "water and food please",
+    # Questions and negations
+    "where is room 100?",
+    "don't go to room 100",
+])
+def test_leaves_to_llm(parser, text):
+    assert parser.parse(text) is None
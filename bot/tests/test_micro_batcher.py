@@ -0,0 +1,45 @@
+# test_micro_batcher.py
+# Every request handed to the micro-batcher gets an answer or an error, even
+# from a backend that miscounts its batch.
+#
+# Usage: python -m pytest bot/tests
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from llm_backend import LLMBackend, MicroBatcher, ParseRequest
+
+
+class EchoBackend(LLMBackend):
+    name = "echo"
+    supports_batching = True
+
+    def __init__(self, drop: int = 0):
+        self.drop = drop
+
+    def generate(self, request):
+        return request.user_input
+
+    def generate_batch(self, requests):
+        results = [self.generate(request) for request in requests]
+        return results[:len(results) - self.drop]
+
+
+def submit_all(batcher, count):
+    return [batcher.submit(ParseRequest("prefix", "key", f"input {i}", f"input {i}")) for i in range(count)]
+
+
+def test_answers_come_back_in_order():
+    futures = submit_all(MicroBatcher(EchoBackend(), window_ms=20), 5)
+    assert [future.result(timeout=5) for future in futures] == [f"input {i}" for i in range(5)]
+
+
+def test_short_batch_fails_every_request():
+    futures = submit_all(MicroBatcher(EchoBackend(drop=1), window_ms=20), 5)
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
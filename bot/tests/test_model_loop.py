@@ -0,0 +1,60 @@
+# test_model_loop.py
+# Async model calls from many request threads run together on one long-lived
+# event loop, which is what a loop-bound client (grpc.aio) needs.
+#
+# Usage: python -m pytest bot/tests
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from gcp import GCP
+from graph_loader import load_mutable_graph
+from llm_backend import LLMBackend
+
+GRAPH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'graph.json')
+
+
+class LoopBoundBackend(LLMBackend):
+    """Like the Gemini async client: fails on any loop but the first one it ran on."""
+    name = "loop-bound"
+    supports_async = True
+
+    def __init__(self):
+        self.loop = None
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    def generate(self, request):
+        raise AssertionError("the async path should be used")
+
+    async def generate_async(self, request):
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        assert loop is self.loop, "attached to a different loop"
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+        return json.dumps({"command": "move", "destination": "room 550", "confidence": 0.9})
+
+
+def test_concurrent_requests_share_one_loop():
+    graph = load_mutable_graph(GRAPH_PATH)
+    backend = LoopBoundBackend()
+    with contextlib.redirect_stdout(io.StringIO()):
+        gcps = [GCP(graph.find_node("service room"), graph, backend=backend) for _ in range(2)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            # Named room against the phrase's room: left to the model, and unique so the cache can't answer
+            results = list(pool.map(lambda i: gcps[i % 2].parse_command_with_gemini(f"take the blankets to room 550, ticket {i}"),
+                                    range(16)))
+
+    assert results == [("move", ["room 550"])] * 16
+    assert backend.most_in_flight > 1
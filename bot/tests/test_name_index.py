@@ -0,0 +1,65 @@
+# test_name_index.py
+# Room-name resolution against the real ward map and a few hand-built indexes.
+#
+# Usage: python -m pytest bot/tests
+
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from graph_loader import load_graph, load_mutable_graph
+from name_index import NameIndex
+
+GRAPH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'graph.json')
+
+
+@pytest.fixture(params=["mutable", "compact", "snapshot"])
+def graph(request, tmp_path):
+    if request.param == "mutable":
+        return load_mutable_graph(GRAPH_PATH)
+    path = str(tmp_path / "graph.json")
+    shutil.copy(GRAPH_PATH, path)
+    load_graph(path) # Writes the snapshot
+    return load_graph(path, use_snapshot=request.param == "snapshot")
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("room 310", "room 310"),
+    ("Room310", "room 310"),
+    (" ROOM-310 ", "room 310"),
+    ("lounge", "room 310"),
+    ("3rd floor lounge", "room 310"),
+    ("Lounge Area", "room 310"),
+    ("washroom", "room 200"),
+    ("service", "service room"),
+])
+def test_find_node_on_real_map(graph, name, expected):
+    node = graph.find_node(name)
+    assert node is not None and node.name == expected
+
+
+@pytest.mark.parametrize("name", ["room 31", "room 3", "room 55", "patient room", "patient", "room"])
+def test_find_node_does_not_guess(graph, name):
+    assert graph.find_node(name) is None
+
+
+def test_prefix_candidates_are_filtered_before_the_limit():
+    index = NameIndex()
+    for node_id, name in enumerate(["room 3100", "room 3101", "room 31 east"]):
+        index.add(name, node_id)
+    # The first two prefix matches have other room numbers
+    assert index.resolve("room 31") == 2
+
+
+def test_shared_alias_is_ambiguous():
+    index = NameIndex()
+    index.add("room 100", 1)
+    index.add("room 220", 3)
+    index.add_alias("Patient Room", None)
+    assert index.resolve("patient room") is None
+    assert index.exact("patient room") is None
+    assert index.resolve("room 100") == 1
@@ -0,0 +1,67 @@
+# test_reservations.py
+# Cooperative planning when several bot workers plan at the same time.
+#
+# Usage: python -m pytest bot/tests
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from graph import Graph
+from reservations import CooperativePlanner, find_conflicts
+
+WIDTH, HEIGHT = 12, 3
+
+
+def narrow_ward() -> Graph:
+    graph = Graph()
+    for node_id in range(WIDTH * HEIGHT):
+        graph.add_node(node_id, f"room {node_id}", node_id % WIDTH * 5.0, node_id // WIDTH * 5.0)
+    for node_id in range(WIDTH * HEIGHT):
+        if node_id % WIDTH + 1 < WIDTH:
+            graph.add_connection(node_id, node_id + 1, 5.0)
+        if node_id + WIDTH < WIDTH * HEIGHT:
+            graph.add_connection(node_id, node_id + WIDTH, 5.0)
+    return graph
+
+
+def test_concurrent_plans_do_not_conflict():
+    # Switch threads often, so searches overlap the way they do on slow bot workers
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        run_concurrent_plans()
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def run_concurrent_plans():
+    graph = narrow_ward()
+    planner = CooperativePlanner(graph)
+    # Every bot crosses the ward, west to east or east to west
+    trips = []
+    for row in range(HEIGHT):
+        west, east = graph.nodes[row * WIDTH], graph.nodes[row * WIDTH + WIDTH - 1]
+        trips += [(f"west-{row}", west, east), (f"east-{row}", east, west)]
+
+    for _ in range(20):
+        schedules = {}
+        ready = threading.Barrier(len(trips))
+
+        def plan(bot_id, start, goal):
+            ready.wait()
+            schedules[bot_id] = planner.plan(bot_id, start, goal, start_time=0)
+
+        threads = [threading.Thread(target=plan, args=trip) for trip in trips]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        planned = [schedule for schedule in schedules.values() if schedule is not None]
+        assert planned
+        assert find_conflicts(planned, planner.edge_steps) == []
+        for bot_id, _, _ in trips:
+            planner.reservations.release(bot_id)
@@ -0,0 +1,81 @@
+# test_streaming_recognizer.py
+# Streaming transcription of a synthetic WAV command through the fake recognizer.
+#
+# Usage: python -m pytest bot/tests
+
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+from speech_recognizer import SimpleVoiceRecorder
+from streaming_recognizer import FakeStreamingRecognizer, TranscriptEvent, wav_chunks
+from synthetic_audio import RATE, command_wav
+
+TRANSCRIPT = "Take me to room 310"
+CHUNK = 1024
+
+
+@pytest.fixture
+def command(tmp_path):
+    path = str(tmp_path / "command.wav")
+    speech_end = command_wav(path, trail_silence=2.0)
+    return path, speech_end
+
+
+def counted(chunks, reads):
+    for chunk in chunks:
+        reads.append(chunk)
+        yield chunk
+
+
+def test_partials_then_final(command):
+    path, speech_end = command
+    recognizer = FakeStreamingRecognizer(TRANSCRIPT)
+    recorder = SimpleVoiceRecorder(recognizer=recognizer)
+    partials, reads = [], []
+
+    text = recorder.transcribe_stream(counted(wav_chunks(path, CHUNK), reads), on_partial=partials.append)
+
+    assert text == TRANSCRIPT.lower()
+    # One more word at a time, in order
+    words = TRANSCRIPT.split()
+    assert partials == [' '.join(words[:count]) for count in range(1, len(words) + 1)]
+    # Nothing is read past the endpoint, well before the fixture's trailing silence ends
+    endpoint_chunks = math.ceil((speech_end + recognizer.endpoint_ms / 1000) * RATE / CHUNK) + 1
+    total_chunks = sum(1 for _ in wav_chunks(path, CHUNK))
+    assert recognizer.chunks_consumed == len(reads)
+    assert recognizer.chunks_consumed <= endpoint_chunks < total_chunks
+
+
+class TwoFinalsRecognizer(FakeStreamingRecognizer):
+    """Keeps talking after its final result; the recorder must not listen."""
+
+    def __init__(self, transcript):
+        super().__init__(transcript)
+        self.after_final = 0
+
+    def stream(self, chunks):
+        yield from super().stream(chunks)
+        self.after_final += 1
+        yield TranscriptEvent("a second utterance", True)
+
+
+def test_returns_on_first_final(command):
+    path, _ = command
+    recognizer = TwoFinalsRecognizer(TRANSCRIPT)
+    recorder = SimpleVoiceRecorder(recognizer=recognizer)
+
+    assert recorder.transcribe_stream(wav_chunks(path, CHUNK)) == TRANSCRIPT.lower()
+    assert recognizer.after_final == 0
+
+
+def test_no_speech_returns_empty(tmp_path):
+    path = str(tmp_path / "quiet.wav")
+    command_wav(path, speech_seconds=0.0)
+    recorder = SimpleVoiceRecorder(recognizer=FakeStreamingRecognizer(TRANSCRIPT))
+    assert recorder.transcribe_stream(wav_chunks(path, CHUNK)) == ""
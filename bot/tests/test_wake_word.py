@@ -0,0 +1,94 @@
+# test_wake_word.py
+# The wake-word listener with a recognizer that reads its audio on another
+# thread, the way the Google client reads requests.
+#
+# Usage: python -m pytest bot/tests
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from speech_recognizer import SimpleVoiceRecorder
+from streaming_recognizer import StreamingRecognizer, TranscriptEvent
+from wake_word import KeywordSpotter, WakeWordListener
+
+WAKE = b'W' * 2048
+SPEECH = b'S' * 2048
+QUIET = b'\0' * 2048
+
+
+class MarkerSpotter(KeywordSpotter):
+    def process(self, chunk: bytes) -> bool:
+        return chunk == WAKE
+
+
+class ThreadedRecognizer(StreamingRecognizer):
+    """Final result after a quiet chunk that follows speech; reads on a thread of its own."""
+
+    def __init__(self):
+        self.heard = []
+
+    def stream(self, chunks):
+        done = threading.Event()
+        heard = []
+
+        def read():
+            for chunk in chunks:
+                heard.append(chunk)
+                if chunk == QUIET and SPEECH in heard:
+                    break
+            done.set()
+
+        threading.Thread(target=read, daemon=True).start()
+        done.wait()
+        self.heard.append(heard)
+        if SPEECH in heard:
+            yield TranscriptEvent("go to room 310", True)
+
+
+def microphone(chunks, reader_threads):
+    for chunk in chunks:
+        reader_threads.add(threading.current_thread())
+        yield chunk
+
+
+def make_listener(commands):
+    recognizer = ThreadedRecognizer()
+    recorder = SimpleVoiceRecorder(recognizer=recognizer)
+    return WakeWordListener(recorder, MarkerSpotter(), commands.append), recognizer
+
+
+def test_microphone_is_only_read_by_the_listener():
+    commands = []
+    listener, recognizer = make_listener(commands)
+    readers = set()
+    audio = [QUIET] * 3 + [WAKE] + [SPEECH] * 4 + [QUIET] * 5
+    listener.run(microphone(audio, readers))
+
+    assert readers == {threading.current_thread()}
+    assert commands == ["go to room 310"]
+    # The pre-roll leads the stream, which ends at the recognizer's final result
+    assert recognizer.heard[0][:4] == [QUIET] * 3 + [WAKE]
+    assert recognizer.heard[0][-1] == QUIET
+
+
+def test_audio_after_the_result_goes_back_to_the_spotter():
+    commands = []
+    listener, recognizer = make_listener(commands)
+    audio = [WAKE] + [SPEECH] * 2 + [QUIET] + [WAKE] + [SPEECH] * 2 + [QUIET] * 3
+    listener.run(microphone(audio, set()))
+
+    assert listener.wakes == 2
+    assert commands == ["go to room 310"] * 2
+
+
+def test_stream_is_closed_when_the_microphone_stops():
+    commands = []
+    listener, recognizer = make_listener(commands)
+    listener.run(microphone([WAKE] + [QUIET] * 2, set()))
+
+    assert listener.wakes == 1
+    assert commands == []
+    assert recognizer.heard[0] == [WAKE] + [QUIET] * 2
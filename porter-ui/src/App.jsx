@@ -16,6 +16,60 @@ import './App.css';
 import Prescriptions from './pages/Perscriptions';
 import Patients from './pages/Patients';
 
+// The list endpoints are paginated; follow X-Next-Cursor until the last page
+const fetchAll = async (url) => {
+  const items = [];
+  let cursor = null;
+  do {
+    const res = await fetch(cursor ? `${url}?cursor=${encodeURIComponent(cursor)}` : url);
+    items.push(...await res.json());
+    cursor = res.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return items;
+};
+
+// Live updates from /api/events: the field each list is keyed by
+const KEY_FIELDS = { bots: 'name', tasks: 'task_id', patients: 'id' };
+
+// Sets a possibly dotted path ("vitals.heartRate") on a copy of the document
+const withField = (document, path, value) => {
+  const [head, ...rest] = path.split('.');
+  if (!rest.length) return { ...document, [head]: value };
+  return { ...document, [head]: withField(document[head] || {}, rest.join('.'), value) };
+};
+
+const withoutField = (document, path) => {
+  const [head, ...rest] = path.split('.');
+  if (!rest.length) {
+    const { [head]: _, ...others } = document;
+    return others;
+  }
+  return document[head] ? { ...document, [head]: withoutField(document[head], rest.join('.')) } : document;
+};
+
+// Applies one change stream delta ({op, key, document | changes, removed}) to a list
+const applyDelta = (items, keyField, delta) => {
+  const matches = (item) => item[keyField] === delta.key;
+  switch (delta.op) {
+    case 'insert':
+      return [...items.filter(item => !matches(item)), delta.document];
+    case 'replace':
+      return items.map(item => (matches(item) ? delta.document : item));
+    case 'update':
+      return items.map(item => {
+        if (!matches(item)) return item;
+        let updated = item;
+        Object.entries(delta.changes || {}).forEach(([path, value]) => { updated = withField(updated, path, value); });
+        (delta.removed || []).forEach(path => { updated = withoutField(updated, path); });
+        return updated;
+      });
+    case 'delete':
+      return items.filter(item => !matches(item));
+    default:
+      return items;
+  }
+};
+
 const PorterUI = () => {
   const [activeTab, setActiveTab] = useState('dashboard');
   const [bots, setBots] = useState([]);
@@ -23,25 +77,47 @@ const PorterUI = () => {
   const [patients, setPatients] = useState([]);
   const [currentTime, setCurrentTime] = useState(new Date());
 
-  // Fetch data from API
+  // Fetch data from API, then keep it current with pushed changes
   useEffect(() => {
     const baseURL = import.meta.env.VITE_API_BASE_URL;
 
-    fetch(`${baseURL}/api/bots`)
-      .then(res => res.json())
-      .then(data => setBots(data))
-      .catch(err => console.error("Failed to fetch bots:", err));
+    const loadAll = () => {
+      fetchAll(`${baseURL}/api/bots`)
+        .then(data => setBots(data))
+        .catch(err => console.error("Failed to fetch bots:", err));
+
+      fetchAll(`${baseURL}/api/tasks`)
+        .then(data => setTasks(data))
+        .catch(err => console.error("Failed to fetch tasks:", err));
 
-    fetch(`${baseURL}/api/tasks`)
-      .then(res => res.json())
-      .then(data => setTasks(data))
-      .catch(err => console.error("Failed to fetch tasks:", err));
 
+      fetchAll(`${baseURL}/api/patients`)
+        .then(data => setPatients(data))
+        .catch(err => console.error("Failed to fetch tasks:", err));
+    };
+    loadAll();
 
-    fetch(`${baseURL}/api/patients`)
-      .then(res => res.json())
-      .then(data => setPatients(data))
-      .catch(err => console.error("Failed to fetch tasks:", err));
+    const setters = { bots: setBots, tasks: setTasks, patients: setPatients };
+    const events = new EventSource(`${baseURL}/api/events?topics=bots,tasks,patients,bot_state`);
+    Object.entries(setters).forEach(([topic, setItems]) => {
+      events.addEventListener(topic, (event) => {
+        const delta = JSON.parse(event.data);
+        if (delta.op === 'reset') {
+          loadAll();
+          return;
+        }
+        setItems(items => applyDelta(items, KEY_FIELDS[topic], delta));
+      });
+    });
+    events.addEventListener('bot_state', (event) => {
+      const state = JSON.parse(event.data);
+      if (state.event === 'location') {
+        setBots(items => items.map(bot => (bot.name === state.bot ? { ...bot, location: state.location } : bot)));
+      }
+    });
+    // Updates were missed (reconnect too late, or the change stream restarted)
+    events.addEventListener('resync', loadAll);
+    return () => events.close();
   }, []);
 
   // Update current time every second